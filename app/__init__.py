@@ -127,11 +127,22 @@ def create_app(test_config=None):
     login_manager.login_view = None  # Disable redirect to login view
     jwt.init_app(app)
 
+    from .cache import response_cache
+    response_cache.init_app(app)
+
     # Register blueprints
     from .routes import bp, bp_ai
     app.register_blueprint(bp, url_prefix="/api")
     app.register_blueprint(bp_ai)
 
+    # CLI commands
+    from .commands import ai_worker, mealdb_cli, ratings_cli, recipes_cli, stats_cli
+    app.cli.add_command(ratings_cli)
+    app.cli.add_command(recipes_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(mealdb_cli)
+    app.cli.add_command(ai_worker)
+
     # # Create database tables
     # with app.app_context():
     #     try:
@@ -0,0 +1,106 @@
+# app/ai_batch.py
+"""
+Several AI recipes in one request (/api/ai/generate-batch).
+
+Ingredient lists go through the same language detection, normalization
+and cache as /generate-recipe. Cache lookups and stores stay on the
+request thread; only the model calls fan out, at most AI_BATCH_CONCURRENCY
+at a time, each a single attempt (no client retries) bounded by
+AI_BATCH_ITEM_TIMEOUT seconds. Lists that
+normalize to the same key share one call, and the calls go through the
+same per-process single flight and counters as /generate-recipe, so an
+item joins a generation already in flight for its key. A failed or timed-out item is
+reported in its slot and does not sink the others, so the request takes
+about as long as its slowest item instead of the sum of all of them.
+"""
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+
+from flask import current_app
+
+from . import ai_cache, db
+from .utils.ai_recipes import detect_language, generate_recipe, normalize_ingredients
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_ITEM_TIMEOUT = 60
+DEFAULT_MAX_ITEMS = 10
+
+
+def generate_batch(groups, regenerate=False):
+    """One result per ingredient list, in order.
+
+    Each result is ``{"index", "recipe", "cache"}`` (cache is "hit",
+    "miss" or "shared") or ``{"index", "error"}``.
+    """
+    concurrency = current_app.config.get(
+        "AI_BATCH_CONCURRENCY", int(os.getenv("AI_BATCH_CONCURRENCY", DEFAULT_CONCURRENCY))
+    )
+    item_timeout = current_app.config.get(
+        "AI_BATCH_ITEM_TIMEOUT", float(os.getenv("AI_BATCH_ITEM_TIMEOUT", DEFAULT_ITEM_TIMEOUT))
+    )
+
+    results = [None] * len(groups)
+    pending = {}        # key -> (items, language, normalized, [indexes])
+    for index, items in enumerate(groups):
+        if not isinstance(items, list) or not items:
+            results[index] = {"index": index, "error": "No ingredients provided"}
+            continue
+        language = detect_language(str(items[0]))
+        normalized = normalize_ingredients(items)
+        key = ai_cache.cache_key(language, normalized)
+        if key in pending:
+            pending[key][3].append(index)
+            continue
+        recipe = None if regenerate else ai_cache.lookup(key)
+        if recipe is not None:
+            results[index] = {"index": index, "recipe": recipe, "cache": "hit"}
+        else:
+            pending[key] = (items, language, normalized, [index])
+
+    if pending:
+        workers = min(concurrency, len(pending))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-batch")
+        futures = {
+            # no client retries: each would get another full timeout, past the
+            # ceiling below, and keep running (and billing) after we gave up
+            key: executor.submit(
+                ai_cache.call_model, key,
+                partial(generate_recipe, items, language, item_timeout, max_retries=0),
+                share=not regenerate,
+            )
+            for key, (items, language, _, _) in pending.items()
+        }
+        # the client timeout bounds each call; this bounds the whole fan-out
+        # in case a call hangs past it (items run in ceil(n / workers) waves)
+        ceiling = item_timeout * math.ceil(len(futures) / workers) + 1
+        started = time.monotonic()
+        wait(futures.values(), timeout=ceiling)
+        executor.shutdown(wait=False, cancel_futures=True)
+        current_app.logger.info(
+            f"AI batch: {len(futures)} model call(s) in {time.monotonic() - started:.2f}s"
+        )
+
+        for key, future in futures.items():
+            items, language, normalized, indexes = pending[key]
+            if not future.done():
+                outcome = {"error": "Timed out"}
+            elif future.exception() is not None:
+                current_app.logger.error(f"AI batch item failed: {future.exception()}")
+                outcome = {"error": str(future.exception())}
+            else:
+                recipe, cache = future.result()
+                if cache == "miss":
+                    # a shared answer is stored by the request that produced it
+                    try:
+                        ai_cache.store(key, language, normalized, recipe)
+                    except Exception as e:
+                        current_app.logger.error(f"Error caching AI recipe: {e}")
+                        db.session.rollback()
+                outcome = {"recipe": recipe, "cache": cache}
+            for index in indexes:
+                results[index] = {"index": index, **outcome}
+
+    return results
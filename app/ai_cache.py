@@ -0,0 +1,239 @@
+# app/ai_cache.py
+"""
+Persistent cache for /api/ai/generate-recipe.
+
+Entries are keyed by detected language plus the normalized ingredient set
+(case-folded, de-duplicated, sorted), so "Chicken, rice, onion" and
+"onion, chicken, Rice" share one answer. Entries older than AI_CACHE_TTL
+seconds are ignored and dropped; once the table grows past
+AI_CACHE_MAX_ENTRIES the least recently hit rows are evicted.
+
+generate_once() makes sure a cache miss reaches the model only once while
+the answer is being produced: threads of one worker share the in-flight
+call (SingleFlight), and workers coordinate through a row in
+ai_generation_lock; the ones that lose the race poll the cache for the
+winner's answer. Counters of saved calls are kept per process.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from . import db
+from .models import dialect_insert, AIGenerationLock, AIRecipeCache
+from .utils.openai_client import max_call_seconds
+from .utils.singleflight import SingleFlight
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10000
+LOCK_SLACK = 10                 # seconds on top of the slowest model call
+POLL_INTERVAL = 0.1
+
+_flight = SingleFlight()
+_counter_lock = threading.Lock()
+_counters = {"model_calls": 0, "coalesced_peer": 0}
+
+
+def _count(name):
+    with _counter_lock:
+        _counters[name] += 1
+
+
+def cache_key(language, ingredients):
+    """``ingredients`` must already be normalized (see normalize_ingredients)."""
+    raw = language + "\n" + "\n".join(ingredients)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _enabled():
+    return current_app.config.get("AI_CACHE_ENABLED", True)
+
+
+def _cutoff():
+    ttl = current_app.config.get("AI_CACHE_TTL", DEFAULT_TTL)
+    return datetime.utcnow() - timedelta(seconds=ttl)
+
+
+def lookup(key):
+    """Cached recipe dict for ``key`` or None; counts the hit."""
+    if not _enabled():
+        return None
+    entry = db.session.get(AIRecipeCache, key)
+    if entry is None:
+        return None
+    if entry.created_at < _cutoff():
+        db.session.delete(entry)
+        db.session.commit()
+        return None
+    entry.hits += 1
+    entry.last_hit_at = datetime.utcnow()
+    recipe = json.loads(entry.response)
+    db.session.commit()
+    return recipe
+
+
+def store(key, language, ingredients, recipe):
+    """Insert or replace the entry, then enforce TTL and the size cap."""
+    if not _enabled():
+        return
+    now = datetime.utcnow()
+    values = {
+        "key": key,
+        "language": language,
+        "ingredients": "\n".join(ingredients),
+        "response": json.dumps(recipe, ensure_ascii=False),
+        "created_at": now,
+        "last_hit_at": now,
+        "hits": 0,
+    }
+    stmt = dialect_insert(AIRecipeCache).values(**values)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[AIRecipeCache.key],
+        set_={name: stmt.excluded[name] for name in ("response", "created_at", "last_hit_at", "hits")},
+    ))
+    evict()
+    db.session.commit()
+
+
+def evict():
+    """Drop expired rows and everything beyond the newest-hit AI_CACHE_MAX_ENTRIES."""
+    AIRecipeCache.query.filter(AIRecipeCache.created_at < _cutoff()).delete(
+        synchronize_session=False
+    )
+    max_entries = current_app.config.get("AI_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+    overflow = (
+        db.session.query(AIRecipeCache.key)
+        .order_by(AIRecipeCache.last_hit_at.desc())
+        .offset(max_entries)
+    )
+    AIRecipeCache.query.filter(AIRecipeCache.key.in_(overflow.scalar_subquery())).delete(
+        synchronize_session=False
+    )
+
+
+# ── coalescing ──────────────────────────────────────────────────
+def _try_lock(key, owner, timeout):
+    """Take the generation lock row for ``key``; steals it once expired."""
+    now = datetime.utcnow()
+    AIGenerationLock.query.filter(
+        AIGenerationLock.key == key, AIGenerationLock.expires_at < now
+    ).delete(synchronize_session=False)
+    stmt = dialect_insert(AIGenerationLock).values(
+        key=key, owner=owner, expires_at=now + timedelta(seconds=timeout)
+    ).on_conflict_do_nothing(index_elements=[AIGenerationLock.key])
+    acquired = db.session.execute(stmt).rowcount == 1
+    db.session.commit()
+    return acquired
+
+
+def _unlock(key, owner):
+    AIGenerationLock.query.filter_by(key=key, owner=owner).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def _lock_timeout():
+    """Lock TTL and wait deadline: AI_LOCK_TIMEOUT, or the longest a model call
+    can take (OPENAI_TIMEOUT x (OPENAI_MAX_RETRIES + 1) plus backoff) so a
+    holder that is still retrying is not mistaken for a stuck one."""
+    timeout = current_app.config.get("AI_LOCK_TIMEOUT")
+    return timeout if timeout is not None else max_call_seconds() + LOCK_SLACK
+
+
+def _generate_across_workers(key, language, ingredients, produce):
+    timeout = _lock_timeout()
+    owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    deadline = time.monotonic() + timeout
+    while True:
+        if _try_lock(key, owner, timeout):
+            try:
+                # a peer may have finished while we were waiting for the lock
+                recipe = lookup(key)
+                if recipe is not None:
+                    _count("coalesced_peer")
+                    return recipe, "shared"
+                return regenerate(key, language, ingredients, produce), "miss"
+            finally:
+                _unlock(key, owner)
+
+        time.sleep(POLL_INTERVAL)
+        recipe = lookup(key)
+        if recipe is not None:
+            _count("coalesced_peer")
+            return recipe, "shared"
+        if time.monotonic() > deadline:
+            # the holder is stuck; don't keep the user waiting on it
+            return regenerate(key, language, ingredients, produce), "miss"
+
+
+def generate_once(key, language, ingredients, produce):
+    """Cached answer for ``key``, calling ``produce()`` at most once across callers.
+
+    Returns ``(recipe, outcome)`` with outcome "hit", "miss" (this call asked
+    the model) or "shared" (another request's answer was reused).
+    """
+    recipe = lookup(key)
+    if recipe is not None:
+        return recipe, "hit"
+
+    if _enabled():
+        def run():
+            return _generate_across_workers(key, language, ingredients, produce)
+    else:
+        # no table to hand the answer to other workers through
+        def run():
+            _count("model_calls")
+            return produce(), "miss"
+
+    (recipe, outcome), shared = _flight.do(key, run)
+    return recipe, "shared" if shared else outcome
+
+
+def call_model(key, produce, share=True):
+    """Count and run one model call, joining an in-flight one for ``key``.
+
+    Unlike generate_once() this never touches the database, so it can run
+    on worker threads; the caller stores a "miss" itself. Returns
+    ``(recipe, outcome)`` with outcome "miss" or "shared". ``share=False``
+    always asks the model (regenerate).
+    """
+    def run():
+        _count("model_calls")
+        return produce(), "miss"
+
+    if not share:
+        return run()
+    (recipe, outcome), shared = _flight.do(key, run)
+    return recipe, "shared" if shared else outcome
+
+
+def regenerate(key, language, ingredients, produce):
+    """Ask the model again regardless of the cache and replace the entry."""
+    _count("model_calls")
+    recipe = produce()
+    store(key, language, ingredients, recipe)
+    return recipe
+
+
+def stats():
+    """Per-process coalescing counters plus cache table totals."""
+    flight = _flight.stats()
+    with _counter_lock:
+        counters = dict(_counters)
+    entries, hits = db.session.query(
+        db.func.count(AIRecipeCache.key), db.func.coalesce(db.func.sum(AIRecipeCache.hits), 0)
+    ).one()
+    return {
+        "pid": os.getpid(),
+        "model_calls": counters["model_calls"],
+        "coalesced_local": flight["followers"],
+        "coalesced_peer": counters["coalesced_peer"],
+        "saved_calls": flight["followers"] + counters["coalesced_peer"],
+        "in_flight": flight["in_flight"],
+        "cache_entries": entries,
+        "cache_hits": hits,
+    }
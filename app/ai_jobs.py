@@ -0,0 +1,197 @@
+# app/ai_jobs.py
+"""
+Submit/poll execution of AI recipe generation.
+
+POST /api/ai/jobs only inserts an ai_job row and returns its id, so a slow
+model call no longer holds a gunicorn worker. Jobs are executed by
+
+* a bounded in-process thread pool (AI_JOB_WORKERS threads per process,
+  0 disables it), handed the job id right after submit, and/or
+* ``flask ai-worker`` processes polling the table.
+
+Both claim a job with a conditional UPDATE (status='queued' → 'running'),
+so every job runs once no matter how many executors are around. Jobs left
+'running' by a crashed process are put back in the queue after
+AI_JOB_STALE_AFTER seconds, up to AI_JOB_MAX_ATTEMPTS tries.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from . import ai_cache, ai_usage, db
+from .models import AIJob
+from .utils.ai_recipes import detect_language, generate_recipe, normalize_ingredients
+
+DEFAULT_WORKERS = 4
+DEFAULT_STALE_AFTER = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+_executor_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+
+
+def submit(user_id, items, regenerate=False):
+    """Queue a generation for ``items`` and hand it to the local pool if enabled."""
+    job = AIJob(
+        user_id=user_id,
+        payload=json.dumps({"ingredients": items, "regenerate": bool(regenerate)},
+                           ensure_ascii=False),
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    executor = _get_executor()
+    if executor is not None:
+        executor.submit(_run_in_pool, current_app._get_current_object(), job.id)
+    return job
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    workers = current_app.config.get(
+        "AI_JOB_WORKERS", int(os.getenv("AI_JOB_WORKERS", DEFAULT_WORKERS))
+    )
+    if not workers:
+        return None
+    pid = os.getpid()
+    with _executor_lock:
+        # threads don't survive a fork, so a preloaded parent's pool is useless
+        if _executor is None or _executor_pid != pid:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-job")
+            _executor_pid = pid
+        return _executor
+
+
+def shutdown(wait=True):
+    """Stop the local pool, by default after the jobs it already holds."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        executor, _executor, _executor_pid = _executor, None, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _run_in_pool(app, job_id):
+    with app.app_context():
+        try:
+            if claim(job_id):
+                execute(db.session.get(AIJob, job_id))
+            # also drain jobs orphaned by a restarted process, so the queue
+            # empties even without a separate `flask ai-worker`
+            requeue_stale()
+            while (job := claim_next()) is not None:
+                execute(job)
+        except Exception:
+            current_app.logger.exception("AI job %s crashed", job_id)
+        finally:
+            db.session.remove()
+
+
+# ── claiming ────────────────────────────────────────────────────
+def claim(job_id):
+    """Atomically move a queued job to running; False if someone else got it."""
+    claimed = AIJob.query.filter_by(id=job_id, status="queued").update({
+        "status": "running",
+        "started_at": datetime.utcnow(),
+        "attempts": AIJob.attempts + 1,
+    }, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+def claim_next():
+    """Claim the oldest queued job, or return None when the queue is empty."""
+    while True:
+        job_id = (
+            db.session.query(AIJob.id)
+            .filter_by(status="queued")
+            .order_by(AIJob.created_at)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+        if claim(job_id):
+            return db.session.get(AIJob, job_id)
+        # lost the race for this one; try the next
+
+
+def requeue_stale():
+    """Requeue jobs stuck in 'running' (dead worker); fail them after too many attempts."""
+    cutoff = datetime.utcnow() - timedelta(
+        seconds=current_app.config.get("AI_JOB_STALE_AFTER", DEFAULT_STALE_AFTER)
+    )
+    max_attempts = current_app.config.get("AI_JOB_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+    stale = AIJob.query.filter(AIJob.status == "running", AIJob.started_at < cutoff)
+    failed = stale.filter(AIJob.attempts >= max_attempts).update({
+        "status": "failed",
+        "error": "Worker did not finish the job",
+        "finished_at": datetime.utcnow(),
+    }, synchronize_session=False)
+    requeued = stale.filter(AIJob.attempts < max_attempts).update(
+        {"status": "queued", "started_at": None}, synchronize_session=False
+    )
+    db.session.commit()
+    return requeued, failed
+
+
+# ── execution ───────────────────────────────────────────────────
+def execute(job):
+    """Run a claimed job through the AI cache and record the outcome.
+
+    The result is only written while this worker still owns the job: if it
+    was requeued as stale and claimed again meanwhile, ``attempts`` has moved
+    on and the late result is dropped instead of overwriting the new run.
+    """
+    job_id, attempt = job.id, job.attempts
+    payload = json.loads(job.payload)
+    items = payload["ingredients"]
+    language = detect_language(str(items[0]))
+    normalized = normalize_ingredients(items)
+    key = ai_cache.cache_key(language, normalized)
+
+    def produce():
+        return generate_recipe(items, language)
+
+    try:
+        if payload.get("regenerate"):
+            recipe = ai_cache.regenerate(key, language, normalized, produce)
+        else:
+            recipe, _ = ai_cache.generate_once(key, language, normalized, produce)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"AI job {job_id} failed: {e}")
+        outcome = {"status": "failed", "error": str(e)}
+    else:
+        outcome = {"status": "done", "result": json.dumps(recipe, ensure_ascii=False)}
+
+    written = AIJob.query.filter_by(id=job_id, status="running", attempts=attempt).update(
+        {**outcome, "finished_at": datetime.utcnow()}, synchronize_session=False
+    )
+    db.session.commit()
+    if not written:
+        current_app.logger.warning(f"AI job {job_id} was taken over; dropping attempt {attempt}")
+    ai_usage.flush()
+    return db.session.get(AIJob, job_id)
+
+
+def work(poll_interval=1.0, once=False):
+    """Worker loop behind ``flask ai-worker``; returns the number of jobs run."""
+    done = 0
+    requeue_stale()
+    while True:
+        job = claim_next()
+        if job is not None:
+            execute(job)
+            done += 1
+            continue
+        if once:
+            return done
+        time.sleep(poll_interval)
+        requeue_stale()
@@ -0,0 +1,109 @@
+# app/ai_usage.py
+"""
+Cost and latency reporting for OpenAI calls.
+
+Every call is recorded in the per-process registry (utils/ai_metrics).
+With AI_USAGE_LOG enabled the samples are also appended to ai_usage by
+flush(), which runs after each /api/ai request and job, so token totals
+per day cover all workers and survive restarts. Latency percentiles come
+from the last calls of the answering process.
+"""
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from . import ai_cache, db
+from .models import AIUsage
+from .utils import ai_metrics
+
+DEFAULT_DAYS = 7
+
+
+def _log_enabled():
+    default = os.getenv("AI_USAGE_LOG", "").lower() in ("1", "true", "yes")
+    return current_app.config.get("AI_USAGE_LOG", default)
+
+
+def flush():
+    """Write samples recorded since the last flush to ai_usage (if enabled)."""
+    pending = ai_metrics.drain_pending()
+    if not pending or not _log_enabled():
+        return 0
+    try:
+        # own transaction: don't commit or roll back the caller's session
+        with db.engine.begin() as conn:
+            conn.execute(AIUsage.__table__.insert(), pending)
+    except Exception as e:
+        current_app.logger.error(f"Error writing AI usage: {e}")
+        return 0
+    return len(pending)
+
+
+def _latency(samples):
+    values = [s["latency_ms"] for s in samples]
+    return {f"p{pct}": ai_metrics.percentile(values, pct) for pct in (50, 95, 99)}
+
+
+def _days_from_table(since):
+    day = db.func.date(AIUsage.created_at)
+    rows = (
+        db.session.query(
+            day,
+            db.func.count(AIUsage.id),
+            db.func.coalesce(db.func.sum(AIUsage.prompt_tokens), 0),
+            db.func.coalesce(db.func.sum(AIUsage.completion_tokens), 0),
+        )
+        .filter(AIUsage.created_at >= since)
+        .group_by(day)
+        .order_by(day)
+        .all()
+    )
+    return [
+        {"date": str(date), "calls": calls, "prompt_tokens": int(prompt),
+         "completion_tokens": int(completion)}
+        for date, calls, prompt, completion in rows
+    ]
+
+
+def _days_from_samples(samples, since):
+    days = {}
+    for s in samples:
+        if s["created_at"] < since:
+            continue
+        entry = days.setdefault(s["created_at"].date().isoformat(), {
+            "calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        })
+        entry["calls"] += 1
+        entry["prompt_tokens"] += s["prompt_tokens"] or 0
+        entry["completion_tokens"] += s["completion_tokens"] or 0
+    return [{"date": date, **entry} for date, entry in sorted(days.items())]
+
+
+def report(days=DEFAULT_DAYS):
+    """Latency percentiles, outcomes, tokens per day and cache effectiveness."""
+    flush()
+    samples = ai_metrics.samples()
+    ok = [s for s in samples if s["outcome"] == "ok"]
+    since = datetime.combine(datetime.utcnow().date() - timedelta(days=days - 1), datetime.min.time())
+    from_table = _log_enabled()
+    outcomes = ai_metrics.totals()
+    cache = ai_cache.stats()
+    return {
+        "pid": os.getpid(),
+        "samples": len(samples),
+        "latency_ms": _latency(ok),
+        "latency_ms_by_kind": {
+            kind: _latency([s for s in ok if s["kind"] == kind])
+            for kind in sorted({s["kind"] for s in ok})
+        },
+        "outcomes": outcomes,
+        "tokens_source": "table" if from_table else "memory",
+        "days": _days_from_table(since) if from_table else _days_from_samples(samples, since),
+        "cache": {
+            "entries": cache["cache_entries"],
+            "hits": cache["cache_hits"],
+            "model_calls": sum(outcomes.values()),
+            "saved_calls": cache["saved_calls"],
+        },
+    }
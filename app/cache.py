@@ -0,0 +1,391 @@
+# app/cache.py
+"""
+Response cache for hot, rarely-changing JSON reads.
+
+Views opt in with ``@response_cache.cached(tags=...)``. Each entry is tagged
+(e.g. ``recipe:{rid}``, ``recipes``) and write routes call
+``response_cache.invalidate(...)`` with the tags they affect, so only the
+matching entries are dropped.
+
+Storage is pluggable (RESPONSE_CACHE_BACKEND):
+
+* ``sqlite`` (default) — a WAL-mode SQLite file shared by every gunicorn
+  worker on the host, so an invalidation in one worker is seen by all.
+* ``memory`` — a per-process LRU; fine for tests and single-worker runs.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+from flask_login import current_user
+
+
+class CacheBackend:
+    """Interface every cache store implements. Values are bytes."""
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, tags=(), ttl=None):
+        raise NotImplementedError
+
+    def invalidate(self, *tags):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """Thread-safe LRU bounded by entry count and total bytes, with per-entry TTL."""
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()   # key -> (value, expires_at, tags)
+        self._tags = {}                 # tag -> set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, tags=(), ttl=None):
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, frozenset(tags))
+            self._bytes += len(value)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "pid": os.getpid(),
+            }
+
+    def _remove(self, key):
+        value, _, tags = self._entries.pop(key)
+        self._bytes -= len(value)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class SQLiteCache(CacheBackend):
+    """LRU-ish cache in a WAL-mode SQLite file shared by all local processes.
+
+    Each thread (and each forked worker) opens its own connection. Hit/miss
+    counters are per process; entry and byte totals are shared.
+    """
+
+    # accessed_at is refreshed at most this often, to keep hits read-mostly
+    TOUCH_INTERVAL = 1.0
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS cache_entry (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS ix_cache_entry_accessed ON cache_entry (accessed_at)",
+        "CREATE INDEX IF NOT EXISTS ix_cache_entry_expires ON cache_entry (expires_at)",
+        """CREATE TABLE IF NOT EXISTS cache_tag (
+            tag TEXT NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (tag, key)
+        )""",
+        "CREATE INDEX IF NOT EXISTS ix_cache_tag_key ON cache_tag (key)",
+    )
+
+    def __init__(self, path, max_entries=1024, max_bytes=32 * 1024 * 1024, default_ttl=300):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        with self._connect() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entry WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < now:
+            if row is not None:
+                self._delete_keys(conn, [key])
+            self._count("misses")
+            return None
+        if now - row[2] > self.TOUCH_INTERVAL:
+            conn.execute("UPDATE cache_entry SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return bytes(row[0])
+
+    def set(self, key, value, tags=(), ttl=None):
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache_tag WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entry (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), expires_at, now),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_tag (tag, key) VALUES (?, ?)",
+                [(tag, key) for tag in tags],
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn, now):
+        expired = [k for (k,) in conn.execute(
+            "SELECT key FROM cache_entry WHERE expires_at < ?", (now,)
+        )]
+        self._delete_keys(conn, expired)
+
+        entries, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry"
+        ).fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache_entry ORDER BY accessed_at"):
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append(key)
+            entries, total = entries - 1, total - size
+        self._delete_keys(conn, victims)
+        with self._lock:
+            self.evictions += len(victims)
+
+    @staticmethod
+    def _delete_keys(conn, keys):
+        if not keys:
+            return
+        conn.executemany("DELETE FROM cache_entry WHERE key = ?", [(k,) for k in keys])
+        conn.executemany("DELETE FROM cache_tag WHERE key = ?", [(k,) for k in keys])
+
+    def invalidate(self, *tags):
+        if not tags:
+            return
+        conn = self._connect()
+        marks = ", ".join("?" * len(tags))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            keys = [k for (k,) in conn.execute(
+                f"SELECT DISTINCT key FROM cache_tag WHERE tag IN ({marks})", tags
+            )]
+            self._delete_keys(conn, keys)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_entry")
+        conn.execute("DELETE FROM cache_tag")
+
+    def stats(self):
+        entries, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry"
+        ).fetchone()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": total,
+                "pid": os.getpid(),
+            }
+
+
+def _memory_backend(app):
+    return LRUCache(
+        max_entries=app.config["RESPONSE_CACHE_MAX_ENTRIES"],
+        max_bytes=app.config["RESPONSE_CACHE_MAX_BYTES"],
+        default_ttl=app.config["RESPONSE_CACHE_TTL"],
+    )
+
+
+def _sqlite_backend(app):
+    path = app.config.get("RESPONSE_CACHE_PATH") or os.path.join(
+        app.instance_path, "response_cache.sqlite3"
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return SQLiteCache(
+        path,
+        max_entries=app.config["RESPONSE_CACHE_MAX_ENTRIES"],
+        max_bytes=app.config["RESPONSE_CACHE_MAX_BYTES"],
+        default_ttl=app.config["RESPONSE_CACHE_TTL"],
+    )
+
+
+# name -> factory(app); a Redis adapter only needs an entry here
+BACKENDS = {
+    "memory": _memory_backend,
+    "sqlite": _sqlite_backend,
+}
+
+
+class ResponseCache:
+    """Flask extension wiring the configured backend to view decorators."""
+
+    def init_app(self, app):
+        app.config.setdefault("RESPONSE_CACHE_ENABLED", True)
+        app.config.setdefault("RESPONSE_CACHE_BACKEND", os.environ.get("RESPONSE_CACHE_BACKEND", "sqlite"))
+        app.config.setdefault("RESPONSE_CACHE_PATH", os.environ.get("RESPONSE_CACHE_PATH"))
+        app.config.setdefault("RESPONSE_CACHE_MAX_ENTRIES", 1024)
+        app.config.setdefault("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+        app.config.setdefault("RESPONSE_CACHE_TTL", 300)
+
+        backend = app.config["RESPONSE_CACHE_BACKEND"]
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+        app.extensions["response_cache"] = BACKENDS[backend](app)
+
+    @property
+    def store(self):
+        return current_app.extensions["response_cache"]
+
+    def cached(self, tags=(), vary_user=False, ttl=None):
+        """Cache successful JSON responses of a view.
+
+        ``tags`` are format strings filled from the view arguments, e.g.
+        ``"recipe:{rid}"``. With ``vary_user`` the key includes the user id.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not current_app.config["RESPONSE_CACHE_ENABLED"]:
+                    return view(*args, **kwargs)
+
+                key = self._key(vary_user)
+                try:
+                    body = self.store.get(key)
+                except Exception as e:
+                    # fail open: a broken cache must not break the read
+                    current_app.logger.error(f"Response cache read failed: {e}")
+                    return view(*args, **kwargs)
+                if body is not None:
+                    response = current_app.response_class(body, mimetype="application/json")
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code == 200 and response.is_json:
+                    entry_tags = [tag.format(**request.view_args) for tag in tags]
+                    try:
+                        self.store.set(key, response.get_data(), entry_tags, ttl)
+                    except Exception as e:
+                        current_app.logger.error(f"Response cache write failed: {e}")
+                    else:
+                        response.headers["X-Cache"] = "MISS"
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        # Called after the write has been committed; a cache failure must not
+        # turn it into an error. Missed entries still expire by TTL.
+        try:
+            self.store.invalidate(*tags)
+        except Exception as e:
+            current_app.logger.error(f"Response cache invalidation of {tags} failed: {e}")
+
+    def clear(self):
+        try:
+            self.store.clear()
+        except Exception as e:
+            current_app.logger.error(f"Response cache clear failed: {e}")
+
+    def stats(self):
+        return self.store.stats()
+
+    @staticmethod
+    def _key(vary_user):
+        parts = [
+            request.endpoint,
+            repr(sorted(request.view_args.items())),
+            repr(sorted(request.args.items(multi=True))),
+        ]
+        if vary_user:
+            parts.append(str(current_user.id) if current_user.is_authenticated else "anon")
+        return "|".join(parts)
+
+
+response_cache = ResponseCache()
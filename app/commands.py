@@ -0,0 +1,144 @@
+# app/commands.py
+"""Maintenance commands registered on the ``flask`` CLI."""
+import click
+from flask.cli import AppGroup, with_appcontext
+
+from . import ai_jobs, db
+from .cache import response_cache
+from .dedupe import DEFAULT_BATCH_SIZE as DEDUPE_BATCH_SIZE, dedupe_recipes
+from .importer import DEFAULT_BATCH_SIZE, import_recipes, iter_records
+from .models import Recipe, Rating, User
+from .mealdb_sync import FixtureSource, LiveSource, RecordingSource, sync_mealdb
+from .stats import mark_user_activity, refresh_admin_stats
+from .utils.mealdb_client import get_mealdb_client
+
+ratings_cli = AppGroup("ratings", help="Maintain denormalized rating aggregates.")
+stats_cli = AppGroup("stats", help="Maintain the admin statistics snapshot.")
+recipes_cli = AppGroup("recipes", help="Bulk recipe maintenance.")
+mealdb_cli = AppGroup("mealdb", help="Maintain the local MealDB mirror.")
+
+
+@ratings_cli.command("check")
+@click.option("--fix", is_flag=True, help="Recompute the aggregates that are out of sync.")
+def check_ratings(fix):
+    """Compare recipe.rating_sum/rating_count with the rating table."""
+    actual = (
+        db.session.query(
+            Rating.recipe_id,
+            db.func.sum(Rating.value).label("total"),
+            db.func.count(Rating.id).label("count"),
+        )
+        .group_by(Rating.recipe_id)
+        .subquery()
+    )
+    total = db.func.coalesce(actual.c.total, 0)
+    count = db.func.coalesce(actual.c.count, 0)
+    mismatches = (
+        db.session.query(Recipe.id, Recipe.rating_sum, Recipe.rating_count, total, count)
+        .outerjoin(actual, actual.c.recipe_id == Recipe.id)
+        .filter((Recipe.rating_sum != total) | (Recipe.rating_count != count))
+        .order_by(Recipe.id)
+        .all()
+    )
+
+    for rid, stored_sum, stored_count, real_sum, real_count in mismatches:
+        click.echo(
+            f"recipe {rid}: stored {stored_sum}/{stored_count}, actual {real_sum}/{real_count}"
+        )
+
+    if not mismatches:
+        click.echo("All rating aggregates are consistent.")
+        return
+
+    if fix:
+        Recipe.refresh_rating_aggregates([row[0] for row in mismatches])
+        db.session.commit()
+        click.echo(f"Fixed {len(mismatches)} recipe(s).")
+    else:
+        raise click.ClickException(
+            f"{len(mismatches)} recipe(s) out of sync; rerun with --fix to repair."
+        )
+
+
+@stats_cli.command("refresh")
+@click.option("--full", is_flag=True, help="Recount every user, not only the ones flagged dirty.")
+def refresh_stats(full):
+    """Refresh the admin totals and the active-users leaderboard."""
+    recounted = refresh_admin_stats(full=full)
+    click.echo(f"Admin stats refreshed ({recounted} user(s) recounted).")
+
+
+@recipes_cli.command("dedupe")
+@click.option("--batch-size", default=DEDUPE_BATCH_SIZE, show_default=True, type=click.IntRange(1),
+              help="Duplicate groups merged per transaction.")
+@click.option("--dry-run", is_flag=True, help="Only report what would be merged.")
+def dedupe(batch_size, dry_run):
+    """Merge external recipes sharing an external_id into the oldest copy."""
+    def progress(report):
+        click.echo(f"  {report.groups} group(s) processed, {report.recipes} duplicate(s)")
+
+    report = dedupe_recipes(batch_size=batch_size, dry_run=dry_run, progress=progress)
+    if dry_run:
+        click.echo(f"Dry run, nothing changed: {report.summary()}.")
+        return
+    if report.groups:
+        response_cache.clear()
+    click.echo(f"Dedupe finished: {report.summary()}.")
+
+
+@mealdb_cli.command("sync")
+@click.option("--fixtures", type=click.Path(exists=True, file_okay=False),
+              help="Replay recorded responses from this directory instead of calling MealDB.")
+@click.option("--record", type=click.Path(file_okay=False),
+              help="Save every MealDB response into this directory while syncing.")
+@click.option("--letters", default="abcdefghijklmnopqrstuvwxyz", show_default=True,
+              help="First letters of the meal names to walk.")
+@click.option("--prune", is_flag=True,
+              help="Delete mirrored meals of the walked letters no longer returned upstream.")
+def sync_meals(fixtures, record, letters, prune):
+    """Mirror MealDB categories, areas, ingredients and meals into local tables."""
+    if fixtures and record:
+        raise click.UsageError("--fixtures and --record are mutually exclusive.")
+    if fixtures:
+        source = FixtureSource(fixtures)
+    else:
+        source = LiveSource(get_mealdb_client())
+        if record:
+            source = RecordingSource(source, record)
+
+    report = sync_mealdb(source, letters=letters.lower(), prune=prune)
+    click.echo(f"MealDB mirror synced: {report.summary()}.")
+
+
+@recipes_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--owner", help="E-mail of the user the recipes belong to (default: first admin).")
+@click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True, type=click.IntRange(1))
+def import_dump(path, owner, batch_size):
+    """Stream recipes from a JSON/NDJSON dump or MealDB payload into the database."""
+    if owner:
+        user = User.query.filter_by(email=owner).first()
+    else:
+        user = User.query.filter_by(is_admin=True).order_by(User.id).first()
+    if user is None:
+        raise click.ClickException("Owner not found; pass --owner with an existing e-mail.")
+
+    def progress(report):
+        click.echo(f"  {report.inserted} inserted ({report.rate:.0f} recipes/s)")
+
+    report = import_recipes(iter_records(path), user.id, batch_size=batch_size, progress=progress)
+    mark_user_activity(user.id)
+    db.session.commit()
+    response_cache.invalidate("recipes")
+    click.echo(f"Import finished: {report.summary()}.")
+
+
+@click.command("ai-worker")
+@click.option("--poll-interval", default=1.0, show_default=True, type=click.FloatRange(0.1),
+              help="Seconds to sleep when the queue is empty.")
+@click.option("--once", is_flag=True, help="Exit once the queue is empty.")
+@with_appcontext
+def ai_worker(poll_interval, once):
+    """Run queued /api/ai/jobs generations."""
+    done = ai_jobs.work(poll_interval=poll_interval, once=once)
+    click.echo(f"Processed {done} AI job(s).")
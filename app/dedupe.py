@@ -0,0 +1,172 @@
+# app/dedupe.py
+"""
+Merge duplicate external recipes (``flask recipes dedupe``).
+
+Every external_id group keeps its oldest copy (lowest id, the same rule the
+uq_recipe_external_id migration applies). Per batch of groups, with a fixed
+number of statements regardless of how many rows are involved:
+
+* ratings/favorites: a user keeps only their newest row across the group;
+* ratings, favorites and comments of the other copies move to the keeper
+  (UPDATE ... FROM a duplicate -> keeper mapping);
+* the other copies and their ingredients are deleted;
+* the keepers' rating aggregates are recomputed.
+
+Deletes use IN/EXISTS subqueries rather than DELETE ... USING, which SQLite
+does not support. Each batch commits on its own, and a merged group no
+longer shows up as a duplicate, so the job can be interrupted and rerun.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import and_, delete, exists, func, select, update
+from sqlalchemy.orm import aliased
+
+from . import db
+from .models import Comment, Favorite, Ingredient, Rating, Recipe
+from .stats import mark_user_activity
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class DedupeReport:
+    groups: int = 0
+    recipes: int = 0
+    dropped_ratings: int = 0
+    dropped_favorites: int = 0
+    moved_ratings: int = 0
+    moved_favorites: int = 0
+    moved_comments: int = 0
+
+    def add(self, other):
+        for name in self.__dataclass_fields__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def summary(self):
+        return (
+            f"{self.groups} group(s), {self.recipes} duplicate recipe(s) removed; "
+            f"ratings {self.moved_ratings} moved / {self.dropped_ratings} dropped, "
+            f"favorites {self.moved_favorites} moved / {self.dropped_favorites} dropped, "
+            f"{self.moved_comments} comment(s) moved"
+        )
+
+
+def duplicate_groups(limit, after=None):
+    """Next ``limit`` external_ids with more than one external recipe, in order."""
+    query = (
+        db.session.query(Recipe.external_id)
+        .filter(Recipe.is_external == True, Recipe.external_id.isnot(None))
+        .group_by(Recipe.external_id)
+        .having(func.count(Recipe.id) > 1)
+        .order_by(Recipe.external_id)
+    )
+    if after is not None:
+        query = query.filter(Recipe.external_id > after)
+    return [eid for (eid,) in query.limit(limit)]
+
+
+def _duplicate_map(external_ids):
+    """(dup_id, keeper_id) for every non-keeper copy in the given groups."""
+    dup, keeper = aliased(Recipe), aliased(Recipe)
+    return (
+        select(dup.id.label("dup_id"), func.min(keeper.id).label("keeper_id"))
+        .join(keeper, and_(
+            keeper.external_id == dup.external_id,
+            keeper.is_external == True,
+            keeper.id < dup.id,
+        ))
+        .where(dup.is_external == True, dup.external_id.in_(external_ids))
+        .group_by(dup.id)
+        .subquery()
+    )
+
+
+def _superseded(model, external_ids):
+    """Ids of rows a user has a newer copy of elsewhere in the same group."""
+    row, newer = aliased(model), aliased(model)
+    own, other = aliased(Recipe), aliased(Recipe)
+    newer_exists = (
+        exists()
+        .where(
+            newer.user_id == row.user_id,
+            newer.id > row.id,
+            newer.recipe_id == other.id,
+            other.external_id == own.external_id,
+            other.is_external == True,
+        )
+    )
+    return (
+        select(row.id)
+        .join(own, own.id == row.recipe_id)
+        .where(own.is_external == True, own.external_id.in_(external_ids), newer_exists)
+    )
+
+
+def _count(stmt):
+    return db.session.scalar(select(func.count()).select_from(stmt.subquery()))
+
+
+def merge_groups(external_ids, dry_run=False):
+    """Merge one batch of groups; returns its DedupeReport. Commits unless ``dry_run``."""
+    report = DedupeReport(groups=len(external_ids))
+    mapping = _duplicate_map(external_ids)
+    dup_ids = select(mapping.c.dup_id)
+    keeper_ids = list(db.session.scalars(select(mapping.c.keeper_id).distinct()))
+
+    report.recipes = _count(dup_ids)
+    report.dropped_ratings = _count(_superseded(Rating, external_ids))
+    report.dropped_favorites = _count(_superseded(Favorite, external_ids))
+
+    if dry_run:
+        # What would move: rows on duplicate copies that survive the drop step
+        for model, name in ((Rating, "ratings"), (Favorite, "favorites"), (Comment, "comments")):
+            moved = select(model.id).where(model.recipe_id.in_(dup_ids))
+            if model is not Comment:
+                moved = moved.where(model.id.not_in(_superseded(model, external_ids)))
+            setattr(report, f"moved_{name}", _count(moved))
+        db.session.rollback()
+        return report
+
+    touched_users = set(db.session.scalars(
+        select(Rating.user_id).where(Rating.id.in_(_superseded(Rating, external_ids)))
+        .union(select(Favorite.user_id).where(Favorite.id.in_(_superseded(Favorite, external_ids))))
+    ))
+    for model in (Rating, Favorite):
+        db.session.execute(
+            delete(model).where(model.id.in_(_superseded(model, external_ids))),
+            execution_options={"synchronize_session": False},
+        )
+
+    for model, name in ((Rating, "ratings"), (Favorite, "favorites"), (Comment, "comments")):
+        result = db.session.execute(
+            update(model)
+            .where(model.recipe_id == mapping.c.dup_id)
+            .values(recipe_id=mapping.c.keeper_id),
+            execution_options={"synchronize_session": False},
+        )
+        setattr(report, f"moved_{name}", result.rowcount)
+
+    for model, column in ((Ingredient, Ingredient.recipe_id), (Recipe, Recipe.id)):
+        db.session.execute(
+            delete(model).where(column.in_(dup_ids)),
+            execution_options={"synchronize_session": False},
+        )
+
+    Recipe.refresh_rating_aggregates(keeper_ids)
+    mark_user_activity(*touched_users)
+    db.session.commit()
+    return report
+
+
+def dedupe_recipes(batch_size=DEFAULT_BATCH_SIZE, dry_run=False, progress=None):
+    """Merge every duplicate group, ``batch_size`` groups per transaction."""
+    total = DedupeReport()
+    after = None
+    while True:
+        batch = duplicate_groups(batch_size, after)
+        if not batch:
+            return total
+        total.add(merge_groups(batch, dry_run=dry_run))
+        after = batch[-1]
+        if progress:
+            progress(total)
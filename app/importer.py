@@ -0,0 +1,254 @@
+# app/importer.py
+"""
+Bulk recipe importer behind ``flask recipes import``.
+
+Streams a local dump instead of going through /import-external-recipe one
+request at a time. Accepted inputs:
+
+* NDJSON (``.ndjson`` / ``.jsonl``), one record per line;
+* a JSON array, decoded element by element so the file is never loaded whole;
+* a MealDB response object (``{"meals": [...]}``), e.g. a recorded fixture.
+
+Records are raw MealDB meals (``idMeal``...) or the payload shape the import
+endpoint accepts (``externalId``, ``title``, ``ingredients``...). Records
+without an external id are seeded as regular recipes of the owner.
+
+Each batch is one multi-row INSERT ... RETURNING for recipes and an
+executemany (COPY on PostgreSQL) for ingredients, committed per batch.
+External recipes go through INSERT ... ON CONFLICT DO NOTHING, so external
+ids already in the database (even ones a concurrent import just wrote) or
+earlier in the file are skipped, and an interrupted import can simply be
+rerun.
+"""
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass
+
+from . import db
+from .models import Ingredient, Recipe, dialect_insert
+from .utils.mealdb_client import meal_to_recipe
+
+DEFAULT_BATCH_SIZE = 1000
+_READ_CHUNK = 1 << 16
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    ingredients: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self):
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"{self.read} read, {self.inserted} inserted, {self.duplicates} duplicates, "
+            f"{self.invalid} invalid, {self.ingredients} ingredients "
+            f"in {self.elapsed:.2f}s ({self.rate:.0f} recipes/s)"
+        )
+
+
+# ── reading ─────────────────────────────────────────────────────
+def _iter_json_array(f, buffer):
+    """Yield the elements of a top-level JSON array without loading it all."""
+    decoder = json.JSONDecoder()
+    pos = buffer.index("[") + 1
+    while True:
+        # skip separators, pulling more text when the buffer runs dry
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                break
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                raise ValueError("Unterminated JSON array")
+            buffer, pos = chunk, 0
+        if buffer[pos] == "]":
+            return
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError:
+                chunk = f.read(_READ_CHUNK)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+        yield item
+        pos = end
+
+
+def iter_records(path):
+    """Records from an NDJSON file, a JSON array or a MealDB ``{"meals": [...]}`` payload."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        head = f.read(_READ_CHUNK)
+        stripped = head.lstrip()
+        if stripped.startswith("["):
+            yield from _iter_json_array(f, stripped)
+        elif stripped.startswith("{"):
+            payload = json.loads(head + f.read())
+            yield from payload.get("meals") or payload.get("recipes") or []
+        elif stripped:
+            raise ValueError(f"{path}: expected a JSON array, object or NDJSON")
+
+
+def normalize(record):
+    """Import payload for a raw MealDB meal or an already-shaped recipe."""
+    if "idMeal" in record:
+        record = meal_to_recipe(record)
+    if not record.get("title") or not record.get("instructions"):
+        return None
+    return record
+
+
+# ── writing ─────────────────────────────────────────────────────
+def _copy_ingredients(rows):
+    """PostgreSQL COPY for the ingredient rows of one batch."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow((row["recipe_id"], row["name"], row["measure"] or ""))
+    buf.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY ingredient (recipe_id, name, measure) FROM STDIN WITH (FORMAT csv)", buf
+        )
+    finally:
+        cursor.close()
+
+
+def _recipe_row(r, owner_id):
+    return {
+        "title": r["title"][:120],
+        "category": r.get("category"),
+        "area": r.get("area"),
+        "instructions": r["instructions"],
+        "image_url": r.get("imageUrl"),
+        "user_id": owner_id,
+        "is_external": bool(r.get("externalId")),
+        "external_id": r.get("externalId"),
+    }
+
+
+def _insert_external(recipes, owner_id):
+    """Shared MealDB copies; returns {external_id: recipe_id} for the rows inserted.
+
+    ON CONFLICT DO NOTHING against uq_recipe_external_id, so ids that already
+    exist - or that a concurrent import writes meanwhile - are skipped
+    instead of aborting the batch.
+    """
+    if not recipes:
+        return {}
+    stmt = (
+        dialect_insert(Recipe)
+        .on_conflict_do_nothing(
+            index_elements=[Recipe.external_id],
+            index_where=Recipe.is_external == True,
+        )
+        .returning(Recipe.external_id, Recipe.id)
+    )
+    rows = db.session.execute(stmt, [_recipe_row(r, owner_id) for r in recipes])
+    return {external_id: recipe_id for external_id, recipe_id in rows}
+
+
+def _insert_local(recipes, owner_id, dialect):
+    """Recipes without an external id; returns their ids in input order."""
+    if not recipes:
+        return []
+    # SQLAlchemy can only keep RETURNING in parameter order on SQLite by
+    # inserting row by row; SQLite hands out increasing rowids to a single
+    # writer anyway, so batch there and sort the ids instead.
+    ordered = dialect != "sqlite"
+    ids = db.session.scalars(
+        Recipe.__table__.insert().returning(Recipe.id, sort_by_parameter_order=ordered),
+        [_recipe_row(r, owner_id) for r in recipes],
+    ).all()
+    if not ordered:
+        ids.sort()
+    return ids
+
+
+def _flush_batch(batch, owner_id, report, dialect):
+    external = [r for r in batch if r.get("externalId")]
+    local = [r for r in batch if not r.get("externalId")]
+
+    external_ids = _insert_external(external, owner_id)
+    inserted = [(external_ids[r["externalId"]], r) for r in external
+                if r["externalId"] in external_ids]
+    inserted += zip(_insert_local(local, owner_id, dialect), local)
+    report.duplicates += len(external) - len(external_ids)
+
+    ingredient_rows = [
+        {
+            "recipe_id": recipe_id,
+            "name": ing["name"][:120],
+            "measure": (ing.get("measure") or "")[:80] or None,
+        }
+        for recipe_id, r in inserted
+        for ing in r.get("ingredients") or []
+        if ing.get("name")
+    ]
+    if ingredient_rows:
+        if dialect == "postgresql":
+            _copy_ingredients(ingredient_rows)
+        else:
+            db.session.execute(Ingredient.__table__.insert(), ingredient_rows)
+
+    db.session.commit()
+    report.inserted += len(inserted)
+    report.ingredients += len(ingredient_rows)
+
+
+def import_recipes(records, owner_id, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Insert ``records`` in batches; returns an ImportReport.
+
+    ``progress`` is called with the running report after every batch.
+    """
+    report = ImportReport()
+    dialect = db.session.get_bind().dialect.name
+    started = time.perf_counter()
+    seen = set()
+    batch = []
+
+    for record in records:
+        report.read += 1
+        recipe = normalize(record)
+        if recipe is None:
+            report.invalid += 1
+            continue
+        external_id = recipe.get("externalId")
+        if external_id:
+            external_id = str(external_id)
+            if external_id in seen:
+                report.duplicates += 1
+                continue
+            seen.add(external_id)
+            recipe["externalId"] = external_id
+        batch.append(recipe)
+
+        if len(batch) >= batch_size:
+            _flush_batch(batch, owner_id, report, dialect)
+            batch = []
+            report.elapsed = time.perf_counter() - started
+            if progress:
+                progress(report)
+
+    if batch:
+        _flush_batch(batch, owner_id, report, dialect)
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,204 @@
+# app/mealdb_sync.py
+"""
+Local mirror of the MealDB catalog.
+
+``flask mealdb sync`` copies categories, areas, the ingredient catalog and
+every meal (walked via search.php?f=<letter>) into the mealdb_* tables.
+Meals whose upstream record hashes to the stored content_hash are skipped,
+so a periodic run only writes what actually changed. The external
+endpoints then answer from these tables instead of calling themealdb.com.
+
+Sources only need ``get_json(path)``: LiveSource (the shared client,
+uncached), FixtureSource replaying files recorded with ``--record``
+(offline runs and tests), or RecordingSource wrapping the live one.
+"""
+import hashlib
+import json
+import os
+import re
+import string
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from . import db
+from .models import (
+    MealDBArea, MealDBCategory, MealDBIngredient, MealDBMeal, MealDBMealIngredient,
+)
+from .utils.mealdb_client import meal_ingredients
+
+
+def _fixture_name(path):
+    # "search.php?f=a" -> "search.php_f=a.json"
+    return re.sub(r"[^A-Za-z0-9_.=-]", "_", path) + ".json"
+
+
+class FixtureSource:
+    """Replays responses saved by RecordingSource from a directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_json(self, path):
+        with open(os.path.join(self.directory, _fixture_name(path)), encoding="utf-8") as f:
+            return json.load(f)
+
+
+class LiveSource:
+    """The shared MealDB client with its response cache bypassed."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_json(self, path):
+        return self.client.get_json(path, use_cache=False)
+
+
+class RecordingSource:
+    """Wraps another source and saves every response for FixtureSource."""
+
+    def __init__(self, source, directory):
+        self.source = source
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_json(self, path):
+        payload = self.source.get_json(path)
+        with open(os.path.join(self.directory, _fixture_name(path)), "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1, sort_keys=True)
+        return payload
+
+
+@dataclass
+class SyncReport:
+    categories: int = 0
+    areas: int = 0
+    ingredients: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    pruned: int = 0
+    seen: set = field(default_factory=set, repr=False)
+
+    def summary(self):
+        return (
+            f"{self.categories} categories, {self.areas} areas, {self.ingredients} ingredients; "
+            f"meals: {self.inserted} new, {self.updated} updated, {self.unchanged} unchanged, "
+            f"{self.pruned} pruned"
+        )
+
+
+def content_hash(meal):
+    return hashlib.sha256(json.dumps(meal, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _replace_all(model, rows):
+    """Small lookup tables are cheaper to rewrite than to diff."""
+    model.query.delete()
+    if rows:
+        db.session.execute(db.insert(model), rows)
+    return len(rows)
+
+
+def _sync_catalogs(source, report):
+    categories = source.get_json("categories.php").get("categories") or []
+    report.categories = _replace_all(MealDBCategory, [
+        {
+            "id": c["idCategory"],
+            "name": c["strCategory"],
+            "thumb": c.get("strCategoryThumb"),
+            "description": c.get("strCategoryDescription"),
+        }
+        for c in categories
+    ])
+
+    areas = source.get_json("list.php?a=list").get("meals") or []
+    report.areas = _replace_all(MealDBArea, [{"name": a["strArea"]} for a in areas])
+
+    ingredients = source.get_json("list.php?i=list").get("meals") or []
+    report.ingredients = _replace_all(MealDBIngredient, [
+        {
+            "id": i["idIngredient"],
+            "name": i["strIngredient"],
+            "description": i.get("strDescription"),
+            "type": i.get("strType"),
+        }
+        for i in ingredients
+    ])
+
+
+def _apply_meal(meal, digest, existing, now):
+    fields = {
+        "name": meal["strMeal"],
+        "category": meal.get("strCategory"),
+        "area": meal.get("strArea"),
+        "instructions": meal.get("strInstructions"),
+        "thumb": meal.get("strMealThumb"),
+        "tags": meal.get("strTags"),
+        "youtube": meal.get("strYoutube"),
+        "content_hash": digest,
+        "synced_at": now,
+    }
+    if existing:
+        MealDBMeal.query.filter_by(id=meal["idMeal"]).update(fields, synchronize_session=False)
+        MealDBMealIngredient.query.filter_by(meal_id=meal["idMeal"]).delete(
+            synchronize_session=False
+        )
+    else:
+        db.session.execute(db.insert(MealDBMeal), [{"id": meal["idMeal"], **fields}])
+
+    rows = [
+        {"meal_id": meal["idMeal"], "position": pos, "name": name, "measure": measure}
+        for pos, (name, measure) in enumerate(meal_ingredients(meal))
+    ]
+    if rows:
+        db.session.execute(db.insert(MealDBMealIngredient), rows)
+
+
+def sync_mealdb(source, letters=string.ascii_lowercase, prune=False):
+    """Mirror the catalog from ``source``; commits once per letter. Returns a SyncReport."""
+    report = SyncReport()
+    _sync_catalogs(source, report)
+    db.session.commit()
+
+    stored_meals = db.session.query(MealDBMeal.id, MealDBMeal.content_hash, MealDBMeal.name).all()
+    hashes = {mid: digest for mid, digest, _ in stored_meals}
+    now = datetime.utcnow()
+    for letter in letters:
+        for meal in source.get_json(f"search.php?f={letter}").get("meals") or []:
+            meal_id = meal["idMeal"]
+            if meal_id in report.seen:
+                continue
+            report.seen.add(meal_id)
+
+            digest = content_hash(meal)
+            stored = hashes.get(meal_id)
+            if stored == digest:
+                report.unchanged += 1
+                continue
+            _apply_meal(meal, digest, stored is not None, now)
+            hashes[meal_id] = digest
+            if stored is None:
+                report.inserted += 1
+            else:
+                report.updated += 1
+        db.session.commit()
+
+    if prune:
+        # A meal can only be missing from the letters that were walked; after
+        # a partial run (--letters ab) the rest of the mirror is left alone.
+        # A full walk also prunes names that start with no letter at all.
+        walked = set(letters.lower())
+        full_walk = set(string.ascii_lowercase) <= walked
+        gone = [
+            mid for mid, _, name in stored_meals
+            if mid not in report.seen and (full_walk or (name or "")[:1].lower() in walked)
+        ]
+        for start in range(0, len(gone), 500):
+            chunk = gone[start:start + 500]
+            MealDBMealIngredient.query.filter(MealDBMealIngredient.meal_id.in_(chunk)).delete(
+                synchronize_session=False
+            )
+            MealDBMeal.query.filter(MealDBMeal.id.in_(chunk)).delete(synchronize_session=False)
+        report.pruned = len(gone)
+        db.session.commit()
+    return report
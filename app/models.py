@@ -1,13 +1,22 @@
 from datetime import datetime
+import json
 import uuid
 import os
 
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from flask import url_for
+from sqlalchemy.dialects import postgresql, sqlite
 
 from . import db
 
+
+def dialect_insert(model):
+    """INSERT for the bound database that supports ON CONFLICT (PostgreSQL / SQLite)."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
 # ───────────────────────────────────────────────────────────────
 #  Пользователь
 # ───────────────────────────────────────────────────────────────
@@ -74,6 +83,15 @@ class User(UserMixin, db.Model):
             "is_admin": self.is_admin,
         }
 
+    def to_brief_dict(self):
+        """Author block for comments: no url_for, safe to build in bulk."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "avatar": self.avatar,
+        }
+
 
 # ───────────────────────────────────────────────────────────────
 #  Рецепт
@@ -99,6 +117,10 @@ class Recipe(db.Model):
     is_external = db.Column(db.Boolean, default=False)
     external_id = db.Column(db.String(50))
 
+    # агрегаты рейтинга, обновляются в той же транзакции, что и Rating
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # отношения
     ingredients = db.relationship(
         "Ingredient", backref="recipe", lazy=True, cascade="all, delete-orphan"
@@ -113,10 +135,69 @@ class Recipe(db.Model):
         "Favorite", backref="recipe", lazy=True, cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # One shared copy per MealDB recipe; imports upsert against this index
+        db.Index(
+            "uq_recipe_external_id", "external_id",
+            unique=True,
+            sqlite_where=db.text("is_external = 1"),
+            postgresql_where=db.text("is_external = true"),
+        ),
+        db.Index("ix_recipe_user_external", "user_id", "is_external"),
+    )
+
+    # Поля карточки рецепта (?view=summary) — без instructions и связей
+    SUMMARY_FIELDS = (
+        "id", "title", "category", "area", "image_url",
+        "created_at", "user_id", "is_external", "external_id",
+        "rating_sum", "rating_count",
+    )
+
+    @classmethod
+    def summary_columns(cls):
+        return [getattr(cls, name) for name in cls.SUMMARY_FIELDS]
+
+    @staticmethod
+    def summary_to_dict(row):
+        """Serialize a row selected with summary_columns()."""
+        return {
+            "id": row.id,
+            "title": row.title,
+            "category": row.category,
+            "area": row.area,
+            "image_url": row.image_url,
+            "created_at": row.created_at.isoformat(),
+            "user_id": row.user_id,
+            "average_rating": row.rating_sum / row.rating_count if row.rating_count else 0,
+            "ratings_count": row.rating_count,
+            "is_external": row.is_external,
+            "external_id": row.external_id,
+        }
+
     def average_rating(self):
-        if not self.ratings:
+        if not self.rating_count:
             return 0
-        return sum(r.value for r in self.ratings) / len(self.ratings)
+        return self.rating_sum / self.rating_count
+
+    @classmethod
+    def refresh_rating_aggregates(cls, recipe_ids=None):
+        """Recompute aggregates from the rating table (all recipes if ids is None)."""
+        query = cls.query
+        if recipe_ids is not None:
+            if not recipe_ids:
+                return
+            query = query.filter(cls.id.in_(recipe_ids))
+        query.update(
+            {
+                cls.rating_sum: db.session.query(db.func.coalesce(db.func.sum(Rating.value), 0))
+                .filter(Rating.recipe_id == cls.id)
+                .scalar_subquery(),
+                cls.rating_count: db.session.query(db.func.count(Rating.id))
+                .filter(Rating.recipe_id == cls.id)
+                .scalar_subquery(),
+            },
+            synchronize_session=False,
+        )
 
     def to_dict(self):
         return {
@@ -131,7 +212,7 @@ class Recipe(db.Model):
             "author": self.author.to_dict(),
             "ingredients": [ing.to_dict() for ing in self.ingredients],
             "average_rating": self.average_rating(),
-            "ratings_count": len(self.ratings),
+            "ratings_count": self.rating_count,
             "is_external": self.is_external,
             "external_id": self.external_id,
         }
@@ -176,12 +257,16 @@ class Comment(db.Model):
         nullable=False,
     )
 
+    __table_args__ = (
+        db.Index("ix_comment_recipe_created", "recipe_id", "created_at"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
             "content": self.content,
             "created_at": self.created_at.isoformat(),
-            "user": self.user.to_dict(),
+            "user": self.user.to_brief_dict(),
         }
 
 
@@ -193,6 +278,7 @@ class Rating(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     value = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user_id = db.Column(
         db.Integer,
@@ -205,6 +291,11 @@ class Rating(db.Model):
         nullable=False,
     )
 
+    __table_args__ = (
+        db.UniqueConstraint("recipe_id", "user_id", name="uq_rating_recipe_user"),
+        db.Index("ix_rating_user_updated", "user_id", "updated_at"),
+    )
+
 
 # ───────────────────────────────────────────────────────────────
 #  Избранное
@@ -213,6 +304,7 @@ class Favorite(db.Model):
     __tablename__ = "favorite"
 
     id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(
         db.Integer,
         db.ForeignKey("user.id", name="fk_favorite_user", ondelete="CASCADE"),
@@ -224,6 +316,11 @@ class Favorite(db.Model):
         nullable=False,
     )
 
+    __table_args__ = (
+        db.UniqueConstraint("recipe_id", "user_id", name="uq_favorite_recipe_user"),
+        db.Index("ix_favorite_user_created", "user_id", "created_at"),
+    )
+
 
 # ───────────────────────────────────────────────────────────────
 #  External models (MealDB) — если нужны
@@ -279,7 +376,7 @@ class ExternalComment(db.Model):
             "id": self.id,
             "content": self.content,
             "created_at": self.created_at.isoformat(),
-            "user": self.user.to_dict(),
+            "user": self.user.to_brief_dict(),
         }
 
 
@@ -310,6 +407,10 @@ class ShoppingListItem(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_shopping_list_item_user_id", "user_id"),
+    )
+
     def to_dict(self):
         titles = self.recipe_titles.split('; ') if self.recipe_titles else []
         ids = self.recipe_ids.split('; ') if self.recipe_ids else []
@@ -348,3 +449,251 @@ class SharedShoppingList(db.Model):
             'token': self.token,
             'share_url': f"{frontend_url}/list/{self.token}"
         }
+
+
+# ───────────────────────────────────────────────────────────────
+#  Снимок статистики админки
+# ───────────────────────────────────────────────────────────────
+class AdminStats(db.Model):
+    """Single-row snapshot of the global totals shown in the admin panel."""
+    __tablename__ = "admin_stats"
+
+    id = db.Column(db.Integer, primary_key=True)
+    total_users = db.Column(db.Integer, nullable=False, default=0)
+    user_created_recipes = db.Column(db.Integer, nullable=False, default=0)
+    external_recipes = db.Column(db.Integer, nullable=False, default=0)
+    total_ratings = db.Column(db.Integer, nullable=False, default=0)
+    total_favorites = db.Column(db.Integer, nullable=False, default=0)
+    total_comments = db.Column(db.Integer, nullable=False, default=0)
+    average_rating = db.Column(db.Float, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "total_users": self.total_users,
+            "total_recipes": self.user_created_recipes + self.external_recipes,
+            "user_created_recipes": self.user_created_recipes,
+            "external_recipes": self.external_recipes,
+            "total_ratings": self.total_ratings,
+            "total_favorites": self.total_favorites,
+            "total_comments": self.total_comments,
+            "average_rating": self.average_rating,
+            "refreshed_at": self.refreshed_at.isoformat(),
+            "stale_seconds": int((datetime.utcnow() - self.refreshed_at).total_seconds()),
+        }
+
+
+class UserActivity(db.Model):
+    """Per-user counters behind the "most active users" leaderboard.
+
+    Write paths only flip ``dirty``; ``flask stats refresh`` recounts dirty rows.
+    """
+    __tablename__ = "user_activity"
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("user.id", name="fk_user_activity_user", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    recipes_count = db.Column(db.Integer, nullable=False, default=0)
+    ratings_count = db.Column(db.Integer, nullable=False, default=0)
+    favorites_count = db.Column(db.Integer, nullable=False, default=0)
+    comments_count = db.Column(db.Integer, nullable=False, default=0)
+    dirty = db.Column(db.Boolean, nullable=False, default=True)
+
+    user = db.relationship("User")
+
+    __table_args__ = (
+        db.Index("ix_user_activity_rank", "recipes_count", "ratings_count", "favorites_count"),
+        db.Index("ix_user_activity_dirty", "dirty"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.user_id,
+            "name": self.user.name,
+            "email": self.user.email,
+            "recipes_count": self.recipes_count,
+            "ratings_count": self.ratings_count,
+            "favorites_count": self.favorites_count,
+        }
+
+
+# ───────────────────────────────────────────────────────────────
+#  Локальное зеркало MealDB (flask mealdb sync)
+# ───────────────────────────────────────────────────────────────
+class MealDBCategory(db.Model):
+    __tablename__ = "mealdb_category"
+
+    id = db.Column(db.String(20), primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False)
+    thumb = db.Column(db.Text)
+    description = db.Column(db.Text)
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name}
+
+
+class MealDBArea(db.Model):
+    __tablename__ = "mealdb_area"
+
+    name = db.Column(db.String(80), primary_key=True)
+
+    def to_dict(self):
+        return {"name": self.name}
+
+
+class MealDBIngredient(db.Model):
+    __tablename__ = "mealdb_ingredient"
+
+    id = db.Column(db.String(20), primary_key=True)
+    name = db.Column(db.String(120), nullable=False)
+    description = db.Column(db.Text)
+    type = db.Column(db.String(80))
+
+
+class MealDBMeal(db.Model):
+    __tablename__ = "mealdb_meal"
+
+    id = db.Column(db.String(20), primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    category = db.Column(db.String(80))
+    area = db.Column(db.String(80))
+    instructions = db.Column(db.Text)
+    thumb = db.Column(db.Text)
+    tags = db.Column(db.Text)
+    youtube = db.Column(db.Text)
+    # sha256 of the upstream record; unchanged meals are skipped on sync
+    content_hash = db.Column(db.String(64), nullable=False)
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    ingredients = db.relationship(
+        "MealDBMealIngredient",
+        backref="meal",
+        lazy=True,
+        cascade="all, delete-orphan",
+        order_by="MealDBMealIngredient.position",
+    )
+
+    __table_args__ = (
+        db.Index("ix_mealdb_meal_category", "category"),
+        db.Index("ix_mealdb_meal_area", "area"),
+    )
+
+    def to_summary_dict(self):
+        return {"externalId": self.id, "title": self.name, "imageUrl": self.thumb}
+
+    def to_dict(self):
+        """Same shape the frontend posts to /import-external-recipe."""
+        return {
+            "externalId": self.id,
+            "title": self.name,
+            "category": self.category,
+            "area": self.area,
+            "instructions": self.instructions,
+            "imageUrl": self.thumb,
+            "ingredients": [ing.to_dict() for ing in self.ingredients],
+        }
+
+
+class MealDBMealIngredient(db.Model):
+    __tablename__ = "mealdb_meal_ingredient"
+
+    id = db.Column(db.Integer, primary_key=True)
+    meal_id = db.Column(
+        db.String(20),
+        db.ForeignKey("mealdb_meal.id", name="fk_mealdb_meal_ingredient_meal", ondelete="CASCADE"),
+        nullable=False,
+    )
+    position = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(120), nullable=False)
+    measure = db.Column(db.String(80))
+
+    __table_args__ = (
+        db.Index("ix_mealdb_meal_ingredient_meal", "meal_id", "position"),
+    )
+
+    def to_dict(self):
+        return {"name": self.name, "measure": self.measure}
+
+
+# ───────────────────────────────────────────────────────────────
+#  Кэш ответов AI (/api/ai/generate-recipe)
+# ───────────────────────────────────────────────────────────────
+class AIRecipeCache(db.Model):
+    __tablename__ = "ai_recipe_cache"
+
+    # sha256 of language + normalized ingredient set
+    key = db.Column(db.String(64), primary_key=True)
+    language = db.Column(db.String(16), nullable=False)
+    ingredients = db.Column(db.Text, nullable=False)
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_hit_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    hits = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        db.Index("ix_ai_recipe_cache_last_hit", "last_hit_at"),
+    )
+
+
+class AIGenerationLock(db.Model):
+    """Held by the worker currently asking the model for a cache key."""
+    __tablename__ = "ai_generation_lock"
+
+    key = db.Column(db.String(64), primary_key=True)
+    owner = db.Column(db.String(64), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+
+class AIJob(db.Model):
+    """Queued /api/ai/jobs request; picked up by the in-process pool or `flask ai-worker`."""
+    __tablename__ = "ai_job"
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    # queued → running → done | failed
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    payload = db.Column(db.Text, nullable=False)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_ai_job_status_created", "status", "created_at"),
+        db.Index("ix_ai_job_user_id", "user_id"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class AIUsage(db.Model):
+    """One OpenAI call, written when AI_USAGE_LOG is enabled."""
+    __tablename__ = "ai_usage"
+
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    model = db.Column(db.String(64), nullable=False)
+    language = db.Column(db.String(16))
+    kind = db.Column(db.String(16), nullable=False)         # completion | stream
+    outcome = db.Column(db.String(32), nullable=False)      # ok | timeout | api_error | …
+    latency_ms = db.Column(db.Integer, nullable=False)
+    prompt_tokens = db.Column(db.Integer)
+    completion_tokens = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index("ix_ai_usage_created_at", "created_at"),
+    )
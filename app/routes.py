@@ -1,48 +1,152 @@
 # app/routes.py
-from flask import Blueprint, request, jsonify, abort, current_app, send_from_directory
+from flask import (
+    Blueprint, Response, request, jsonify, abort, current_app, send_from_directory,
+    stream_with_context,
+)
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
+from contextlib import closing
 from datetime import datetime
 import traceback
-import requests
-import json
+import base64
 import os
 import logging
 import time
-from sqlalchemy import func
+from sqlalchemy import case, func, tuple_
+from sqlalchemy.orm import joinedload, selectinload
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 from .models import (
-    db, Recipe, Ingredient, User,
+    db, dialect_insert, Recipe, Ingredient, User,
     Comment, Rating, Favorite,
     ExternalFavorite, ExternalRating, ExternalComment, ShoppingListItem,
-    SharedShoppingList
+    SharedShoppingList, MealDBArea, MealDBCategory, MealDBMeal, AIJob
+)
+from . import ai_batch, ai_cache, ai_jobs, ai_usage
+from .cache import response_cache
+from .stats import (
+    mark_user_activity, recipe_participant_ids, read_admin_stats, refresh_admin_stats,
 )
-from .utils.openai_client import get_openai_client
+from .utils.mealdb_client import get_mealdb_client, meal_to_recipe, MealDBUnavailable
+from .utils.ai_recipes import (
+    detect_language, generate_recipe, normalize_ingredients, stream_recipe,
+)
+from .utils.recipe_stream import recipe_events, sse
 
 bp = Blueprint("recipes", __name__)
 bp_ai = Blueprint("ai", __name__, url_prefix="/api/ai")
 
 ALLOWED_EXT = {'png', 'jpg', 'jpeg', 'gif'}
-AREAS = [
-    "American", "British", "Canadian", "Chinese", "Croatian", "Dutch", 
-    "Egyptian", "Filipino", "French", "Greek", "Indian", "Irish", "Italian", 
-    "Jamaican", "Japanese", "Kenyan", "Malaysian", "Mexican", "Moroccan", 
-    "Polish", "Portuguese", "Russian", "Spanish", "Thai", "Tunisian", 
-    "Turkish", "Ukrainian", "Uruguayan", "Vietnamese"
-]
-CATEGORIES = [
-    "Beef", "Chicken", "Dessert", "Lamb", "Miscellaneous", "Pasta", "Pork", 
-    "Seafood", "Side", "Starter", "Vegan", "Vegetarian", "Breakfast", "Goat"
-]
+RECIPES_PAGE_SIZE = 20
+RECIPES_MAX_PAGE_SIZE = 100
+COMMENTS_PAGE_SIZE = 20
+COMMENTS_MAX_PAGE_SIZE = 100
+EXTERNAL_IMPORT_MAX_IDS = 100
+ADMIN_PAGE_SIZE = 50
+ADMIN_MAX_PAGE_SIZE = 200
+ADMIN_USER_SORTS = (
+    "id", "name", "email", "created",
+    "recipes_count", "favorites_count", "ratings_count", "comments_count",
+)
+ADMIN_RECIPE_SORTS = (
+    "id", "title", "category", "area", "created_at",
+    "ratings_count", "favorites_count", "comments_count", "average_rating",
+)
 
 
 def allowed_file(fname: str) -> bool:
     return '.' in fname and fname.rsplit('.', 1)[1].lower() in ALLOWED_EXT
 
 
+def _positive_int(value: str) -> int:
+    """Query-string converter for ids and page sizes; raises ValueError otherwise."""
+    number = int(value)
+    if number < 1:
+        raise ValueError(value)
+    return number
+
+
+def _encode_cursor(created_at, row_id) -> str:
+    """Opaque keyset cursor for listings ordered by (created_at, id)."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    """Inverse of _encode_cursor; raises ValueError on malformed input."""
+    created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(row_id)
+
+
+def _page_args():
+    """Offset pagination for admin and profile tables: ?page=&per_page=."""
+    page = request.args.get('page', 1, type=_positive_int)
+    per_page = min(
+        request.args.get('per_page', ADMIN_PAGE_SIZE, type=_positive_int),
+        ADMIN_MAX_PAGE_SIZE,
+    )
+    return page, per_page
+
+
+def _sort_direction(column):
+    """Apply ?order=asc|desc (default desc) to a sort column."""
+    if request.args.get('order', 'desc') == 'asc':
+        return column.asc()
+    return column.desc()
+
+
+def _count_by(key, *criteria):
+    """Grouped COUNT(*) subquery exposing columns ``key`` and ``count``."""
+    return (
+        db.session.query(key.label('key'), func.count().label('count'))
+        .filter(*criteria)
+        .group_by(key)
+        .subquery()
+    )
+
+
+def _wants_summary() -> bool:
+    """Card views ask for ?view=summary to skip instructions, ingredients and author."""
+    return request.args.get('view') == 'summary'
+
+
+def _paginate(query, *order_by):
+    """Apply ?page=&per_page= to a query; returns (rows, page metadata)."""
+    page, per_page = _page_args()
+    total = query.order_by(None).count()
+    rows = query.order_by(*order_by).limit(per_page).offset((page - 1) * per_page).all()
+    return rows, {"total": total, "page": page, "per_page": per_page}
+
+
+def _recipe_full_query():
+    """Recipes with author and ingredients eager-loaded for Recipe.to_dict."""
+    return Recipe.query.options(
+        joinedload(Recipe.author),
+        selectinload(Recipe.ingredients),
+    )
+
+
+def _recipe_summary_query():
+    """Column-only query for recipe cards; serialize rows with Recipe.summary_to_dict."""
+    return db.session.query(*Recipe.summary_columns())
+
+
+def _invalidate_recipe(rid):
+    """Drop every cached response that embeds the given recipe."""
+    response_cache.invalidate(
+        f"recipe:{rid}", f"recipe:{rid}:rating", f"recipe:{rid}:comments", "recipes"
+    )
+
+
+def _delete_user_ratings(user_id):
+    """Bulk-delete a user's ratings and keep the rated recipes' aggregates in sync."""
+    recipe_ids = [rid for (rid,) in db.session.query(Rating.recipe_id).filter_by(user_id=user_id)]
+    Rating.query.filter_by(user_id=user_id).delete()
+    Recipe.refresh_rating_aggregates(recipe_ids)
+
+
 # ───────────────  Health  ───────────────
 @bp.get("/health")
 def health():
@@ -174,23 +278,58 @@ def upload():
 
 # ───────────────  Recipes  ───────────────
 @bp.get("/recipes")
+@response_cache.cached(tags=("recipes",))
 def list_recipes():
-    """Get all recipes or filter by external_id"""
+    """Get a page of recipes (newest first) or filter by external_id
+
+    Both forms answer {"items": [...], "next_cursor": id | None}; the
+    external_id lookup is a single page with at most one item.
+    """
     try:
         external_id = request.args.get('external_id')
         logger.info(f"Listing recipes, external_id: {external_id}")
         
         if external_id:
-            recipe = Recipe.query.filter_by(external_id=external_id).first()
+            recipe = Recipe.query.filter_by(is_external=True, external_id=external_id).first()
             if recipe:
                 logger.info(f"Found recipe with external_id {external_id}")
-                return [recipe.to_dict()]
-            logger.info(f"No recipe found with external_id {external_id}")
-            return []
-            
-        recipes = Recipe.query.all()
-        logger.info(f"Found {len(recipes)} recipes")
-        return [r.to_dict() for r in recipes]
+            else:
+                logger.info(f"No recipe found with external_id {external_id}")
+            return {
+                "items": [recipe.to_dict()] if recipe else [],
+                "next_cursor": None,
+            }
+
+        # Invalid values fall back to the defaults (werkzeug swallows ValueError)
+        after = request.args.get('after', type=_positive_int)
+        limit = min(
+            request.args.get('limit', RECIPES_PAGE_SIZE, type=_positive_int),
+            RECIPES_MAX_PAGE_SIZE,
+        )
+
+        # Keyset pagination on the primary key: the cursor is the last id of
+        # the previous page, so every page costs the same regardless of depth.
+        if _wants_summary():
+            query = _recipe_summary_query()
+            serialize = Recipe.summary_to_dict
+        else:
+            query = _recipe_full_query()
+            serialize = Recipe.to_dict
+        query = query.order_by(Recipe.id.desc())
+        if after is not None:
+            query = query.filter(Recipe.id < after)
+
+        # Fetch one extra row to know whether there is a next page
+        recipes = query.limit(limit + 1).all()
+        has_more = len(recipes) > limit
+        recipes = recipes[:limit]
+        next_cursor = recipes[-1].id if has_more else None
+
+        logger.info(f"Found {len(recipes)} recipes, next_cursor: {next_cursor}")
+        return {
+            "items": [serialize(r) for r in recipes],
+            "next_cursor": next_cursor,
+        }
     except Exception as e:
         logger.error(f"Error listing recipes: {str(e)}")
         logger.exception("Full traceback:")
@@ -198,6 +337,7 @@ def list_recipes():
 
 
 @bp.get("/recipes/<int:rid>")
+@response_cache.cached(tags=("recipe:{rid}",))
 def one_recipe(rid):
     return Recipe.query.get_or_404(rid).to_dict()
 
@@ -234,7 +374,9 @@ def create_recipe():
                 )
     
     db.session.add(new_recipe)
+    mark_user_activity(current_user.id)
     db.session.commit()
+    response_cache.invalidate("recipes")
     return jsonify(new_recipe.to_dict()), 201
 
 
@@ -280,13 +422,14 @@ def update_recipe(rid):
                     )
         
         db.session.commit()
-        return jsonify(recipe.to_dict())
-        
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error updating recipe: {str(e)}")
         return jsonify({"error": "Failed to update recipe"}), 500
 
+    response_cache.invalidate(f"recipe:{rid}", "recipes")
+    return jsonify(recipe.to_dict())
+
 
 @bp.post("/recipes/<int:rid>/rate")
 @login_required
@@ -296,58 +439,100 @@ def rate_recipe(rid):
     if rating is None or not isinstance(rating, (int, float)) or rating < 1 or rating > 5:
         return jsonify({"error": "Rating must be a number between 1 and 5"}), 400
     
+    # Rating.value is an integer column; round here so the aggregates match what is stored
+    rating = int(round(rating))
+
     try:
-        recipe = Recipe.query.get_or_404(rid)
-        existing = Rating.query.filter_by(recipe_id=rid, user_id=current_user.id).first()
-        
-        if existing:
-            existing.value = rating
-        else:
-            new_rating = Rating(recipe_id=rid, user_id=current_user.id, value=rating)
-            db.session.add(new_rating)
-        
+        # Lock the recipe row first: concurrent ratings of one recipe queue
+        # here, so each recount below sees the previous commit (under READ
+        # COMMITTED a recount without the lock could overwrite a newer total).
+        locked = (
+            db.session.query(Recipe.id).filter(Recipe.id == rid).with_for_update().scalar()
+        )
+        if locked is None:
+            return jsonify({"error": "Recipe not found"}), 404
+
+        # Single atomic upsert; the unique (recipe_id, user_id) constraint
+        # makes concurrent clicks converge on one row.
+        stmt = dialect_insert(Rating).values(
+            recipe_id=rid, user_id=current_user.id, value=rating
+        )
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[Rating.recipe_id, Rating.user_id],
+            set_={"value": stmt.excluded.value, "updated_at": datetime.utcnow()},
+        ))
+
+        # The upsert doesn't tell us the previous value, so recount this
+        # recipe's ratings (an index range scan) while holding the lock.
+        Recipe.refresh_rating_aggregates([rid])
+        mark_user_activity(current_user.id)
         db.session.commit()
-        return jsonify({"message": "Rating saved"})
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error saving rating: {str(e)}")
         return jsonify({"error": "Failed to save rating"}), 500
 
+    response_cache.invalidate(f"recipe:{rid}", f"recipe:{rid}:rating", "recipes")
+    return jsonify({"message": "Rating saved"})
+
 
 @bp.post("/recipes/<int:rid>/favorite")
 @login_required
 def favorite_recipe(rid):
     recipe = Recipe.query.get_or_404(rid)
-    existing = Favorite.query.filter_by(recipe_id=rid, user_id=current_user.id).first()
-    if existing:
-        db.session.delete(existing)
-        db.session.commit()
-        return {"message": "Removed from favorites"}
-    else:
-        new_fav = Favorite(recipe_id=rid, user_id=current_user.id)
-        db.session.add(new_fav)
-        db.session.commit()
+
+    # Toggle without a read: insert wins unless the row already exists,
+    # in which case the favorite is removed.
+    added = db.session.execute(
+        dialect_insert(Favorite)
+        .values(recipe_id=rid, user_id=current_user.id)
+        .on_conflict_do_nothing(index_elements=[Favorite.recipe_id, Favorite.user_id])
+    ).rowcount
+    if not added:
+        Favorite.query.filter_by(recipe_id=rid, user_id=current_user.id).delete()
+    mark_user_activity(current_user.id)
+    db.session.commit()
+    if added:
         return {"message": "Added to favorites"}
+    return {"message": "Removed from favorites"}
 
 
 @bp.get("/recipes/<int:rid>/comments")
+@response_cache.cached(tags=("recipe:{rid}:comments",))
 def get_recipe_comments(rid):
     """Get comments for a recipe"""
     try:
-        recipe = Recipe.query.get_or_404(rid)
-        # Get all comments for the recipe, ordered by creation date
-        comments = Comment.query.filter_by(recipe_id=rid).order_by(Comment.created_at.desc()).all()
-        return jsonify([{
-            "id": comment.id,
-            "content": comment.content,
-            "created_at": comment.created_at.isoformat(),
-            "user": {
-                "id": comment.user.id,
-                "name": comment.user.name,
-                "email": comment.user.email,
-                "avatar": comment.user.avatar
-            }
-        } for comment in comments])
+        if not db.session.query(Recipe.id).filter_by(id=rid).first():
+            return jsonify({"error": "Recipe not found"}), 404
+
+        try:
+            after = _decode_cursor(request.args['after']) if request.args.get('after') else None
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        limit = min(
+            request.args.get('limit', COMMENTS_PAGE_SIZE, type=_positive_int),
+            COMMENTS_MAX_PAGE_SIZE,
+        )
+
+        # Newest first, keyset on (created_at, id) over ix_comment_recipe_created
+        query = Comment.query.filter_by(recipe_id=rid).options(joinedload(Comment.user))
+        if after is not None:
+            query = query.filter(tuple_(Comment.created_at, Comment.id) < after)
+        comments = query.order_by(
+            Comment.created_at.desc(), Comment.id.desc()
+        ).limit(limit + 1).all()
+
+        has_more = len(comments) > limit
+        comments = comments[:limit]
+        next_cursor = None
+        if has_more:
+            next_cursor = _encode_cursor(comments[-1].created_at, comments[-1].id)
+
+        return jsonify({
+            "items": [comment.to_dict() for comment in comments],
+            "next_cursor": next_cursor,
+            "total": Comment.query.filter_by(recipe_id=rid).count(),
+        })
     except Exception as e:
         current_app.logger.error(f"Error getting recipe comments: {str(e)}")
         return jsonify({"error": "Failed to get comments"}), 500
@@ -371,7 +556,9 @@ def add_recipe_comment(rid):
         )
         
         db.session.add(comment)
+        mark_user_activity(current_user.id)
         db.session.commit()
+        response_cache.invalidate(f"recipe:{rid}:comments")
         
         return jsonify({
             "id": comment.id,
@@ -391,29 +578,25 @@ def add_recipe_comment(rid):
 
 
 @bp.get("/recipes/<int:rid>/rating")
+@response_cache.cached(tags=("recipe:{rid}:rating",), vary_user=True)
 def get_recipe_rating(rid):
     """Get rating information for a recipe"""
     try:
         recipe = Recipe.query.get_or_404(rid)
-        # Get all ratings for the recipe
-        ratings = Rating.query.filter_by(recipe_id=rid).all()
-        
-        # Calculate average rating
-        avg_rating = sum(r.value for r in ratings) / len(ratings) if ratings else 0
-        
-        # Get user's rating if authenticated
+
+        # Average and count come from the denormalized aggregates; only the
+        # current user's own rating is looked up (one row by unique key)
         user_rating = None
         if current_user.is_authenticated:
-            user_rating_obj = Rating.query.filter_by(
-                recipe_id=rid,
-                user_id=current_user.id
-            ).first()
-            if user_rating_obj:
-                user_rating = user_rating_obj.value
+            user_rating = (
+                db.session.query(Rating.value)
+                .filter_by(recipe_id=rid, user_id=current_user.id)
+                .scalar()
+            )
         
         return jsonify({
-            "average": round(avg_rating, 1),
-            "count": len(ratings),
+            "average": round(recipe.average_rating(), 1),
+            "count": recipe.rating_count,
             "user_rating": user_rating
         })
     except Exception as e:
@@ -434,17 +617,26 @@ def delete_recipe(rid):
     recipe = Recipe.query.get_or_404(rid)
     if recipe.user_id != current_user.id and not current_user.is_admin:
         return {"error": "Not authorized"}, 403
+    mark_user_activity(*recipe_participant_ids(rid))
     db.session.delete(recipe)
     db.session.commit()
+    _invalidate_recipe(rid)
     return {"message": "Recipe deleted"}
 
 
 # ───────────────  External lists (MealDB)  ───────────────
+# Answer from the local mirror (flask mealdb sync); the live API is only
+# a fallback until the first sync has run.
 @bp.get("/external/categories")
 def mealdb_categories():
     try:
-        r = requests.get("https://www.themealdb.com/api/json/v1/1/categories.php")
-        return [{"id": c["idCategory"], "name": c["strCategory"]} for c in r.json()["categories"]]
+        categories = MealDBCategory.query.order_by(MealDBCategory.name).all()
+        if categories:
+            return [c.to_dict() for c in categories]
+        return get_mealdb_client().categories()
+    except MealDBUnavailable as e:
+        logger.error(f"MealDB categories unavailable: {e}")
+        return {"error": "Failed to fetch categories"}, 503
     except Exception:
         traceback.print_exc()
         return {"error": "Failed to fetch categories"}, 500
@@ -453,13 +645,55 @@ def mealdb_categories():
 @bp.get("/external/areas")
 def mealdb_areas():
     try:
-        r = requests.get("https://www.themealdb.com/api/json/v1/1/list.php?a=list")
-        return [{"name": m["strArea"]} for m in r.json()["meals"]]
+        areas = MealDBArea.query.order_by(MealDBArea.name).all()
+        if areas:
+            return [a.to_dict() for a in areas]
+        return get_mealdb_client().areas()
+    except MealDBUnavailable as e:
+        logger.error(f"MealDB areas unavailable: {e}")
+        return {"error": "Failed to fetch areas"}, 503
     except Exception:
         traceback.print_exc()
         return {"error": "Failed to fetch areas"}, 500
 
 
+@bp.get("/external/meals")
+def mealdb_meals():
+    """Mirror search: ?category=&area=&q= with ?page=&per_page=."""
+    try:
+        query = MealDBMeal.query
+        if request.args.get('category'):
+            query = query.filter(MealDBMeal.category == request.args['category'])
+        if request.args.get('area'):
+            query = query.filter(MealDBMeal.area == request.args['area'])
+        if request.args.get('q'):
+            query = query.filter(MealDBMeal.name.ilike(f"%{request.args['q']}%"))
+        meals, meta = _paginate(query, MealDBMeal.name, MealDBMeal.id)
+        return {"items": [m.to_summary_dict() for m in meals], **meta}
+    except Exception as e:
+        current_app.logger.error(f"Error listing mirrored meals: {str(e)}")
+        return jsonify({"error": "Failed to fetch meals"}), 500
+
+
+@bp.get("/external/meals/<meal_id>")
+def mealdb_meal(meal_id):
+    try:
+        meal = db.session.get(MealDBMeal, meal_id, options=[selectinload(MealDBMeal.ingredients)])
+        if meal is not None:
+            return meal.to_dict()
+
+        record = get_mealdb_client().lookup(meal_id)
+        if record is None:
+            return {"error": "Meal not found"}, 404
+        return meal_to_recipe(record)
+    except MealDBUnavailable as e:
+        logger.error(f"MealDB lookup {meal_id} unavailable: {e}")
+        return {"error": "Failed to fetch meal"}, 503
+    except Exception as e:
+        current_app.logger.error(f"Error fetching meal {meal_id}: {str(e)}")
+        return jsonify({"error": "Failed to fetch meal"}), 500
+
+
 # ───────────────  Profile  ───────────────
 @bp.get("/profile")
 @login_required
@@ -532,6 +766,8 @@ def profile():
                 logger.info(f"Avatar updated for user {current_user.id}: {current_user.avatar}")
 
         db.session.commit()
+        # Author name/avatar are embedded in cached recipes and comments
+        response_cache.clear()
         return jsonify(current_user.to_dict())
 
     except Exception as e:
@@ -546,6 +782,13 @@ def get_user_recipes():
     """Get recipes created by current user"""
     try:
         # Получаем только рецепты, созданные пользователем (не импортированные)
+        if _wants_summary():
+            rows = _recipe_summary_query().filter(
+                Recipe.user_id == current_user.id,
+                Recipe.is_external == False,
+            ).all()
+            return jsonify([Recipe.summary_to_dict(row) for row in rows])
+
         recipes = Recipe.query.filter_by(
             user_id=current_user.id,
             is_external=False  # Исключаем импортированные рецепты
@@ -560,9 +803,17 @@ def get_user_recipes():
 def get_user_favorites():
     """Get recipes favorited by current user"""
     try:
-        favorites = Favorite.query.filter_by(user_id=current_user.id).all()
-        recipes = [Recipe.query.get(fav.recipe_id) for fav in favorites]
-        return jsonify([recipe.to_dict() for recipe in recipes if recipe])
+        if _wants_summary():
+            query, serialize = _recipe_summary_query(), Recipe.summary_to_dict
+        else:
+            query, serialize = _recipe_full_query(), Recipe.to_dict
+
+        # One joined query, newest favorites first
+        query = query.join(Favorite, Favorite.recipe_id == Recipe.id).filter(
+            Favorite.user_id == current_user.id
+        )
+        recipes, page = _paginate(query, Favorite.created_at.desc(), Favorite.id.desc())
+        return jsonify({"items": [serialize(recipe) for recipe in recipes], **page})
     except Exception as e:
         current_app.logger.error(f"Error getting user favorites: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -570,14 +821,37 @@ def get_user_favorites():
 @bp.get("/profile/ratings")
 @login_required
 def get_user_ratings():
-    """Get ratings given by current user"""
+    """Get ratings given by current user, most recently rated first"""
     try:
-        ratings = Rating.query.filter_by(user_id=current_user.id).all()
-        return jsonify([{
-            "id": rating.id,
-            "value": rating.value,
-            "recipe": Recipe.query.get(rating.recipe_id).to_dict() if Recipe.query.get(rating.recipe_id) else None
-        } for rating in ratings])
+        order = (Rating.updated_at.desc(), Rating.id.desc())
+        if _wants_summary():
+            query = _recipe_summary_query().add_columns(
+                Rating.id.label('rating_id'),
+                Rating.value.label('rating_value'),
+                Rating.updated_at.label('rated_at'),
+            ).join(Rating, Rating.recipe_id == Recipe.id).filter(
+                Rating.user_id == current_user.id
+            )
+            rows, page = _paginate(query, *order)
+            items = [{
+                "id": row.rating_id,
+                "value": row.rating_value,
+                "rated_at": row.rated_at.isoformat() if row.rated_at else None,
+                "recipe": Recipe.summary_to_dict(row)
+            } for row in rows]
+        else:
+            query = Rating.query.filter_by(user_id=current_user.id).options(
+                joinedload(Rating.recipe).joinedload(Recipe.author),
+                joinedload(Rating.recipe).selectinload(Recipe.ingredients),
+            )
+            ratings, page = _paginate(query, *order)
+            items = [{
+                "id": rating.id,
+                "value": rating.value,
+                "rated_at": rating.updated_at.isoformat() if rating.updated_at else None,
+                "recipe": rating.recipe.to_dict() if rating.recipe else None
+            } for rating in ratings]
+        return jsonify({"items": items, **page})
     except Exception as e:
         current_app.logger.error(f"Error getting user ratings: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -626,6 +900,7 @@ def remove_from_favorites(recipe_id):
         user_id=current_user.id
     ).first_or_404()
     db.session.delete(favorite)
+    mark_user_activity(current_user.id)
     db.session.commit()
     return {"message": "Removed from favorites"}
 
@@ -638,13 +913,14 @@ def delete_own_account():
         
         # Delete all user's content
         Recipe.query.filter_by(user_id=user_id).delete()
-        Rating.query.filter_by(user_id=user_id).delete()
+        _delete_user_ratings(user_id)
         Favorite.query.filter_by(user_id=user_id).delete()
         Comment.query.filter_by(user_id=user_id).delete()
         
         # Delete the user
         db.session.delete(current_user)
         db.session.commit()
+        response_cache.clear()
         
         # Logout the user
         logout_user()
@@ -665,23 +941,56 @@ def get_users():
         return jsonify({"error": "Unauthorized"}), 403
     
     try:
-        users = User.query.all()
-        return jsonify([{
-            "id": user.id,
-            "name": user.name,
-            "email": user.email,
-            "is_admin": user.is_admin,
-            "stats": {
-                "recipes_count": Recipe.query.filter_by(
-                    user_id=user.id,
-                    is_external=False  # Only count created recipes
-                ).count(),
-                "favorites_count": Favorite.query.filter_by(user_id=user.id).count(),
-                "ratings_count": Rating.query.filter_by(user_id=user.id).count(),
-                "comments_count": Comment.query.filter_by(user_id=user.id).count()
-            },
-            "created_at": user.created_at.isoformat() if hasattr(user, 'created_at') else None
-        } for user in users])
+        page, per_page = _page_args()
+        search = request.args.get('q', '').strip()
+        sort = request.args.get('sort', 'id')
+        if sort not in ADMIN_USER_SORTS:
+            return jsonify({"error": f"sort must be one of: {', '.join(ADMIN_USER_SORTS)}"}), 400
+
+        # All four counters come from grouped subqueries joined to user,
+        # so a page is one query no matter how many users there are.
+        recipes = _count_by(Recipe.user_id, Recipe.is_external == False)
+        favorites = _count_by(Favorite.user_id)
+        ratings = _count_by(Rating.user_id)
+        comments = _count_by(Comment.user_id)
+        counts = {
+            "recipes_count": func.coalesce(recipes.c.count, 0),
+            "favorites_count": func.coalesce(favorites.c.count, 0),
+            "ratings_count": func.coalesce(ratings.c.count, 0),
+            "comments_count": func.coalesce(comments.c.count, 0),
+        }
+
+        users = User.query
+        if search:
+            pattern = f"%{search}%"
+            users = users.filter(User.name.ilike(pattern) | User.email.ilike(pattern))
+        total = users.count()
+
+        sort_column = counts[sort] if sort in counts else getattr(User, sort)
+        rows = (
+            users.add_columns(*(value.label(name) for name, value in counts.items()))
+            .outerjoin(recipes, recipes.c.key == User.id)
+            .outerjoin(favorites, favorites.c.key == User.id)
+            .outerjoin(ratings, ratings.c.key == User.id)
+            .outerjoin(comments, comments.c.key == User.id)
+            .order_by(_sort_direction(sort_column), _sort_direction(User.id))
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+            .all()
+        )
+        return jsonify({
+            "items": [{
+                "id": row.User.id,
+                "name": row.User.name,
+                "email": row.User.email,
+                "is_admin": row.User.is_admin,
+                "stats": {name: getattr(row, name) for name in counts},
+                "created_at": row.User.created.isoformat() if row.User.created else None
+            } for row in rows],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+        })
     except Exception as e:
         current_app.logger.error(f"Error getting users: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -694,22 +1003,61 @@ def get_all_recipes():
         return jsonify({"error": "Unauthorized"}), 403
     
     try:
+        page, per_page = _page_args()
+        sort = request.args.get('sort', 'id')
+        if sort not in ADMIN_RECIPE_SORTS:
+            return jsonify({"error": f"sort must be one of: {', '.join(ADMIN_RECIPE_SORTS)}"}), 400
+
         # Get only created recipes (not imported)
-        recipes = Recipe.query.filter_by(is_external=False).all()
-        return jsonify([{
-            **recipe.to_dict(),
-            "author": {
-                "id": recipe.author.id,
-                "name": recipe.author.name,
-                "email": recipe.author.email
-            } if recipe.author else None,
-            "stats": {
-                "ratings_count": Rating.query.filter_by(recipe_id=recipe.id).count(),
-                "favorites_count": Favorite.query.filter_by(recipe_id=recipe.id).count(),
-                "comments_count": Comment.query.filter_by(recipe_id=recipe.id).count(),
-                "average_rating": recipe.average_rating()
-            }
-        } for recipe in recipes])
+        recipes = _recipe_summary_query().filter(Recipe.is_external == False)
+        for field in ('category', 'area'):
+            if request.args.get(field):
+                recipes = recipes.filter(getattr(Recipe, field) == request.args[field])
+        total = recipes.count()
+
+        # Ratings come from the denormalized columns; favorites and comments
+        # from grouped subqueries, so the page is a single query.
+        favorites = _count_by(Favorite.recipe_id)
+        comments = _count_by(Comment.recipe_id)
+        stats = {
+            "ratings_count": Recipe.rating_count,
+            "favorites_count": func.coalesce(favorites.c.count, 0),
+            "comments_count": func.coalesce(comments.c.count, 0),
+            "average_rating": case(
+                (Recipe.rating_count > 0, Recipe.rating_sum * 1.0 / Recipe.rating_count),
+                else_=0,
+            ),
+        }
+        sort_column = stats[sort] if sort in stats else getattr(Recipe, sort)
+
+        rows = (
+            recipes.add_columns(
+                User.name.label('author_name'),
+                User.email.label('author_email'),
+                *(value.label(f"stat_{name}") for name, value in stats.items()),
+            )
+            .outerjoin(User, User.id == Recipe.user_id)
+            .outerjoin(favorites, favorites.c.key == Recipe.id)
+            .outerjoin(comments, comments.c.key == Recipe.id)
+            .order_by(_sort_direction(sort_column), _sort_direction(Recipe.id))
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+            .all()
+        )
+        return jsonify({
+            "items": [{
+                **Recipe.summary_to_dict(row),
+                "author": {
+                    "id": row.user_id,
+                    "name": row.author_name,
+                    "email": row.author_email
+                } if row.author_name is not None else None,
+                "stats": {name: getattr(row, f"stat_{name}") for name in stats}
+            } for row in rows],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+        })
     except Exception as e:
         current_app.logger.error(f"Error getting recipes: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -731,13 +1079,14 @@ def delete_user(user_id):
         
         # Delete all user's content
         Recipe.query.filter_by(user_id=user_id).delete()
-        Rating.query.filter_by(user_id=user_id).delete()
+        _delete_user_ratings(user_id)
         Favorite.query.filter_by(user_id=user_id).delete()
         Comment.query.filter_by(user_id=user_id).delete()
         
         # Delete the user
         db.session.delete(user)
         db.session.commit()
+        response_cache.clear()
         
         return jsonify({"message": "User and all their content deleted successfully"})
     except Exception as e:
@@ -757,6 +1106,8 @@ def delete_recipe_admin(recipe_id):
         if not recipe:
             return jsonify({"error": "Recipe not found"}), 404
         
+        mark_user_activity(*recipe_participant_ids(recipe_id))
+
         # Delete all related content
         Rating.query.filter_by(recipe_id=recipe_id).delete()
         Favorite.query.filter_by(recipe_id=recipe_id).delete()
@@ -765,6 +1116,7 @@ def delete_recipe_admin(recipe_id):
         # Delete the recipe
         db.session.delete(recipe)
         db.session.commit()
+        _invalidate_recipe(recipe_id)
         
         return jsonify({"message": "Recipe and all related content deleted successfully"})
     except Exception as e:
@@ -780,60 +1132,53 @@ def get_admin_stats():
         return jsonify({"error": "Unauthorized"}), 403
     
     try:
-        # Get total users
-        total_users = User.query.count()
-        
-        # Get total created recipes
-        total_created_recipes = Recipe.query.filter_by(is_external=False).count()
-        
-        # Get total external recipes
-        total_external_recipes = Recipe.query.filter_by(is_external=True).count()
-        
-        # Get total recipes (created + external)
-        total_recipes = total_created_recipes + total_external_recipes
-        
-        # Get total ratings
-        total_ratings = Rating.query.count()
-        
-        # Get total favorites
-        total_favorites = Favorite.query.count()
-        
-        # Get total comments
-        total_comments = Comment.query.count()
-        
-        # Calculate average rating using the correct field name 'value'
-        avg_rating = db.session.query(func.avg(Rating.value)).scalar() or 0
-
-        # Get most active users
-        users = User.query.all()
-        active_users = sorted(
-            [{
-                "id": u.id,
-                "name": u.name,
-                "email": u.email,
-                "recipes_count": Recipe.query.filter_by(user_id=u.id, is_external=False).count(),
-                "ratings_count": Rating.query.filter_by(user_id=u.id).count(),
-                "favorites_count": Favorite.query.filter_by(user_id=u.id).count()
-            } for u in users],
-            key=lambda x: (x["recipes_count"], x["ratings_count"], x["favorites_count"]),
-            reverse=True
-        )[:5]
-        
-        return jsonify({
-            'total_users': total_users,
-            'total_recipes': total_recipes,
-            'user_created_recipes': total_created_recipes,
-            'external_recipes': total_external_recipes,
-            'total_ratings': total_ratings,
-            'total_favorites': total_favorites,
-            'total_comments': total_comments,
-            'average_rating': float(avg_rating),
-            'active_users': active_users
-        })
+        # Served from the materialized snapshot; see app/stats.py
+        return jsonify(read_admin_stats())
     except Exception as e:
         current_app.logger.error(f"Error getting admin stats: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+@bp.post("/admin/stats/refresh")
+@login_required
+def refresh_admin_stats_now():
+    """Recount the admin statistics snapshot on demand (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        full = request.args.get('full') == '1'
+        recounted = refresh_admin_stats(full=full)
+        return jsonify({**read_admin_stats(), "recounted_users": recounted})
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error refreshing admin stats: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@bp.get("/admin/cache")
+@login_required
+def get_cache_stats():
+    """Response cache hit/miss counters (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify(response_cache.stats())
+
+@bp.get("/admin/ai/stats")
+@login_required
+def get_ai_stats():
+    """AI cache and request-coalescing counters for this worker (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify(ai_cache.stats())
+
+@bp.get("/admin/ai/usage")
+@login_required
+def get_ai_usage():
+    """OpenAI latency percentiles, outcomes and tokens per day (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+    days = request.args.get("days", ai_usage.DEFAULT_DAYS, type=int)
+    return jsonify(ai_usage.report(max(1, min(days, 90))))
+
 @bp.post("/admin/users/<int:user_id>/toggle-admin")
 @login_required
 def toggle_admin_status(user_id):
@@ -851,6 +1196,9 @@ def toggle_admin_status(user_id):
         
         user.is_admin = not user.is_admin
         db.session.commit()
+        # author.is_admin is part of the recipe list and detail responses
+        authored = db.session.query(Recipe.id).filter_by(user_id=user.id)
+        response_cache.invalidate("recipes", *(f"recipe:{rid}" for (rid,) in authored))
         
         return jsonify({
             "message": f"User {'promoted to' if user.is_admin else 'demoted from'} admin",
@@ -870,125 +1218,162 @@ def toggle_admin_status(user_id):
 # ───────────────────────────────────────────────────────────────
 #  AI Blueprint
 # ───────────────────────────────────────────────────────────────
+@bp_ai.after_request
+def flush_ai_usage(rsp):
+    ai_usage.flush()
+    return rsp
+
+
 @bp_ai.post("/generate-recipe")
 @login_required          # уберите, если гостям тоже можно
 def ai_generate():
+    """Recipe from a list of ingredients.
+
+    Answers for the same language and ingredient set are served from
+    ai_recipe_cache; send {"regenerate": true} to ask the model again.
+    X-Cache is HIT, MISS or SHARED (waited for an identical request).
+    """
     payload = request.get_json() or {}
     items = payload.get("ingredients", [])
     if not items:
         return {"error": "No ingredients provided"}, 400
 
-    areas_str = ", ".join(AREAS)
-    categories_str = ", ".join(CATEGORIES)
-    ingredients_str = ", ".join(items)
+    # Определяем язык первого ингредиента
+    detected_language = detect_language(str(items[0]))
+    normalized = normalize_ingredients(items)
+    key = ai_cache.cache_key(detected_language, normalized)
 
-    # Определяем язык введенных ингредиентов
-    def detect_language(text):
-        # Простая эвристика для определения языка
-        kazakh_chars = set('әғқңөұүіһ')
-        russian_chars = set('абвгдеёжзийклмнопрстуфхцчшщъыьэюя')
-        
-        text_lower = text.lower()
-        kazakh_count = sum(1 for char in text_lower if char in kazakh_chars)
-        russian_count = sum(1 for char in text_lower if char in russian_chars)
-        
-        if kazakh_count > 0:
-            return "kazakh"
-        elif russian_count > 0:
-            return "russian"
+    def produce():
+        return generate_recipe(items, detected_language)
+
+    try:
+        if payload.get("regenerate"):
+            recipe_data = ai_cache.regenerate(key, detected_language, normalized, produce)
+            outcome = "miss"
         else:
-            return "english"
+            # concurrent identical requests share one model call
+            recipe_data, outcome = ai_cache.generate_once(key, detected_language, normalized, produce)
 
-    # Определяем язык первого ингредиента
-    first_ingredient = items[0] if items else ""
-    detected_language = detect_language(first_ingredient)
-
-    # Базовые специи, которые можно добавлять
-    basic_spices = {
-        "english": ["salt", "black pepper", "olive oil", "vegetable oil"],
-        "russian": ["соль", "черный перец", "оливковое масло", "растительное масло"],
-        "kazakh": ["тұз", "қара бұрыш", "зейтүн майы", "өсімдік майы"]
-    }
+        rsp = jsonify(recipe_data)
+        rsp.headers["X-Cache"] = outcome.upper()
+        return rsp
+    except Exception as e:
+        current_app.logger.exception(f"AI generation failed: {e}")
+        db.session.rollback()
+        return {"error": str(e)}, 500
 
-    # Создаем промпт в зависимости от языка
-    if detected_language == "kazakh":
-        prompt = f"""
-Сізге берілген ингредиенттер: {ingredients_str}
-
-Талаптар:
-1. Тек берілген ингредиенттерді қолданып рецепт жасаңыз
-2. Қосымша ингредиенттер қоспаңыз (тек негізгі дәмдеуіштер: {', '.join(basic_spices['kazakh'])})
-3. Егер ингредиент атауы емес болса (мысалы: "socks"), оны елемеңіз
-4. Барлық жауап қазақ тілінде болуы керек
-
-JSON объектісін қайтарыңыз:
-- 'title': тағам атауы (қазақ тілінде)
-- 'category': санат ({categories_str} ішінен)
-- 'area': аймақ ({areas_str} ішінен)
-- 'ingredients': ингредиенттер тізімі (әр объект 'name' және 'measure' кілттері бар)
-- 'instructions': дайындау тәртібі (қазақ тілінде, әр қадам жаңы жолмен бөлінген)
-
-JSON жауабында түсініктемелер болмауы керек.
-"""
-    elif detected_language == "russian":
-        prompt = f"""
-Вам даны ингредиенты: {ingredients_str}
-
-Требования:
-1. Создайте рецепт, используя ТОЛЬКО предоставленные ингредиенты
-2. НЕ добавляйте дополнительные ингредиенты (кроме базовых специй: {', '.join(basic_spices['russian'])})
-3. Если введенный текст не является ингредиентом (например: "socks"), игнорируйте его
-4. Весь ответ должен быть на русском языке
-
-Верните JSON объект:
-- 'title': название блюда (на русском языке)
-- 'category': категория (из списка: {categories_str})
-- 'area': кухня (из списка: {areas_str})
-- 'ingredients': список ингредиентов (каждый объект имеет ключи 'name' и 'measure')
-- 'instructions': инструкция приготовления (на русском языке, каждый шаг разделен новой строкой)
-
-JSON ответ не должен содержать комментарии.
-"""
-    else:
-        prompt = f"""
-You are given ingredients: {ingredients_str}
-
-Requirements:
-1. Create a recipe using ONLY the provided ingredients
-2. DO NOT add additional ingredients (except basic spices: {', '.join(basic_spices['english'])})
-3. If the entered text is not an ingredient (e.g., "socks"), ignore it
-4. The entire response must be in English
-
-Return a JSON object:
-- 'title': dish name (in English)
-- 'category': category (from: {categories_str})
-- 'area': cuisine (from: {areas_str})
-- 'ingredients': list of ingredients (each object has 'name' and 'measure' keys)
-- 'instructions': cooking instructions (in English, each step separated by new line)
-
-The JSON response should not contain any comments.
-"""
 
-    try:
-        client = get_openai_client()
-        rsp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.7,
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-        )
-        recipe_data = json.loads(rsp.choices[0].message.content)
+@bp_ai.post("/generate-batch")
+@login_required
+def ai_generate_batch():
+    """Several recipes at once: {"items": [["egg", "milk"], ["rice", ...], ...]}.
 
-        # Убедимся, что instructions - это строка
-        if isinstance(recipe_data.get("instructions"), list):
-            recipe_data["instructions"] = "\\n".join(map(str, recipe_data["instructions"]))
-        
-        return jsonify(recipe_data)
+    Items are generated concurrently; each result carries either ``recipe``
+    (with ``cache`` "hit"/"miss"/"shared") or ``error``, so one failure doesn't fail
+    the batch.
+    """
+    payload = request.get_json() or {}
+    groups = payload.get("items")
+    if not isinstance(groups, list) or not groups:
+        return {"error": "No ingredient lists provided"}, 400
+    max_items = current_app.config.get("AI_BATCH_MAX_ITEMS", ai_batch.DEFAULT_MAX_ITEMS)
+    if len(groups) > max_items:
+        return {"error": f"At most {max_items} ingredient lists per request"}, 400
+
+    try:
+        results = ai_batch.generate_batch(groups, regenerate=bool(payload.get("regenerate")))
+        return jsonify({"results": results})
     except Exception as e:
-        traceback.print_exc()
+        current_app.logger.exception(f"AI batch failed: {e}")
+        db.session.rollback()
         return {"error": str(e)}, 500
 
 
+@bp_ai.post("/jobs")
+@login_required
+def ai_submit_job():
+    """Queue a generation and return at once; poll GET /api/ai/jobs/<id>.
+
+    Takes the same body as /generate-recipe; answers 202 with the job.
+    """
+    payload = request.get_json() or {}
+    items = payload.get("ingredients", [])
+    if not items:
+        return {"error": "No ingredients provided"}, 400
+    try:
+        job = ai_jobs.submit(current_user.id, items, payload.get("regenerate"))
+        rsp = jsonify(job.to_dict())
+        rsp.headers["Location"] = f"/api/ai/jobs/{job.id}"
+        return rsp, 202
+    except Exception as e:
+        current_app.logger.error(f"Error queueing AI job: {e}")
+        db.session.rollback()
+        return jsonify({"error": "Failed to queue job"}), 500
+
+
+@bp_ai.get("/jobs/<job_id>")
+@login_required
+def ai_get_job(job_id):
+    """Status of a queued generation; ``result`` is set once status is "done"."""
+    job = db.session.get(AIJob, job_id)
+    if job is None or (job.user_id != current_user.id and not current_user.is_admin):
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+@bp_ai.post("/generate-recipe/stream")
+@login_required
+def ai_generate_stream():
+    """Server-Sent Events variant of /generate-recipe.
+
+    Emits title/category/area, one "ingredient" per ingredient and one
+    "step" per instruction line as soon as each is complete in the model
+    output, then "done" with the same validated object /generate-recipe
+    returns (or "error"). Cached answers are replayed the same way.
+    """
+    payload = request.get_json() or {}
+    items = payload.get("ingredients", [])
+    if not items:
+        return {"error": "No ingredients provided"}, 400
+
+    detected_language = detect_language(str(items[0]))
+    normalized = normalize_ingredients(items)
+    key = ai_cache.cache_key(detected_language, normalized)
+    cached = None if payload.get("regenerate") else ai_cache.lookup(key)
+
+    def events():
+        if cached is not None:
+            for name, data in recipe_events(cached):
+                yield sse(name, data)
+            yield sse("done", cached)
+            return
+
+        try:
+            # closing(): a client disconnect must end (and record) the model call too
+            with closing(stream_recipe(items, detected_language)) as stream:
+                for name, data in stream:
+                    if name == "done":
+                        ai_cache.store(key, detected_language, normalized, data)
+                    yield sse(name, data)
+        except Exception as e:
+            current_app.logger.exception(f"AI stream failed: {e}")
+            db.session.rollback()
+            yield sse("error", {"error": str(e)})
+        finally:
+            # the response has long been sent; after_request ran before the call
+            ai_usage.flush()
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",      # nginx/render proxies must not buffer
+            "X-Cache": "HIT" if cached is not None else "MISS",
+        },
+    )
+
+
 @bp.post("/import-external-recipe")
 @login_required
 def import_external_recipe():
@@ -998,39 +1383,51 @@ def import_external_recipe():
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
-        # Check if recipe with this external_id already exists for ANY user
-        existing_recipe = Recipe.query.filter_by(
-            external_id=data.get('externalId')
-        ).first()
-
-        if existing_recipe:
-            # If recipe exists, return it without creating a new copy
-            return jsonify(existing_recipe.to_dict())
-
-        # Create new recipe only if it doesn't exist
-        recipe = Recipe(
-            title=data['title'],
-            category=data.get('category'),
-            area=data.get('area'),
-            instructions=data['instructions'],
-            image_url=data.get('imageUrl'),
-            user_id=current_user.id,
-            is_external=True,
-            external_id=data.get('externalId')
-        )
-
-        # Add ingredients
-        for ing in data.get('ingredients', []):
-            recipe.ingredients.append(
-                Ingredient(
-                    name=ing['name'],
-                    measure=ing.get('measure', '')
-                )
+        external_id = str(data.get('externalId') or '')
+        if not external_id:
+            return jsonify({"error": "externalId is required"}), 400
+
+        # One shared copy per MealDB recipe: insert-or-nothing against the
+        # unique (external_id) WHERE is_external index, so concurrent imports
+        # of the same meal can't create duplicates.
+        stmt = (
+            dialect_insert(Recipe)
+            .values(
+                title=data['title'],
+                category=data.get('category'),
+                area=data.get('area'),
+                instructions=data['instructions'],
+                image_url=data.get('imageUrl'),
+                user_id=current_user.id,
+                is_external=True,
+                external_id=external_id,
             )
-
-        db.session.add(recipe)
+            .on_conflict_do_nothing(
+                index_elements=[Recipe.external_id],
+                index_where=Recipe.is_external == True,
+            )
+            .returning(Recipe.id)
+        )
+        recipe_id = db.session.execute(stmt).scalar()
+
+        if recipe_id is None:
+            # Already imported (possibly by someone else a moment ago)
+            existing = db.session.query(Recipe.id, Recipe.title).filter(
+                Recipe.is_external == True,
+                Recipe.external_id == external_id,
+            ).one()
+            return jsonify({"id": existing.id, "externalId": external_id, "title": existing.title})
+
+        ingredients = [
+            {"recipe_id": recipe_id, "name": ing['name'], "measure": ing.get('measure', '')}
+            for ing in data.get('ingredients', [])
+        ]
+        if ingredients:
+            db.session.execute(Ingredient.__table__.insert(), ingredients)
         db.session.commit()
+        response_cache.invalidate("recipes")
 
+        recipe = _recipe_full_query().filter(Recipe.id == recipe_id).one()
         return jsonify(recipe.to_dict()), 201
 
     except Exception as e:
@@ -1039,6 +1436,102 @@ def import_external_recipe():
         return jsonify({"error": "Failed to import recipe"}), 500
 
 
+@bp.post("/import-external-recipes")
+@login_required
+def import_external_recipes():
+    """Import a batch of MealDB recipes by id; returns {externalId: localId}.
+
+    Ids already imported are looked up, the rest come from the local mirror
+    or are fetched from MealDB concurrently, and everything new is inserted
+    in one transaction.
+    """
+    try:
+        data = request.get_json() or {}
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return jsonify({"error": "ids must be a non-empty list"}), 400
+        if len(ids) > EXTERNAL_IMPORT_MAX_IDS:
+            return jsonify({"error": f"At most {EXTERNAL_IMPORT_MAX_IDS} ids per request"}), 400
+        ids = list(dict.fromkeys(str(i) for i in ids))
+
+        def local_ids(external_ids):
+            return dict(
+                db.session.query(Recipe.external_id, Recipe.id).filter(
+                    Recipe.is_external == True,
+                    Recipe.external_id.in_(external_ids),
+                )
+            )
+
+        imported = local_ids(ids)
+        wanted = [i for i in ids if i not in imported]
+
+        payloads = {
+            meal.id: meal.to_dict()
+            for meal in MealDBMeal.query.options(selectinload(MealDBMeal.ingredients))
+            .filter(MealDBMeal.id.in_(wanted))
+        } if wanted else {}
+        missing, failed = [], []
+        remote = [i for i in wanted if i not in payloads]
+        if remote:
+            found, failed = get_mealdb_client().lookup_many(
+                remote, concurrency=current_app.config.get("MEALDB_IMPORT_CONCURRENCY", 8)
+            )
+            for meal_id, record in found.items():
+                if record is None:
+                    missing.append(meal_id)
+                else:
+                    payloads[meal_id] = meal_to_recipe(record)
+
+        if payloads:
+            rows = [
+                {
+                    "title": p['title'][:120],
+                    "category": p.get('category'),
+                    "area": p.get('area'),
+                    "instructions": p.get('instructions') or '',
+                    "image_url": p.get('imageUrl'),
+                    "user_id": current_user.id,
+                    "is_external": True,
+                    "external_id": external_id,
+                    "created_at": datetime.utcnow(),
+                }
+                for external_id, p in payloads.items()
+            ]
+            recipes = Recipe.__table__
+            stmt = dialect_insert(recipes).on_conflict_do_nothing(
+                index_elements=[recipes.c.external_id],
+                index_where=recipes.c.is_external == True,
+            ).returning(recipes.c.external_id, recipes.c.id)
+            inserted = dict(db.session.execute(stmt, rows).all())
+
+            ingredients = [
+                {"recipe_id": recipe_id, "name": ing['name'], "measure": ing.get('measure') or ''}
+                for external_id, recipe_id in inserted.items()
+                for ing in payloads[external_id].get('ingredients', [])
+            ]
+            if ingredients:
+                db.session.execute(Ingredient.__table__.insert(), ingredients)
+            db.session.commit()
+            response_cache.invalidate("recipes")
+
+            imported.update(inserted)
+            raced = [i for i in payloads if i not in inserted]
+            if raced:
+                # Imported concurrently by someone else
+                imported.update(local_ids(raced))
+
+        return jsonify({"recipes": imported, "missing": missing, "failed": failed})
+
+    except MealDBUnavailable as e:
+        db.session.rollback()
+        logger.error(f"MealDB unavailable during batch import: {e}")
+        return jsonify({"error": "MealDB is unavailable"}), 503
+    except Exception as e:
+        current_app.logger.error(f"Error importing external recipes: {str(e)}")
+        db.session.rollback()
+        return jsonify({"error": "Failed to import recipes"}), 500
+
+
 @bp.route('/static/uploads/<filename>')
 def uploaded_file(filename):
     """Serve uploaded files"""
@@ -1069,6 +1562,13 @@ def get_user_profile(user_id):
 def get_other_user_recipes(user_id):
     """Get recipes created by another user"""
     try:
+        if _wants_summary():
+            rows = _recipe_summary_query().filter(
+                Recipe.user_id == user_id,
+                Recipe.is_external == False,
+            ).all()
+            return jsonify([Recipe.summary_to_dict(row) for row in rows])
+
         recipes = Recipe.query.filter_by(
             user_id=user_id,
             is_external=False
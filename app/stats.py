@@ -0,0 +1,139 @@
+# app/stats.py
+"""
+Materialized admin statistics.
+
+GET /api/admin/stats reads the AdminStats snapshot and the UserActivity
+leaderboard instead of counting every table per request. Write paths call
+mark_user_activity() to flag the users whose counters changed, and
+refresh_admin_stats() (``flask stats refresh``, run periodically) recounts
+only those users plus the global totals. ``--full`` rebuilds every row.
+"""
+from datetime import datetime
+
+from . import db
+from .models import (
+    dialect_insert, AdminStats, UserActivity, User, Recipe, Rating, Favorite, Comment,
+)
+
+LEADERBOARD_SIZE = 5
+
+
+def mark_user_activity(*user_ids):
+    """Flag users whose counters need a recount; runs in the caller's transaction."""
+    rows = [{"user_id": uid, "dirty": True} for uid in set(user_ids) if uid is not None]
+    if not rows:
+        return
+    stmt = dialect_insert(UserActivity)
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserActivity.user_id],
+            set_={"dirty": True},
+        ),
+        rows,
+    )
+
+
+def recipe_participant_ids(recipe_id):
+    """Owner and every user who rated, favorited or commented on a recipe."""
+    query = (
+        db.session.query(Recipe.user_id).filter(Recipe.id == recipe_id)
+        .union(
+            db.session.query(Rating.user_id).filter(Rating.recipe_id == recipe_id),
+            db.session.query(Favorite.user_id).filter(Favorite.recipe_id == recipe_id),
+            db.session.query(Comment.user_id).filter(Comment.recipe_id == recipe_id),
+        )
+    )
+    return [uid for (uid,) in query]
+
+
+def _count_by_user(key, user_ids, *criteria):
+    query = db.session.query(key, db.func.count()).filter(*criteria).group_by(key)
+    if user_ids is not None:
+        query = query.filter(key.in_(user_ids))
+    return dict(query.all())
+
+
+def _refresh_activity(full):
+    if full:
+        # Drop rows left behind by deleted users, then recount everybody
+        UserActivity.query.filter(
+            ~UserActivity.user_id.in_(db.session.query(User.id))
+        ).delete(synchronize_session=False)
+        mark_user_activity(*(uid for (uid,) in db.session.query(User.id)))
+        db.session.flush()
+
+    user_ids = [uid for (uid,) in db.session.query(UserActivity.user_id).filter_by(dirty=True)]
+    if not user_ids:
+        return 0
+
+    recipes = _count_by_user(Recipe.user_id, user_ids, Recipe.is_external == False)
+    ratings = _count_by_user(Rating.user_id, user_ids)
+    favorites = _count_by_user(Favorite.user_id, user_ids)
+    comments = _count_by_user(Comment.user_id, user_ids)
+    db.session.bulk_update_mappings(UserActivity, [{
+        "user_id": uid,
+        "recipes_count": recipes.get(uid, 0),
+        "ratings_count": ratings.get(uid, 0),
+        "favorites_count": favorites.get(uid, 0),
+        "comments_count": comments.get(uid, 0),
+        "dirty": False,
+    } for uid in user_ids])
+    return len(user_ids)
+
+
+def _refresh_totals():
+    def count(model, *criteria):
+        return db.session.query(db.func.count()).select_from(model).filter(*criteria).scalar_subquery()
+
+    totals = db.session.query(
+        count(User).label("total_users"),
+        count(Recipe, Recipe.is_external == False).label("user_created_recipes"),
+        count(Recipe, Recipe.is_external == True).label("external_recipes"),
+        count(Rating).label("total_ratings"),
+        count(Favorite).label("total_favorites"),
+        count(Comment).label("total_comments"),
+        db.session.query(db.func.avg(Rating.value)).scalar_subquery().label("average_rating"),
+    ).one()
+
+    snapshot = db.session.get(AdminStats, 1) or AdminStats(id=1)
+    for name, value in totals._asdict().items():
+        setattr(snapshot, name, value or 0)
+    snapshot.average_rating = float(snapshot.average_rating)
+    snapshot.refreshed_at = datetime.utcnow()
+    db.session.add(snapshot)
+    return snapshot
+
+
+def refresh_admin_stats(full=False):
+    """Recount dirty (or, with full=True, all) users and the global totals.
+
+    Returns the number of users recounted.
+    """
+    recounted = _refresh_activity(full)
+    _refresh_totals()
+    db.session.commit()
+    return recounted
+
+
+def read_admin_stats():
+    """Snapshot payload for the admin panel; bootstraps it on first use."""
+    snapshot = db.session.get(AdminStats, 1)
+    if snapshot is None:
+        refresh_admin_stats(full=True)
+        snapshot = db.session.get(AdminStats, 1)
+
+    leaders = (
+        UserActivity.query.join(User)
+        .order_by(
+            UserActivity.recipes_count.desc(),
+            UserActivity.ratings_count.desc(),
+            UserActivity.favorites_count.desc(),
+        )
+        .limit(LEADERBOARD_SIZE)
+        .options(db.contains_eager(UserActivity.user))
+        .all()
+    )
+    return {
+        **snapshot.to_dict(),
+        "active_users": [activity.to_dict() for activity in leaders],
+    }
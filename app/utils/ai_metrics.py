@@ -0,0 +1,123 @@
+# app/utils/ai_metrics.py
+"""
+In-process registry of OpenAI calls.
+
+generate_recipe and stream_recipe wrap each call in ``track()``, which
+records model, language, kind, latency, token usage and an outcome (ok,
+timeout, rate_limited, api_error, invalid_response or cancelled). The
+last MAX_SAMPLES calls feed the latency percentiles of the admin report;
+app/ai_usage.py drains the same samples into the ai_usage table.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import openai
+
+# Last calls of this process, for latency percentiles. Samples that still
+# have to be written to ai_usage wait in _pending (bounded as well, so a
+# disabled or failing usage log can't grow memory).
+MAX_SAMPLES = 5000
+
+_lock = threading.Lock()
+_samples = deque(maxlen=MAX_SAMPLES)
+_pending = deque(maxlen=MAX_SAMPLES)
+_totals = {}
+
+
+class Call:
+    """Filled in by the caller inside ``track()``."""
+
+    def __init__(self):
+        self.usage = None
+
+
+def outcome_for(exc):
+    if not isinstance(exc, Exception):
+        # GeneratorExit (client went away mid-stream), KeyboardInterrupt, ...
+        return "cancelled"
+    if isinstance(exc, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(exc, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(exc, openai.APIError):
+        return "api_error"
+    return "invalid_response"
+
+
+def record(model, language, latency, outcome, prompt_tokens=None, completion_tokens=None,
+           kind="completion"):
+    """Add one model call to the registry; safe to call from any thread."""
+    sample = {
+        "created_at": datetime.utcnow(),
+        "model": model,
+        "language": language,
+        "kind": kind,
+        "outcome": outcome,
+        "latency_ms": round(latency * 1000),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+    }
+    with _lock:
+        _samples.append(sample)
+        _pending.append(sample)
+        _totals[outcome] = _totals.get(outcome, 0) + 1
+
+
+@contextmanager
+def track(model, language, kind="completion"):
+    """Time the block and record it; set ``call.usage`` to the response usage."""
+    call = Call()
+    started = time.perf_counter()
+    try:
+        yield call
+    except BaseException as e:
+        record(
+            model, language, time.perf_counter() - started, outcome_for(e),
+            getattr(call.usage, "prompt_tokens", None),
+            getattr(call.usage, "completion_tokens", None),
+            kind=kind,
+        )
+        raise
+    usage = call.usage
+    record(
+        model, language, time.perf_counter() - started, "ok",
+        getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None),
+        kind=kind,
+    )
+
+
+def samples():
+    with _lock:
+        return list(_samples)
+
+
+def totals():
+    with _lock:
+        return dict(_totals)
+
+
+def drain_pending():
+    """Samples recorded since the last call (for the usage table)."""
+    with _lock:
+        pending = list(_pending)
+        _pending.clear()
+    return pending
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))    # ceil
+    return ordered[int(rank) - 1]
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _pending.clear()
+        _totals.clear()
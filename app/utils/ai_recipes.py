@@ -0,0 +1,180 @@
+# app/utils/ai_recipes.py
+"""Prompt building and OpenAI call for /api/ai/generate-recipe."""
+import json
+
+from . import ai_metrics
+from .openai_client import get_openai_client
+from .recipe_stream import RecipeStreamParser
+
+MODEL = "gpt-4o-mini"
+
+AREAS = [
+    "American", "British", "Canadian", "Chinese", "Croatian", "Dutch", 
+    "Egyptian", "Filipino", "French", "Greek", "Indian", "Irish", "Italian", 
+    "Jamaican", "Japanese", "Kenyan", "Malaysian", "Mexican", "Moroccan", 
+    "Polish", "Portuguese", "Russian", "Spanish", "Thai", "Tunisian", 
+    "Turkish", "Ukrainian", "Uruguayan", "Vietnamese"
+]
+CATEGORIES = [
+    "Beef", "Chicken", "Dessert", "Lamb", "Miscellaneous", "Pasta", "Pork", 
+    "Seafood", "Side", "Starter", "Vegan", "Vegetarian", "Breakfast", "Goat"
+]
+
+
+# Базовые специи, которые можно добавлять
+BASIC_SPICES = {
+    "english": ["salt", "black pepper", "olive oil", "vegetable oil"],
+    "russian": ["соль", "черный перец", "оливковое масло", "растительное масло"],
+    "kazakh": ["тұз", "қара бұрыш", "зейтүн майы", "өсімдік майы"]
+}
+
+
+def detect_language(text):
+    """Простая эвристика: kazakh / russian / english по буквам текста."""
+    kazakh_chars = set('әғқңөұүіһ')
+    russian_chars = set('абвгдеёжзийклмнопрстуфхцчшщъыьэюя')
+
+    text_lower = text.lower()
+    kazakh_count = sum(1 for char in text_lower if char in kazakh_chars)
+    russian_count = sum(1 for char in text_lower if char in russian_chars)
+
+    if kazakh_count > 0:
+        return "kazakh"
+    elif russian_count > 0:
+        return "russian"
+    else:
+        return "english"
+
+
+def normalize_ingredients(items):
+    """Case-folded, whitespace-collapsed, de-duplicated and sorted ingredient names."""
+    names = {" ".join(str(item).split()).casefold() for item in items}
+    names.discard("")
+    return sorted(names)
+
+
+def build_prompt(items, detected_language):
+    areas_str = ", ".join(AREAS)
+    categories_str = ", ".join(CATEGORIES)
+    ingredients_str = ", ".join(items)
+    basic_spices = BASIC_SPICES
+
+    # Создаем промпт в зависимости от языка
+    if detected_language == "kazakh":
+        prompt = f"""
+Сізге берілген ингредиенттер: {ingredients_str}
+
+Талаптар:
+1. Тек берілген ингредиенттерді қолданып рецепт жасаңыз
+2. Қосымша ингредиенттер қоспаңыз (тек негізгі дәмдеуіштер: {', '.join(basic_spices['kazakh'])})
+3. Егер ингредиент атауы емес болса (мысалы: "socks"), оны елемеңіз
+4. Барлық жауап қазақ тілінде болуы керек
+
+JSON объектісін қайтарыңыз:
+- 'title': тағам атауы (қазақ тілінде)
+- 'category': санат ({categories_str} ішінен)
+- 'area': аймақ ({areas_str} ішінен)
+- 'ingredients': ингредиенттер тізімі (әр объект 'name' және 'measure' кілттері бар)
+- 'instructions': дайындау тәртібі (қазақ тілінде, әр қадам жаңы жолмен бөлінген)
+
+JSON жауабында түсініктемелер болмауы керек.
+"""
+    elif detected_language == "russian":
+        prompt = f"""
+Вам даны ингредиенты: {ingredients_str}
+
+Требования:
+1. Создайте рецепт, используя ТОЛЬКО предоставленные ингредиенты
+2. НЕ добавляйте дополнительные ингредиенты (кроме базовых специй: {', '.join(basic_spices['russian'])})
+3. Если введенный текст не является ингредиентом (например: "socks"), игнорируйте его
+4. Весь ответ должен быть на русском языке
+
+Верните JSON объект:
+- 'title': название блюда (на русском языке)
+- 'category': категория (из списка: {categories_str})
+- 'area': кухня (из списка: {areas_str})
+- 'ingredients': список ингредиентов (каждый объект имеет ключи 'name' и 'measure')
+- 'instructions': инструкция приготовления (на русском языке, каждый шаг разделен новой строкой)
+
+JSON ответ не должен содержать комментарии.
+"""
+    else:
+        prompt = f"""
+You are given ingredients: {ingredients_str}
+
+Requirements:
+1. Create a recipe using ONLY the provided ingredients
+2. DO NOT add additional ingredients (except basic spices: {', '.join(basic_spices['english'])})
+3. If the entered text is not an ingredient (e.g., "socks"), ignore it
+4. The entire response must be in English
+
+Return a JSON object:
+- 'title': dish name (in English)
+- 'category': category (from: {categories_str})
+- 'area': cuisine (from: {areas_str})
+- 'ingredients': list of ingredients (each object has 'name' and 'measure' keys)
+- 'instructions': cooking instructions (in English, each step separated by new line)
+
+The JSON response should not contain any comments.
+"""
+
+    return prompt
+
+
+def parse_recipe(content):
+    recipe_data = json.loads(content)
+
+    # Убедимся, что instructions - это строка
+    if isinstance(recipe_data.get("instructions"), list):
+        recipe_data["instructions"] = "\\n".join(map(str, recipe_data["instructions"]))
+    return recipe_data
+
+
+def _request(items, detected_language, client=None, **options):
+    return (client or get_openai_client()).chat.completions.create(
+        model=MODEL,
+        temperature=0.7,
+        messages=[{"role": "user", "content": build_prompt(items, detected_language)}],
+        response_format={"type": "json_object"},
+        **options,
+    )
+
+
+def generate_recipe(items, detected_language, timeout=None, max_retries=None):
+    """Ask the model for a recipe from ``items``; returns the parsed JSON dict.
+
+    ``timeout`` (seconds) and ``max_retries`` override OPENAI_TIMEOUT and
+    OPENAI_MAX_RETRIES for this call. Latency, token usage and outcome are
+    recorded in ai_metrics.
+    """
+    options = {"timeout": timeout} if timeout is not None else {}
+    client = get_openai_client()
+    if max_retries is not None:
+        # a copy sharing the pooled http client
+        client = client.with_options(max_retries=max_retries)
+    with ai_metrics.track(MODEL, detected_language) as call:
+        rsp = _request(items, detected_language, client, **options)
+        call.usage = rsp.usage
+        return parse_recipe(rsp.choices[0].message.content)
+
+
+def stream_recipe(items, detected_language):
+    """Same request with ``stream=True``, as RecipeStreamParser events.
+
+    Yields ``(event, data)`` pairs as the completion arrives and finally
+    ``("done", recipe)`` with the validated recipe. The call is recorded in
+    ai_metrics once the recipe is parsed (or fails to), or as "cancelled"
+    when the generator is closed early.
+    """
+    parser = RecipeStreamParser()
+    with ai_metrics.track(MODEL, detected_language, kind="stream") as call:
+        chunks = _request(
+            items, detected_language, stream=True, stream_options={"include_usage": True}
+        )
+        for chunk in chunks:
+            if chunk.usage is not None:     # last chunk, no choices
+                call.usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield from parser.feed(chunk.choices[0].delta.content)
+        recipe = parse_recipe(parser.text)
+    yield "done", recipe
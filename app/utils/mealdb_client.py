@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+import httpx
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://www.themealdb.com/api/json/v1/1"
+
+# Small fixed set of catalog lists: never evicted, and their last good value
+# is served for as long as upstream is down. Everything else (per-meal
+# lookups, keyed by user input) is LRU-bounded and dropped after stale_ttl.
+CATALOG_PATHS = frozenset(["categories.php", "list.php?a=list", "list.php?i=list"])
+
+
+class MealDBUnavailable(Exception):
+    """Upstream failed (or the circuit is open) and there is no cached value to serve."""
+
+
+class MealDBClient:
+    """Gateway to TheMealDB.
+
+    * one pooled ``requests.Session`` with connect/read timeouts and retries
+      with exponential backoff on connection errors and 5xx;
+    * a TTL cache per URL, at most ``max_entries`` entries (LRU); once an
+      entry is older than ``cache_ttl`` it is still served
+      (stale-while-revalidate) while a background thread refreshes it,
+      until it is older than ``stale_ttl``;
+    * a circuit breaker: after ``failure_threshold`` consecutive failures the
+      upstream is not called for ``reset_after`` seconds and the last good
+      value of the catalog lists is served instead.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, connect_timeout=3.05, read_timeout=10,
+                 retries=2, backoff_factor=0.3, pool_size=10,
+                 cache_ttl=3600, stale_ttl=86400, max_entries=1024,
+                 failure_threshold=5, reset_after=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache_ttl = cache_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache = OrderedDict()     # key -> (payload, fetched_at), oldest use first
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+
+    # ── public API ──────────────────────────────────────────────
+    def categories(self):
+        data = self.get_json("categories.php")
+        return [{"id": c["idCategory"], "name": c["strCategory"]} for c in data.get("categories") or []]
+
+    def areas(self):
+        data = self.get_json("list.php?a=list")
+        return [{"name": m["strArea"]} for m in data.get("meals") or []]
+
+    def lookup(self, meal_id):
+        """Full meal record by MealDB id, or None if it doesn't exist."""
+        meals = self.get_json("lookup.php", params={"i": meal_id}).get("meals") or []
+        return meals[0] if meals else None
+
+    def lookup_many(self, meal_ids, concurrency=8):
+        """Look up several meals concurrently.
+
+        Returns ``(found, failed)``: ``found`` maps every id MealDB answered
+        for to its record (None when it doesn't exist), ``failed`` lists the
+        ids whose request errored. Uses a short-lived async httpx client
+        bounded by ``concurrency``; answers go into the response cache too.
+        """
+        found, todo = {}, []
+        with self._lock:
+            for meal_id in meal_ids:
+                cached = self._cache_get(_cache_key("lookup.php", {"i": meal_id}))
+                if cached is not None and time.monotonic() - cached[1] < self.cache_ttl:
+                    found[meal_id] = (cached[0].get("meals") or [None])[0]
+                else:
+                    todo.append(meal_id)
+        if not todo:
+            return found, []
+        if self._circuit_open():
+            raise MealDBUnavailable("circuit open")
+
+        fetched = asyncio.run(self._lookup_async(todo, concurrency))
+        failed = []
+        for meal_id, payload in fetched.items():
+            if isinstance(payload, Exception):
+                logger.warning(f"MealDB lookup {meal_id} failed: {payload}")
+                failed.append(meal_id)
+                continue
+            with self._lock:
+                self._cache_put(_cache_key("lookup.php", {"i": meal_id}), payload)
+            found[meal_id] = (payload.get("meals") or [None])[0]
+
+        if failed:
+            self._record_failure()
+        else:
+            with self._lock:
+                self._failures = 0
+        return found, failed
+
+    async def _lookup_async(self, meal_ids, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        connect_timeout, read_timeout = self.timeout
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=timeout, limits=limits) as client:
+            async def fetch(meal_id):
+                async with semaphore:
+                    try:
+                        rsp = await client.get("/lookup.php", params={"i": meal_id})
+                        rsp.raise_for_status()
+                        return meal_id, rsp.json()
+                    except Exception as e:
+                        return meal_id, e
+
+            return dict(await asyncio.gather(*(fetch(mid) for mid in meal_ids)))
+
+    def get_json(self, path, params=None, use_cache=True):
+        """JSON of ``path``; ``params`` are sent as an encoded query string."""
+        if not use_cache:
+            return self._fetch(path, params)
+        key = _cache_key(path, params)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache_get(key)
+            if cached is not None and key not in CATALOG_PATHS and now - cached[1] >= self.stale_ttl:
+                del self._cache[key]
+                cached = None
+        if cached is not None:
+            payload, fetched_at = cached
+            age = now - fetched_at
+            if age < self.cache_ttl:
+                return payload
+            if age < self.stale_ttl:
+                self._refresh_in_background(path, params)
+                return payload
+
+        try:
+            return self._fetch(path, params)
+        except Exception as e:
+            if cached is not None:
+                logger.warning(f"MealDB {key} failed ({e}); serving last good value")
+                return cached[0]
+            raise MealDBUnavailable(str(e)) from e
+
+    # ── internals ───────────────────────────────────────────────
+    def _fetch(self, path, params=None):
+        if self._circuit_open():
+            raise MealDBUnavailable("circuit open")
+        try:
+            rsp = self.session.get(f"{self.base_url}/{path}", params=params, timeout=self.timeout)
+            rsp.raise_for_status()
+            payload = rsp.json()
+        except Exception:
+            self._record_failure()
+            raise
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._cache_put(_cache_key(path, params), payload)
+        return payload
+
+    def _cache_get(self, key):
+        """Entry for ``key`` marked as recently used; caller holds the lock."""
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+        return cached
+
+    def _cache_put(self, key, payload):
+        """Store and evict least recently used non-catalog entries; caller holds the lock."""
+        self._cache[key] = (payload, time.monotonic())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            oldest = next((k for k in self._cache if k not in CATALOG_PATHS), None)
+            if oldest is None:
+                break
+            del self._cache[oldest]
+
+    def _circuit_open(self):
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                # half-open: let this call through as a trial
+                self._opened_at = None
+                self._failures = self.failure_threshold - 1
+                return False
+            return True
+
+    def _record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold and self._opened_at is None:
+                logger.error(f"MealDB circuit opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+    def _refresh_in_background(self, path, params=None):
+        key = _cache_key(path, params)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(path, params)
+            except Exception as e:
+                logger.warning(f"Background refresh of MealDB {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+def _cache_key(path, params=None):
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def meal_ingredients(meal):
+    """(name, measure) pairs from the strIngredient1..20 / strMeasure1..20 fields."""
+    pairs = []
+    for i in range(1, 21):
+        name = (meal.get(f"strIngredient{i}") or "").strip()
+        if not name:
+            continue
+        measure = (meal.get(f"strMeasure{i}") or "").strip()
+        pairs.append((name, measure or None))
+    return pairs
+
+
+def meal_to_recipe(meal):
+    """Raw MealDB record in the shape /import-external-recipe accepts."""
+    return {
+        "externalId": meal["idMeal"],
+        "title": meal["strMeal"],
+        "category": meal.get("strCategory"),
+        "area": meal.get("strArea"),
+        "instructions": meal.get("strInstructions"),
+        "imageUrl": meal.get("strMealThumb"),
+        "ingredients": [
+            {"name": name, "measure": measure} for name, measure in meal_ingredients(meal)
+        ],
+    }
+
+
+def get_mealdb_client():
+    """Per-app MealDB client configured from MEALDB_* settings."""
+    client = current_app.extensions.get("mealdb_client")
+    if client is None:
+        config = current_app.config
+        client = current_app.extensions.setdefault("mealdb_client", MealDBClient(
+            base_url=config.get("MEALDB_BASE_URL", os.getenv("MEALDB_BASE_URL", DEFAULT_BASE_URL)),
+            connect_timeout=config.get("MEALDB_CONNECT_TIMEOUT", 3.05),
+            read_timeout=config.get("MEALDB_READ_TIMEOUT", 10),
+            retries=config.get("MEALDB_RETRIES", 2),
+            cache_ttl=config.get("MEALDB_CACHE_TTL", 3600),
+            stale_ttl=config.get("MEALDB_STALE_TTL", 86400),
+            max_entries=config.get("MEALDB_CACHE_MAX_ENTRIES", 1024),
+        ))
+    return client
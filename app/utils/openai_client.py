@@ -1,19 +1,89 @@
 import os
+import threading
+
+import httpx
 from openai import OpenAI
 from dotenv import load_dotenv
 import logging
 
 logger = logging.getLogger(__name__)
 
+# One client per process: it owns an httpx connection pool, so TLS sessions
+# and keep-alive connections are reused across requests. Rebuilt after a
+# fork (gunicorn preload) because the parent's sockets must not be shared.
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+
+def _setting(name, default, cast=str):
+    value = os.getenv(name)
+    return cast(value) if value not in (None, "") else default
+
+
+def _build_client():
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        logger.error("OPENAI_API_KEY not found in environment variables")
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+    timeout = httpx.Timeout(
+        _setting('OPENAI_TIMEOUT', 60.0, float),
+        connect=_setting('OPENAI_CONNECT_TIMEOUT', 5.0, float),
+    )
+    pool_size = _setting('OPENAI_MAX_CONNECTIONS', 20, int)
+    http_client = httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+    )
+    return OpenAI(
+        api_key=api_key,
+        # e.g. a local OpenAI-compatible server for tests and benchmarks
+        base_url=_setting('OPENAI_BASE_URL', None),
+        timeout=timeout,
+        max_retries=_setting('OPENAI_MAX_RETRIES', 2, int),
+        http_client=http_client,
+    )
+
+
 def get_openai_client():
-    """Get OpenAI client with API key from environment"""
-    try:
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            logger.error("OPENAI_API_KEY not found in environment variables")
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-        
-        return OpenAI(api_key=api_key)
-    except Exception as e:
-        logger.error(f"Error creating OpenAI client: {str(e)}")
-        raise 
\ No newline at end of file
+    """Process-wide OpenAI client configured from OPENAI_* environment variables.
+
+    OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_TIMEOUT (read, seconds),
+    OPENAI_CONNECT_TIMEOUT, OPENAI_MAX_RETRIES, OPENAI_MAX_CONNECTIONS.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    client = _client
+    if client is not None and _client_pid == pid:
+        return client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            try:
+                _client = _build_client()
+                _client_pid = pid
+            except Exception as e:
+                logger.error(f"Error creating OpenAI client: {str(e)}")
+                raise
+        return _client
+
+
+def max_call_seconds():
+    """Upper bound of one client call: every attempt timing out, plus backoff.
+
+    The SDK waits at most 8 seconds between attempts.
+    """
+    attempts = _setting('OPENAI_MAX_RETRIES', 2, int) + 1
+    per_attempt = _setting('OPENAI_TIMEOUT', 60.0, float) + _setting('OPENAI_CONNECT_TIMEOUT', 5.0, float)
+    return attempts * per_attempt + (attempts - 1) * 8.0
+
+
+def reset_openai_client():
+    """Drop the shared client, e.g. after changing OPENAI_* settings."""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
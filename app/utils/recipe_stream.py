@@ -0,0 +1,188 @@
+import json
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class RecipeStreamParser:
+    """Incremental parser for the recipe JSON object the model streams.
+
+    ``feed(text)`` takes the next chunk of completion text and returns the
+    events that became complete with it, as ``(event, data)`` pairs:
+
+    * ``("title" | "category" | "area", value)`` once the string is closed;
+    * ``("ingredient", {"name", "measure"})`` per finished array element;
+    * ``("step", text)`` per instruction line, whether instructions come as
+      a newline-separated string (emitted at every ``\\n``) or as a list.
+
+    Unknown keys are skipped. The full text is kept in ``text`` so the
+    caller can validate the finished object with the regular parser.
+    """
+
+    FIELDS = ("title", "category", "area")
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._state = "start"       # start, key, colon, value, array, string, done
+        self._key = None
+        self._steps_done = 0        # steps already emitted from the current string
+
+    def feed(self, chunk):
+        self.text += chunk
+        events = []
+        while self._step(events):
+            pass
+        return events
+
+    # ── state machine ───────────────────────────────────────────
+    def _skip(self, chars=_WHITESPACE):
+        while self._pos < len(self.text) and self.text[self._pos] in chars:
+            self._pos += 1
+        return self._pos < len(self.text)
+
+    def _decode(self):
+        """``(value,)`` for the complete JSON value at the cursor, else None.
+
+        Strings, arrays and objects end with their own closing character, but
+        a number or literal at the end of the buffer may still go on ("4" of
+        "42"), so those wait until a delimiter follows them.
+        """
+        try:
+            value, end = _DECODER.raw_decode(self.text, self._pos)
+        except json.JSONDecodeError:
+            return None
+        if self.text[self._pos] not in '"[{' and end >= len(self.text):
+            return None
+        self._pos = end
+        return (value,)
+
+    def _step(self, events):
+        """Advance as far as the buffered text allows; False when more input is needed."""
+        state = self._state
+        if state == "done":
+            return False
+
+        if state == "start":
+            if not self._skip():
+                return False
+            if self.text[self._pos] != "{":
+                raise ValueError("Expected a JSON object")
+            self._pos += 1
+            self._state = "key"
+            return True
+
+        if state == "key":
+            if not self._skip(_WHITESPACE + ","):
+                return False
+            if self.text[self._pos] == "}":
+                self._pos += 1
+                self._state = "done"
+                return False
+            try:
+                self._key, self._pos = _DECODER.raw_decode(self.text, self._pos)
+            except json.JSONDecodeError:
+                return False
+            self._state = "colon"
+            return True
+
+        if state == "colon":
+            if not self._skip():
+                return False
+            self._pos += 1              # ':'
+            self._state = "value"
+            return True
+
+        if state == "value":
+            if not self._skip():
+                return False
+            first = self.text[self._pos]
+            if first == "[" and self._key in ("ingredients", "instructions"):
+                self._pos += 1
+                self._state = "array"
+                return True
+            if first == '"' and self._key == "instructions":
+                self._steps_done = 0
+                self._state = "string"
+                return True
+            decoded = self._decode()
+            if decoded is None:
+                return False
+            value = decoded[0]
+            if self._key in self.FIELDS:
+                events.append((self._key, value))
+            self._state = "key"
+            return True
+
+        if state == "array":
+            if not self._skip(_WHITESPACE + ","):
+                return False
+            if self.text[self._pos] == "]":
+                self._pos += 1
+                self._state = "key"
+                return True
+            decoded = self._decode()
+            if decoded is None:
+                return False
+            item = decoded[0]
+            if self._key == "ingredients":
+                events.append(("ingredient", item))
+            elif str(item).strip():
+                events.append(("step", str(item).strip()))
+            return True
+
+        if state == "string":
+            return self._scan_instructions(events)
+
+        return False
+
+    def _scan_instructions(self, events):
+        """Emit finished lines of the instructions string; True once it is closed."""
+        start = self._pos + 1           # after the opening quote
+        lines, segment_start, i = [], start, start
+        closed = False
+        while i < len(self.text):
+            char = self.text[i]
+            if char == "\\":
+                if i + 1 >= len(self.text):
+                    break               # escape split across chunks
+                if self.text[i + 1] == "n":
+                    lines.append(self.text[segment_start:i])
+                    segment_start = i + 2
+                i += 2
+                continue
+            if char == '"':
+                lines.append(self.text[segment_start:i])
+                closed = True
+                break
+            i += 1
+
+        for raw in lines[self._steps_done:]:
+            step = json.loads(f'"{raw}"').strip()
+            if step:
+                events.append(("step", step))
+        self._steps_done = len(lines)
+
+        if closed:
+            self._pos = i + 1
+            self._state = "key"
+        return closed
+
+
+def recipe_events(recipe):
+    """The events RecipeStreamParser would emit for an already finished recipe."""
+    for field in RecipeStreamParser.FIELDS:
+        if field in recipe:
+            yield field, recipe[field]
+    for ingredient in recipe.get("ingredients") or []:
+        yield "ingredient", ingredient
+    instructions = recipe.get("instructions") or ""
+    # list instructions are joined with a literal "\n" by parse_recipe
+    for step in instructions.replace("\\n", "\n").split("\n"):
+        if step.strip():
+            yield "step", step.strip()
+
+
+def sse(event, data):
+    """One Server-Sent Events frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
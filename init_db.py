@@ -38,7 +38,6 @@ with app.app_context():
         )
         admin.set_password('admin123')
         db.session.add(admin)
-        db.session.commit()
         logger.info("Admin user created successfully")
         
         # Create test user
@@ -49,7 +48,7 @@ with app.app_context():
         )
         test_user.set_password('test123')
         db.session.add(test_user)
-        db.session.commit()
+        db.session.flush()  # test_user.id for the recipe below
         logger.info("Test user created successfully")
         
         # Create test recipe
@@ -62,7 +61,7 @@ with app.app_context():
             user_id=test_user.id
         )
         db.session.add(recipe)
-        db.session.commit()
+        db.session.flush()
         logger.info("Test recipe created successfully")
         
         # Add ingredients
@@ -72,6 +71,7 @@ with app.app_context():
             Ingredient(name='Ingredient 2', measure='200g', recipe_id=recipe.id)
         ]
         db.session.add_all(ingredients)
+        # Seed everything in one transaction; bulk data goes through `flask recipes import`
         db.session.commit()
         logger.info("Ingredients added successfully")
         
@@ -0,0 +1,40 @@
+"""Add ai_usage table for OpenAI call accounting
+
+Revision ID: 0ce2111664a8
+Revises: 9f451b471077
+Create Date: 2026-10-17 20:03:18.552940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0ce2111664a8'
+down_revision = '9f451b471077'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ai_usage',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('model', sa.String(length=64), nullable=False),
+    sa.Column('language', sa.String(length=16), nullable=True),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('outcome', sa.String(length=32), nullable=False),
+    sa.Column('latency_ms', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('completion_tokens', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ai_usage', schema=None) as batch_op:
+        batch_op.create_index('ix_ai_usage_created_at', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ai_usage', schema=None) as batch_op:
+        batch_op.drop_index('ix_ai_usage_created_at')
+
+    op.drop_table('ai_usage')
@@ -0,0 +1,74 @@
+"""Add local MealDB mirror tables
+
+Revision ID: 20150b17e82c
+Revises: 98899e34e96a
+Create Date: 2026-10-17 15:08:41.592713
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20150b17e82c'
+down_revision = '98899e34e96a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('mealdb_category',
+    sa.Column('id', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.Column('thumb', sa.Text(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('mealdb_area',
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('mealdb_ingredient',
+    sa.Column('id', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('type', sa.String(length=80), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('mealdb_meal',
+    sa.Column('id', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('category', sa.String(length=80), nullable=True),
+    sa.Column('area', sa.String(length=80), nullable=True),
+    sa.Column('instructions', sa.Text(), nullable=True),
+    sa.Column('thumb', sa.Text(), nullable=True),
+    sa.Column('tags', sa.Text(), nullable=True),
+    sa.Column('youtube', sa.Text(), nullable=True),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('synced_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_mealdb_meal_category', 'mealdb_meal', ['category'], unique=False)
+    op.create_index('ix_mealdb_meal_area', 'mealdb_meal', ['area'], unique=False)
+    op.create_table('mealdb_meal_ingredient',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('meal_id', sa.String(length=20), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('measure', sa.String(length=80), nullable=True),
+    sa.ForeignKeyConstraint(['meal_id'], ['mealdb_meal.id'], name='fk_mealdb_meal_ingredient_meal', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_mealdb_meal_ingredient_meal', 'mealdb_meal_ingredient', ['meal_id', 'position'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_mealdb_meal_ingredient_meal', table_name='mealdb_meal_ingredient')
+    op.drop_table('mealdb_meal_ingredient')
+    op.drop_index('ix_mealdb_meal_area', table_name='mealdb_meal')
+    op.drop_index('ix_mealdb_meal_category', table_name='mealdb_meal')
+    op.drop_table('mealdb_meal')
+    op.drop_table('mealdb_ingredient')
+    op.drop_table('mealdb_area')
+    op.drop_table('mealdb_category')
@@ -0,0 +1,36 @@
+"""Add indexes for hot lookup columns
+
+Revision ID: 3530cc21a2b3
+Revises: 60effe486842
+Create Date: 2026-10-17 11:26:51.877102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3530cc21a2b3'
+down_revision = '60effe486842'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # shared_shopping_list.token is already covered by its unique constraint,
+    # and rating/favorite (recipe_id, user_id) by the unique constraints.
+    op.create_index('ix_recipe_external_id', 'recipe', ['external_id'], unique=False)
+    op.create_index('ix_recipe_user_external', 'recipe', ['user_id', 'is_external'], unique=False)
+    op.create_index('ix_comment_recipe_created', 'comment', ['recipe_id', 'created_at'], unique=False)
+    op.create_index('ix_rating_user_id', 'rating', ['user_id'], unique=False)
+    op.create_index('ix_favorite_user_id', 'favorite', ['user_id'], unique=False)
+    op.create_index('ix_shopping_list_item_user_id', 'shopping_list_item', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_shopping_list_item_user_id', table_name='shopping_list_item')
+    op.drop_index('ix_favorite_user_id', table_name='favorite')
+    op.drop_index('ix_rating_user_id', table_name='rating')
+    op.drop_index('ix_comment_recipe_created', table_name='comment')
+    op.drop_index('ix_recipe_user_external', table_name='recipe')
+    op.drop_index('ix_recipe_external_id', table_name='recipe')
@@ -0,0 +1,49 @@
+"""Unique rating and favorite per (recipe, user)
+
+Revision ID: 60effe486842
+Revises: c7e27683679e
+Create Date: 2026-10-17 10:03:18.204719
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '60effe486842'
+down_revision = 'c7e27683679e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the newest row of every duplicate group before adding the constraints
+    op.execute("""
+        DELETE FROM rating WHERE id NOT IN (
+            SELECT MAX(id) FROM rating GROUP BY recipe_id, user_id
+        )
+    """)
+    op.execute("""
+        DELETE FROM favorite WHERE id NOT IN (
+            SELECT MAX(id) FROM favorite GROUP BY recipe_id, user_id
+        )
+    """)
+    op.execute("""
+        UPDATE recipe SET
+            rating_sum = COALESCE((SELECT SUM(value) FROM rating WHERE rating.recipe_id = recipe.id), 0),
+            rating_count = (SELECT COUNT(*) FROM rating WHERE rating.recipe_id = recipe.id)
+    """)
+
+    with op.batch_alter_table('rating', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_rating_recipe_user', ['recipe_id', 'user_id'])
+
+    with op.batch_alter_table('favorite', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_favorite_recipe_user', ['recipe_id', 'user_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('favorite', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_favorite_recipe_user', type_='unique')
+
+    with op.batch_alter_table('rating', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_rating_recipe_user', type_='unique')
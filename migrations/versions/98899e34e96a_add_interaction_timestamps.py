@@ -0,0 +1,45 @@
+"""Add interaction timestamps to rating and favorite
+
+Revision ID: 98899e34e96a
+Revises: a3bfb383ffd4
+Create Date: 2026-10-17 13:52:27.019553
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '98899e34e96a'
+down_revision = 'a3bfb383ffd4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('rating', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    with op.batch_alter_table('favorite', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+    # Existing rows have no history; stamp them with the migration time
+    op.execute("UPDATE rating SET updated_at = CURRENT_TIMESTAMP")
+    op.execute("UPDATE favorite SET created_at = CURRENT_TIMESTAMP")
+
+    # The per-user listings order by the timestamp, so widen the user indexes
+    op.drop_index('ix_rating_user_id', table_name='rating')
+    op.create_index('ix_rating_user_updated', 'rating', ['user_id', 'updated_at'], unique=False)
+    op.drop_index('ix_favorite_user_id', table_name='favorite')
+    op.create_index('ix_favorite_user_created', 'favorite', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_favorite_user_created', table_name='favorite')
+    op.create_index('ix_favorite_user_id', 'favorite', ['user_id'], unique=False)
+    op.drop_index('ix_rating_user_updated', table_name='rating')
+    op.create_index('ix_rating_user_id', 'rating', ['user_id'], unique=False)
+
+    with op.batch_alter_table('favorite', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
+    with op.batch_alter_table('rating', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,44 @@
+"""Add ai_job table for queued AI generations
+
+Revision ID: 9f451b471077
+Revises: b1e0a37fd4c9
+Create Date: 2026-10-17 19:12:37.408215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f451b471077'
+down_revision = 'b1e0a37fd4c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ai_job',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ai_job', schema=None) as batch_op:
+        batch_op.create_index('ix_ai_job_status_created', ['status', 'created_at'], unique=False)
+        batch_op.create_index('ix_ai_job_user_id', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ai_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_ai_job_user_id')
+        batch_op.drop_index('ix_ai_job_status_created')
+
+    op.drop_table('ai_job')
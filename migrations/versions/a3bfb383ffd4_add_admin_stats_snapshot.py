@@ -0,0 +1,53 @@
+"""Add admin stats snapshot and user activity leaderboard
+
+Revision ID: a3bfb383ffd4
+Revises: 3530cc21a2b3
+Create Date: 2026-10-17 12:40:05.336190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3bfb383ffd4'
+down_revision = '3530cc21a2b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('admin_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total_users', sa.Integer(), nullable=False),
+    sa.Column('user_created_recipes', sa.Integer(), nullable=False),
+    sa.Column('external_recipes', sa.Integer(), nullable=False),
+    sa.Column('total_ratings', sa.Integer(), nullable=False),
+    sa.Column('total_favorites', sa.Integer(), nullable=False),
+    sa.Column('total_comments', sa.Integer(), nullable=False),
+    sa.Column('average_rating', sa.Float(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user_activity',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('recipes_count', sa.Integer(), nullable=False),
+    sa.Column('ratings_count', sa.Integer(), nullable=False),
+    sa.Column('favorites_count', sa.Integer(), nullable=False),
+    sa.Column('comments_count', sa.Integer(), nullable=False),
+    sa.Column('dirty', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_user_activity_user', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    with op.batch_alter_table('user_activity', schema=None) as batch_op:
+        batch_op.create_index('ix_user_activity_rank', ['recipes_count', 'ratings_count', 'favorites_count'], unique=False)
+        batch_op.create_index('ix_user_activity_dirty', ['dirty'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_activity', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_activity_dirty')
+        batch_op.drop_index('ix_user_activity_rank')
+
+    op.drop_table('user_activity')
+    op.drop_table('admin_stats')
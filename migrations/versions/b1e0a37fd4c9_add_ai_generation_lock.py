@@ -0,0 +1,29 @@
+"""Add AI generation lock rows for cross-worker coalescing
+
+Revision ID: b1e0a37fd4c9
+Revises: df844bc23b53
+Create Date: 2026-10-17 18:04:52.261907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1e0a37fd4c9'
+down_revision = 'df844bc23b53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ai_generation_lock',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('owner', sa.String(length=64), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('ai_generation_lock')
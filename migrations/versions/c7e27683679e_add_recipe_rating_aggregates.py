@@ -0,0 +1,35 @@
+"""Add denormalized rating aggregates to recipe
+
+Revision ID: c7e27683679e
+Revises: 46ac0694dbc5
+Create Date: 2026-10-17 09:12:40.512344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e27683679e'
+down_revision = '46ac0694dbc5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('recipe', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing ratings
+    op.execute("""
+        UPDATE recipe SET
+            rating_sum = COALESCE((SELECT SUM(value) FROM rating WHERE rating.recipe_id = recipe.id), 0),
+            rating_count = (SELECT COUNT(*) FROM rating WHERE rating.recipe_id = recipe.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('recipe', schema=None) as batch_op:
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
@@ -0,0 +1,66 @@
+"""Unique external_id for imported recipes
+
+Revision ID: d719ce253b3c
+Revises: 20150b17e82c
+Create Date: 2026-10-17 16:02:13.418520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd719ce253b3c'
+down_revision = '20150b17e82c'
+branch_labels = None
+depends_on = None
+
+# External recipes that are not the lowest id of their external_id group
+DUPLICATES = """
+    SELECT d.id FROM recipe d
+    JOIN recipe k ON k.external_id = d.external_id AND k.is_external = true AND k.id < d.id
+    WHERE d.is_external = true
+"""
+
+
+def upgrade():
+    # Merge duplicate imports into the oldest copy before adding the index.
+    # A user keeps only their newest rating/favorite across the group.
+    for table in ('rating', 'favorite'):
+        op.execute(f"""
+            DELETE FROM {table} WHERE id IN (
+                SELECT r.id FROM {table} r
+                JOIN recipe a ON a.id = r.recipe_id AND a.is_external = true
+                JOIN recipe b ON b.external_id = a.external_id AND b.is_external = true
+                JOIN {table} r2 ON r2.recipe_id = b.id AND r2.user_id = r.user_id AND r2.id > r.id
+            )
+        """)
+    for table in ('rating', 'favorite', 'comment'):
+        op.execute(f"""
+            UPDATE {table} SET recipe_id = (
+                SELECT MIN(k.id) FROM recipe k
+                JOIN recipe a ON a.external_id = k.external_id
+                WHERE k.is_external = true AND a.id = {table}.recipe_id
+            )
+            WHERE recipe_id IN ({DUPLICATES})
+        """)
+    op.execute(f"DELETE FROM ingredient WHERE recipe_id IN ({DUPLICATES})")
+    op.execute(f"DELETE FROM recipe WHERE id IN ({DUPLICATES})")
+    op.execute("""
+        UPDATE recipe SET
+            rating_sum = COALESCE((SELECT SUM(value) FROM rating WHERE rating.recipe_id = recipe.id), 0),
+            rating_count = (SELECT COUNT(*) FROM rating WHERE rating.recipe_id = recipe.id)
+        WHERE is_external = true
+    """)
+
+    op.drop_index('ix_recipe_external_id', table_name='recipe')
+    op.create_index(
+        'uq_recipe_external_id', 'recipe', ['external_id'], unique=True,
+        sqlite_where=sa.text('is_external = 1'),
+        postgresql_where=sa.text('is_external = true'),
+    )
+
+
+def downgrade():
+    op.drop_index('uq_recipe_external_id', table_name='recipe')
+    op.create_index('ix_recipe_external_id', 'recipe', ['external_id'], unique=False)
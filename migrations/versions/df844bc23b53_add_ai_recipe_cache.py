@@ -0,0 +1,35 @@
+"""Add AI recipe generation cache
+
+Revision ID: df844bc23b53
+Revises: d719ce253b3c
+Create Date: 2026-10-17 17:21:06.734118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'df844bc23b53'
+down_revision = 'd719ce253b3c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ai_recipe_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('language', sa.String(length=16), nullable=False),
+    sa.Column('ingredients', sa.Text(), nullable=False),
+    sa.Column('response', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_hit_at', sa.DateTime(), nullable=False),
+    sa.Column('hits', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_ai_recipe_cache_last_hit', 'ai_recipe_cache', ['last_hit_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_ai_recipe_cache_last_hit', table_name='ai_recipe_cache')
+    op.drop_table('ai_recipe_cache')
@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.utils.openai_client import reset_openai_client
+
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SECRET_KEY": "test",
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "RESPONSE_CACHE_BACKEND": "memory",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """Register (and thereby log in) a user, returning its JSON."""
+    def _login(email="cook@example.com", name="Cook"):
+        rsp = client.post("/api/auth/register", json={
+            "email": email, "password": "secret", "name": name,
+        })
+        assert rsp.status_code == 201, rsp.get_json()
+        return rsp.get_json()
+    return _login
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager that counts SQL statements sent to the database."""
+    class Counter:
+        def __init__(self):
+            self.count = 0
+
+        def _on_execute(self, *args, **kwargs):
+            self.count += 1
+
+        def __enter__(self):
+            event.listen(db.engine, "before_cursor_execute", self._on_execute)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(db.engine, "before_cursor_execute", self._on_execute)
+
+    return Counter
+
+
+class OpenAIStub:
+    """Local OpenAI-compatible server answering /chat/completions."""
+
+    def __init__(self):
+        self.content = '{"title": "Stub dish", "instructions": "Cook.", "ingredients": []}'
+        self.chunk_size = 7
+        self.delay = 0
+        self.fail_for = None        # answer 500 when the prompt contains this text
+        self.requests = []
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, so connection reuse is visible
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests.append(payload)
+                stub.client_ports.add(self.client_address[1])
+                time.sleep(stub.delay)
+                prompt = json.dumps(payload.get("messages"), ensure_ascii=False)
+                if stub.fail_for and stub.fail_for in prompt:
+                    body = b'{"error": {"message": "stub failure", "type": "server_error"}}'
+                    self.send_response(500)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if payload.get("stream"):
+                    return self._stream(payload.get("stream_options") or {})
+                body = json.dumps({
+                    "id": "chatcmpl-stub", "object": "chat.completion", "created": 0,
+                    "model": "gpt-4o-mini",
+                    "choices": [{
+                        "index": 0, "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": stub.content},
+                    }],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, options):
+                """Send ``content`` as chat.completion.chunk events, a few characters each."""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                content = stub.content
+                for i in range(0, len(content), stub.chunk_size):
+                    chunk = {
+                        "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0,
+                        "model": "gpt-4o-mini",
+                        "choices": [{
+                            "index": 0, "finish_reason": None,
+                            "delta": {"content": content[i:i + stub.chunk_size]},
+                        }],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                if options.get("include_usage"):
+                    usage = {
+                        "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0,
+                        "model": "gpt-4o-mini", "choices": [],
+                        "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30},
+                    }
+                    self.wfile.write(f"data: {json.dumps(usage)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    """Point the shared OpenAI client at a local stand-in."""
+    stub = OpenAIStub()
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", stub.url)
+    monkeypatch.setenv("OPENAI_MAX_RETRIES", "0")
+    reset_openai_client()
+    yield stub
+    reset_openai_client()
+    stub.close()
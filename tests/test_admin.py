@@ -0,0 +1,99 @@
+from app import db
+from app.models import User, Recipe, Comment
+
+
+def make_admin(client, login):
+    login(email="admin@example.com", name="Admin")
+    admin = User.query.filter_by(email="admin@example.com").one()
+    admin.is_admin = True
+    db.session.commit()
+    return admin
+
+
+def make_user(email, name, recipes=0, comments=0):
+    user = User(email=email, name=name)
+    user.set_password("secret")
+    db.session.add(user)
+    for i in range(recipes):
+        recipe = Recipe(title=f"{name} {i}", instructions="Cook", author=user)
+        db.session.add(recipe)
+        for _ in range(comments):
+            db.session.add(Comment(content="Nice", recipe=recipe, user=user))
+    db.session.commit()
+    return user
+
+
+def test_admin_users_sorted_by_count_in_one_query(client, login, count_queries):
+    make_admin(client, login)
+    make_user("anna@example.com", "Anna", recipes=1)
+    make_user("boris@example.com", "Boris", recipes=3, comments=1)
+    for n in range(10):
+        make_user(f"user{n}@example.com", f"User {n}")
+
+    with count_queries() as queries:
+        page = client.get("/api/admin/users?sort=recipes_count&per_page=2").get_json()
+    assert [u["name"] for u in page["items"]] == ["Boris", "Anna"]
+    assert page["items"][0]["stats"] == {
+        "recipes_count": 3, "favorites_count": 0, "ratings_count": 0, "comments_count": 3,
+    }
+    assert page["total"] == 13
+    # current_user load + total count + the page itself
+    assert queries.count <= 3
+
+
+def test_admin_users_search(client, login):
+    make_admin(client, login)
+    make_user("anna@example.com", "Anna")
+    make_user("boris@example.com", "Boris")
+
+    page = client.get("/api/admin/users?q=bor").get_json()
+    assert [u["email"] for u in page["items"]] == ["boris@example.com"]
+    assert page["total"] == 1
+
+
+def test_admin_stats_served_from_refreshed_snapshot(app, client, login):
+    make_admin(client, login)
+    make_user("boris@example.com", "Boris", recipes=2)
+
+    stats = client.get("/api/admin/stats").get_json()
+    assert stats["user_created_recipes"] == 2
+    assert stats["active_users"][0]["name"] == "Boris"
+    assert stats["stale_seconds"] >= 0
+
+    # A write through the API flags the user; the snapshot only changes on refresh
+    login(email="anna@example.com", name="Anna")
+    for title in ("Soup", "Stew", "Pie"):
+        client.post("/api/recipes", json={
+            "title": title, "category": "Side", "area": "Polish",
+            "instructions": "Cook", "image_url": None,
+        })
+    assert client.get("/api/admin/stats").status_code == 403
+
+    result = app.test_cli_runner().invoke(args=["stats", "refresh"])
+    assert "1 user(s) recounted" in result.output
+
+    client.post("/api/auth/login", json={"email": "admin@example.com", "password": "secret"})
+    stats = client.get("/api/admin/stats").get_json()
+    assert stats["user_created_recipes"] == 5
+    assert [u["name"] for u in stats["active_users"][:2]] == ["Anna", "Boris"]
+
+
+def test_admin_recipes_filtered_and_sorted_by_stat(client, login, count_queries):
+    admin = make_admin(client, login)
+    anna = make_user("anna@example.com", "Anna")
+    for title, area, comments in (("Borscht", "Ukrainian", 0),
+                                  ("Pierogi", "Polish", 2),
+                                  ("Bigos", "Polish", 1)):
+        recipe = Recipe(title=title, area=area, instructions="Cook", author=anna)
+        db.session.add(recipe)
+        for _ in range(comments):
+            db.session.add(Comment(content="Yum", recipe=recipe, user=admin))
+    db.session.commit()
+
+    with count_queries() as queries:
+        page = client.get("/api/admin/recipes?area=Polish&sort=comments_count").get_json()
+    assert [r["title"] for r in page["items"]] == ["Pierogi", "Bigos"]
+    assert page["items"][0]["stats"]["comments_count"] == 2
+    assert page["items"][0]["author"]["name"] == "Anna"
+    assert page["total"] == 2
+    assert queries.count <= 3
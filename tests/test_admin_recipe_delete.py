@@ -36,7 +36,7 @@ def test_admin_recipe_delete():
     )
     
     if recipes_response.status_code == 200:
-        recipes = recipes_response.json()
+        recipes = recipes_response.json()["items"]
         print(f"Fetched {len(recipes)} recipes")
         
         if len(recipes) == 0:
@@ -0,0 +1,158 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import ai_cache, db, routes
+from app.models import AIGenerationLock, AIRecipeCache, User
+from app.utils.ai_recipes import normalize_ingredients
+from app.utils.singleflight import SingleFlight
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    """Replace the OpenAI call; records the ingredient lists it was asked for."""
+    calls = []
+
+    def fake_generate(items, language):
+        calls.append(list(items))
+        return {"title": f"Dish {len(calls)}", "instructions": "Cook.", "ingredients": []}
+
+    monkeypatch.setattr(routes, "generate_recipe", fake_generate)
+    return calls
+
+
+def generate(client, items, **extra):
+    rsp = client.post("/api/ai/generate-recipe", json={"ingredients": items, **extra})
+    assert rsp.status_code == 200, rsp.get_json()
+    return rsp
+
+
+def test_normalize_ingredients():
+    assert normalize_ingredients(["Rice", " chicken ", "ONION", "rice", "", "green  Onion"]) == [
+        "chicken", "green onion", "onion", "rice",
+    ]
+
+
+def test_same_ingredient_set_is_served_from_cache(client, login, model_calls):
+    login()
+    first = generate(client, ["chicken", "rice", "onion"])
+    assert first.headers["X-Cache"] == "MISS"
+
+    again = generate(client, ["Onion", "RICE", "chicken", "rice"])
+    assert again.headers["X-Cache"] == "HIT"
+    assert again.get_json() == first.get_json()
+    assert len(model_calls) == 1
+
+    # different language, different entry
+    generate(client, ["курица", "рис"])
+    assert len(model_calls) == 2
+    assert AIRecipeCache.query.filter_by(language="english").one().hits == 1
+
+
+def test_regenerate_bypasses_and_replaces_entry(client, login, model_calls):
+    login()
+    generate(client, ["egg"])
+    fresh = generate(client, ["egg"], regenerate=True)
+    assert fresh.headers["X-Cache"] == "MISS"
+    assert fresh.get_json()["title"] == "Dish 2"
+    assert generate(client, ["egg"]).get_json()["title"] == "Dish 2"
+    assert AIRecipeCache.query.count() == 1
+
+
+def test_expired_and_least_recently_hit_entries_are_evicted(app, client, login, model_calls):
+    app.config.update(AI_CACHE_TTL=3600, AI_CACHE_MAX_ENTRIES=2)
+    login()
+    generate(client, ["egg"])
+    generate(client, ["milk"])
+    generate(client, ["egg"])         # egg is now the most recently hit
+    generate(client, ["flour"])       # evicts milk
+    assert sorted(e.ingredients for e in AIRecipeCache.query) == ["egg", "flour"]
+
+    AIRecipeCache.query.filter_by(ingredients="egg").update(
+        {"created_at": datetime.utcnow() - timedelta(hours=2)}
+    )
+    db.session.commit()
+    assert generate(client, ["egg"]).headers["X-Cache"] == "MISS"
+    assert len(model_calls) == 4
+
+
+def test_single_flight_shares_one_call():
+    flight, calls, results = SingleFlight(), [], []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "recipe"
+
+    def worker():
+        results.append(flight.do("key", slow))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("recipe", False)] + [("recipe", True)] * 4
+    assert flight.stats() == {"leaders": 1, "followers": 4, "in_flight": 0}
+
+
+def test_waits_for_peer_worker_holding_the_lock(app, client, login, model_calls, monkeypatch):
+    login()
+    key = ai_cache.cache_key("english", ["egg"])
+    db.session.add(AIGenerationLock(
+        key=key, owner="other-worker", expires_at=datetime.utcnow() + timedelta(minutes=1)
+    ))
+    db.session.commit()
+
+    def peer_finishes(seconds):
+        # the other worker stores its answer while we poll
+        if AIRecipeCache.query.count() == 0:
+            ai_cache.store(key, "english", ["egg"], {"title": "From peer"})
+
+    monkeypatch.setattr(ai_cache.time, "sleep", peer_finishes)
+    rsp = generate(client, ["egg"])
+    assert rsp.headers["X-Cache"] == "SHARED"
+    assert rsp.get_json() == {"title": "From peer"}
+    assert model_calls == []
+
+
+def test_expired_lock_is_taken_over_and_stats_count_saved_calls(app, client, login, model_calls):
+    login()
+    db.session.add(AIGenerationLock(
+        key=ai_cache.cache_key("english", ["egg"]), owner="crashed-worker",
+        expires_at=datetime.utcnow() - timedelta(seconds=1),
+    ))
+    db.session.commit()
+    before = ai_cache.stats()
+
+    assert generate(client, ["egg"]).headers["X-Cache"] == "MISS"
+    assert generate(client, ["egg"]).headers["X-Cache"] == "HIT"
+    assert len(model_calls) == 1
+    assert AIGenerationLock.query.count() == 0
+
+    user = db.session.get(User, 1)
+    user.is_admin = True
+    db.session.commit()
+    stats = client.get("/api/admin/ai/stats").get_json()
+    assert stats["model_calls"] == before["model_calls"] + 1
+    assert stats["cache_entries"] == 1 and stats["cache_hits"] == 1
+    assert set(stats) >= {"coalesced_local", "coalesced_peer", "saved_calls", "pid"}
+
+
+def test_lock_outlives_a_model_call_with_retries(app, monkeypatch):
+    monkeypatch.setenv("OPENAI_TIMEOUT", "60")
+    monkeypatch.setenv("OPENAI_CONNECT_TIMEOUT", "5")
+    monkeypatch.setenv("OPENAI_MAX_RETRIES", "2")
+    # three attempts of up to 65s each plus two backoffs
+    assert ai_cache._lock_timeout() >= 3 * 65 + 2 * 8
+
+    app.config["AI_LOCK_TIMEOUT"] = 30
+    assert ai_cache._lock_timeout() == 30
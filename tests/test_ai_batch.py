@@ -0,0 +1,96 @@
+import threading
+import time
+
+from app import ai_cache
+from app.models import AIRecipeCache
+from app.utils.ai_recipes import normalize_ingredients
+from app.utils.openai_client import reset_openai_client
+
+
+def batch(client, items, **extra):
+    rsp = client.post("/api/ai/generate-batch", json={"items": items, **extra})
+    assert rsp.status_code == 200, rsp.get_json()
+    return rsp.get_json()["results"]
+
+
+def test_items_run_concurrently_with_partial_failure(app, client, login, openai_stub):
+    app.config["AI_BATCH_CONCURRENCY"] = 4
+    login()
+    openai_stub.delay = 0.3
+    started = time.monotonic()
+    results = batch(client, [["egg"], ["rice", "chicken"], [], ["Egg"], ["milk"]])
+    elapsed = time.monotonic() - started
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert results[2] == {"index": 2, "error": "No ingredients provided"}
+    assert [r.get("cache") for r in results] == ["miss", "miss", None, "miss", "miss"]
+    # duplicate lists share a call; the three calls overlap instead of adding up
+    assert len(openai_stub.requests) == 3
+    assert elapsed < 0.8
+    assert AIRecipeCache.query.count() == 3
+
+    again = batch(client, [["milk"], ["rice", "chicken"]])
+    assert [r["cache"] for r in again] == ["hit", "hit"]
+    assert len(openai_stub.requests) == 3
+
+
+def test_slow_items_time_out(app, client, login, openai_stub):
+    app.config.update(AI_BATCH_ITEM_TIMEOUT=0.2)
+    login()
+    openai_stub.delay = 1
+    results = batch(client, [["egg"], ["rice"]])
+    assert all("error" in r and "recipe" not in r for r in results)
+    assert AIRecipeCache.query.count() == 0
+
+
+def test_batch_size_is_limited(app, client, login):
+    app.config["AI_BATCH_MAX_ITEMS"] = 2
+    login()
+    rsp = client.post("/api/ai/generate-batch", json={"items": [["a"], ["b"], ["c"]]})
+    assert rsp.status_code == 400
+    assert client.post("/api/ai/generate-batch", json={}).status_code == 400
+
+
+def test_model_failure_fails_only_its_item_without_retries(app, client, login, openai_stub,
+                                                           monkeypatch):
+    monkeypatch.setenv("OPENAI_MAX_RETRIES", "2")
+    reset_openai_client()
+    login()
+    openai_stub.fail_for = "rice"
+    results = batch(client, [["egg"], ["rice"], ["milk"]])
+
+    assert [r.get("cache") for r in results] == ["miss", None, "miss"]
+    assert "error" in results[1] and "recipe" not in results[1]
+    # one attempt for the failing item despite OPENAI_MAX_RETRIES=2
+    assert len(openai_stub.requests) == 3
+    assert AIRecipeCache.query.count() == 2
+
+
+def test_items_are_counted_and_join_calls_in_flight(app, client, login, openai_stub):
+    login()
+    before = ai_cache.stats()
+    key = ai_cache.cache_key("english", normalize_ingredients(["egg"]))
+    release = threading.Event()
+    started = threading.Event()
+
+    def in_flight():
+        # a /generate-recipe request for the same key, still waiting on the model
+        def produce():
+            started.set()
+            release.wait(5)
+            return {"title": "From request"}
+        ai_cache.call_model(key, produce)
+
+    peer = threading.Thread(target=in_flight)
+    peer.start()
+    started.wait(5)
+    threading.Timer(0.2, release.set).start()
+    results = batch(client, [["egg"], ["milk"]])
+    peer.join()
+
+    assert [r["cache"] for r in results] == ["shared", "miss"]
+    assert results[0]["recipe"] == {"title": "From request"}
+    assert len(openai_stub.requests) == 1
+    stats = ai_cache.stats()
+    assert stats["model_calls"] == before["model_calls"] + 2
+    assert stats["coalesced_local"] == before["coalesced_local"] + 1
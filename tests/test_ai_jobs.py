@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+from app import ai_jobs, create_app, db
+from app.models import AIJob, AIRecipeCache
+
+
+def submit(client, items):
+    rsp = client.post("/api/ai/jobs", json={"ingredients": items})
+    assert rsp.status_code == 202, rsp.get_json()
+    return rsp.get_json()
+
+
+def test_jobs_are_queued_and_run_by_the_cli_worker(app, client, login, openai_stub):
+    app.config["AI_JOB_WORKERS"] = 0      # leave everything to `flask ai-worker`
+    login()
+    job = submit(client, ["egg", "milk"])
+    assert job["status"] == "queued" and job["result"] is None
+    assert openai_stub.requests == []
+
+    result = app.test_cli_runner().invoke(args=["ai-worker", "--once"])
+    assert "Processed 1 AI job(s)." in result.output
+
+    done = client.get(f"/api/ai/jobs/{job['id']}").get_json()
+    assert done["status"] == "done" and done["attempts"] == 1
+    assert done["result"]["title"] == "Stub dish"
+    assert AIRecipeCache.query.count() == 1
+
+    client.post("/api/auth/logout")
+    login("other@example.com", "Other")
+    assert client.get(f"/api/ai/jobs/{job['id']}").status_code == 404
+
+
+def test_in_process_pool_runs_submitted_jobs(tmp_path, openai_stub):
+    # pool threads need their own connections, which in-memory SQLite can't give
+    app = create_app({
+        "TESTING": True,
+        "SECRET_KEY": "test",
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'jobs.db'}",
+        "RESPONSE_CACHE_BACKEND": "memory",
+        "AI_JOB_WORKERS": 2,
+    })
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        client.post("/api/auth/register", json={
+            "email": "cook@example.com", "password": "secret", "name": "Cook",
+        })
+        jobs = [submit(client, [name]) for name in ("egg", "rice", "egg")]
+        ai_jobs.shutdown()                # waits for the pool to finish
+
+        statuses = [client.get(f"/api/ai/jobs/{job['id']}").get_json() for job in jobs]
+        assert [s["status"] for s in statuses] == ["done"] * 3
+        # the repeated ingredient set is answered from the cache or shared
+        assert len(openai_stub.requests) == 2
+        db.session.remove()
+
+
+def test_failed_generation_is_reported(app, client, login, openai_stub):
+    app.config["AI_JOB_WORKERS"] = 0
+    login()
+    openai_stub.content = "not json"
+    job = submit(client, ["egg"])
+    ai_jobs.work(once=True)
+    failed = client.get(f"/api/ai/jobs/{job['id']}").get_json()
+    assert failed["status"] == "failed" and failed["error"]
+
+
+def test_claim_is_exclusive_and_stale_jobs_are_requeued(app, login):
+    user_id = login()["id"]
+    job = AIJob(user_id=user_id, payload='{"ingredients": ["egg"]}')
+    db.session.add(job)
+    db.session.commit()
+    assert ai_jobs.claim(job.id) is True
+    assert ai_jobs.claim(job.id) is False
+
+    long_ago = datetime.utcnow() - timedelta(hours=1)
+    dead = AIJob(user_id=user_id, payload="{}", status="running", started_at=long_ago,
+                 attempts=ai_jobs.DEFAULT_MAX_ATTEMPTS)
+    db.session.add(dead)
+    AIJob.query.filter_by(id=job.id).update({"started_at": long_ago})
+    db.session.commit()
+
+    assert ai_jobs.requeue_stale() == (1, 1)
+    assert db.session.get(AIJob, job.id).status == "queued"
+    assert db.session.get(AIJob, dead.id).status == "failed"
+
+
+
+def test_worker_that_lost_a_requeued_job_does_not_overwrite_it(app, login, monkeypatch):
+    job = AIJob(user_id=login()["id"], payload='{"ingredients": ["egg"]}')
+    db.session.add(job)
+    db.session.commit()
+    job_id = job.id
+    assert ai_jobs.claim(job_id)
+
+    def slow_generation(items, language):
+        # meanwhile the worker looks dead: requeued and claimed by another one
+        AIJob.query.filter_by(id=job_id).update(
+            {"started_at": datetime.utcnow() - timedelta(hours=1)}
+        )
+        db.session.commit()
+        ai_jobs.requeue_stale()
+        assert ai_jobs.claim(job_id)
+        return {"title": "Late"}
+
+    monkeypatch.setattr(ai_jobs, "generate_recipe", slow_generation)
+    current = ai_jobs.execute(db.session.get(AIJob, job_id))
+    assert (current.status, current.attempts, current.result) == ("running", 2, None)
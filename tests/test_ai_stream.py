@@ -0,0 +1,98 @@
+import json
+
+from app.models import AIRecipeCache
+from app.utils.recipe_stream import RecipeStreamParser
+
+RECIPE = {
+    "title": "Omelette", "category": "Breakfast", "area": "French",
+    "ingredients": [{"name": "egg", "measure": "3"}, {"name": "butter", "measure": "1 tbsp"}],
+    "instructions": "Beat the eggs.\nMelt \"the\" butter.\nCook gently.",
+}
+
+
+def feed_in_chunks(parser, text, size):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+
+def read_events(rsp):
+    events = []
+    for frame in rsp.get_data(as_text=True).split("\n\n"):
+        if frame:
+            name, data = frame.split("\n")
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_parser_emits_events_regardless_of_chunking():
+    text = json.dumps(RECIPE, indent=2)
+    expected = [
+        ("title", "Omelette"), ("category", "Breakfast"), ("area", "French"),
+        ("ingredient", {"name": "egg", "measure": "3"}),
+        ("ingredient", {"name": "butter", "measure": "1 tbsp"}),
+        ("step", "Beat the eggs."), ("step", 'Melt "the" butter.'), ("step", "Cook gently."),
+    ]
+    for size in (1, 2, 5, len(text)):
+        parser = RecipeStreamParser()
+        assert feed_in_chunks(parser, text, size) == expected
+        assert parser.text == text
+
+
+def test_parser_handles_instruction_lists_and_unknown_keys():
+    text = json.dumps({
+        "notes": {"nested": [1, 2]}, "title": "Soup",
+        "instructions": ["Boil water.", " ", "Add salt."],
+    })
+    parser = RecipeStreamParser()
+    assert feed_in_chunks(parser, text, 3) == [
+        ("title", "Soup"), ("step", "Boil water."), ("step", "Add salt."),
+    ]
+
+
+def test_parser_waits_for_numbers_and_literals_to_end():
+    text = json.dumps({
+        "servings": 42, "title": "Stew", "prep_time": 15, "vegetarian": False,
+        "ingredients": [{"name": "beef", "measure": "1 kg"}], "rating": None,
+        "spicy": True, "instructions": "Brown.\nSimmer.", "calories": 3.5,
+    })
+    for size in (1, 2, 3):
+        parser = RecipeStreamParser()
+        assert feed_in_chunks(parser, text, size) == [
+            ("title", "Stew"), ("ingredient", {"name": "beef", "measure": "1 kg"}),
+            ("step", "Brown."), ("step", "Simmer."),
+        ]
+        assert parser.text == text
+
+
+def test_stream_endpoint_emits_events_then_caches(client, login, openai_stub):
+    login()
+    openai_stub.content = json.dumps(RECIPE)
+    rsp = client.post("/api/ai/generate-recipe/stream", json={"ingredients": ["egg", "butter"]})
+    assert rsp.status_code == 200
+    assert rsp.mimetype == "text/event-stream"
+    assert rsp.headers["X-Cache"] == "MISS"
+    events = read_events(rsp)
+    assert openai_stub.requests[0]["stream"] is True
+    assert [name for name, _ in events] == [
+        "title", "category", "area", "ingredient", "ingredient", "step", "step", "step", "done",
+    ]
+    done = events[-1][1]
+    assert done["title"] == "Omelette" and done["instructions"] == RECIPE["instructions"]
+    assert AIRecipeCache.query.count() == 1
+
+    # the cached answer is replayed as the same events without a model call
+    again = client.post("/api/ai/generate-recipe/stream", json={"ingredients": ["Butter", "egg"]})
+    assert again.headers["X-Cache"] == "HIT"
+    assert read_events(again) == events
+    assert len(openai_stub.requests) == 1
+
+
+def test_stream_endpoint_reports_invalid_output(client, login, openai_stub):
+    login()
+    openai_stub.content = '{"title": "Half'
+    rsp = client.post("/api/ai/generate-recipe/stream", json={"ingredients": ["egg"]})
+    name, data = read_events(rsp)[-1]
+    assert name == "error" and data["error"]
+    assert AIRecipeCache.query.count() == 0
@@ -0,0 +1,90 @@
+import pytest
+
+from app import db
+from app.models import AIUsage, User
+from app.utils import ai_metrics
+from app.utils.ai_recipes import stream_recipe
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    ai_metrics.reset()
+    yield
+    ai_metrics.reset()
+
+
+def make_admin(login):
+    user = db.session.get(User, login()["id"])
+    user.is_admin = True
+    db.session.commit()
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert ai_metrics.percentile(values, 50) == 50
+    assert ai_metrics.percentile(values, 99) == 99
+    assert ai_metrics.percentile([7], 95) == 7
+    assert ai_metrics.percentile([], 50) is None
+
+
+def test_calls_are_recorded_and_reported(app, client, login, openai_stub):
+    app.config["AI_USAGE_LOG"] = True
+    make_admin(login)
+    client.post("/api/ai/generate-recipe", json={"ingredients": ["egg"]})
+    client.post("/api/ai/generate-recipe", json={"ingredients": ["egg"]})    # cache hit
+    client.post("/api/ai/generate-recipe/stream", json={"ingredients": ["курица"]}).get_data()
+    openai_stub.content = "not json"
+    assert client.post("/api/ai/generate-recipe", json={"ingredients": ["rice"]}).status_code == 500
+
+    rows = AIUsage.query.order_by(AIUsage.id).all()
+    assert [(r.kind, r.language, r.outcome) for r in rows] == [
+        ("completion", "english", "ok"),
+        ("stream", "russian", "ok"),
+        ("completion", "english", "invalid_response"),
+    ]
+    assert rows[0].prompt_tokens == 10 and rows[1].completion_tokens == 20
+    assert all(r.model == "gpt-4o-mini" and r.latency_ms >= 0 for r in rows)
+
+    report = client.get("/api/admin/ai/usage").get_json()
+    assert report["samples"] == 3
+    assert report["outcomes"] == {"ok": 2, "invalid_response": 1}
+    assert set(report["latency_ms"]) == {"p50", "p95", "p99"}
+    assert set(report["latency_ms_by_kind"]) == {"completion", "stream"}
+    assert report["tokens_source"] == "table"
+    [today] = report["days"]
+    # the failed parse still used (and reported) tokens
+    assert today["calls"] == 3 and today["prompt_tokens"] == 30
+    assert report["cache"]["hits"] == 1
+
+
+def test_report_without_usage_table_uses_memory(app, client, login, openai_stub):
+    make_admin(login)
+    client.post("/api/ai/generate-batch", json={"items": [["egg"], ["rice"]]})
+    assert AIUsage.query.count() == 0
+
+    report = client.get("/api/admin/ai/usage?days=1").get_json()
+    assert report["tokens_source"] == "memory"
+    assert report["days"][0]["completion_tokens"] == 40
+
+    client.post("/api/auth/logout")
+    login("other@example.com", "Other")
+    assert client.get("/api/admin/ai/usage").status_code == 403
+
+
+def test_stream_outcomes_cover_parse_failures_and_disconnects(app, client, login, openai_stub):
+    app.config["AI_USAGE_LOG"] = True
+    login()
+    openai_stub.content = '{"title": "Half", "instructions": '
+    rsp = client.post("/api/ai/generate-recipe/stream", json={"ingredients": ["egg"]})
+    assert "event: error" in rsp.get_data(as_text=True)
+
+    openai_stub.content = '{"title": "Soup", "instructions": "Boil.\\nServe."}'
+    stream = stream_recipe(["rice"], "english")
+    assert next(stream) == ("title", "Soup")
+    stream.close()                          # the client went away
+
+    assert [(s["kind"], s["outcome"]) for s in ai_metrics.samples()] == [
+        ("stream", "invalid_response"), ("stream", "cancelled"),
+    ]
+    [row] = AIUsage.query.all()             # flushed at the end of the response
+    assert (row.outcome, row.completion_tokens) == ("invalid_response", 20)
@@ -46,7 +46,7 @@ def test_api():
     )
     
     if recipes_response.status_code == 200:
-        recipes = recipes_response.json()
+        recipes = recipes_response.json()["items"]
         print(f"Found {len(recipes)} recipes:")
         for idx, recipe in enumerate(recipes):
             print(f"{idx+1}. {recipe['title']} (ID: {recipe['id']})")
@@ -108,7 +108,7 @@ def test_api():
             )
             
             if get_comments_response.status_code == 200:
-                comments = get_comments_response.json()
+                comments = get_comments_response.json()["items"]
                 print(f"Found {len(comments)} comments:")
                 for idx, comment in enumerate(comments):
                     print(f"{idx+1}. {comment['content']} by {comment['user']['name']}")
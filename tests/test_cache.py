@@ -0,0 +1,144 @@
+import sqlite3
+
+from app import db
+from app.cache import LRUCache, SQLiteCache
+from app.models import User, Recipe
+
+
+def test_lru_evicts_by_bytes_and_expires():
+    cache = LRUCache(max_entries=10, max_bytes=10, default_ttl=60)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    assert cache.get("a") == b"12345"      # touch a, so b is least recently used
+    cache.set("c", b"1")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    cache.set("short", b"x", ttl=-1)
+    assert cache.get("short") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_invalidates_only_tagged_keys():
+    cache = LRUCache()
+    cache.set("detail:1", b"{}", tags=["recipe:1"])
+    cache.set("detail:2", b"{}", tags=["recipe:2"])
+    cache.set("list", b"[]", tags=["recipes"])
+
+    cache.invalidate("recipe:1")
+    assert cache.get("detail:1") is None
+    assert cache.get("detail:2") == b"{}"
+    assert cache.get("list") == b"[]"
+
+
+def test_sqlite_cache_invalidation_is_shared(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a, worker_b = SQLiteCache(path), SQLiteCache(path)
+
+    worker_a.set("detail:1", b'{"id": 1}', tags=["recipe:1"])
+    assert worker_b.get("detail:1") == b'{"id": 1}'
+
+    worker_b.invalidate("recipe:1")
+    assert worker_a.get("detail:1") is None
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.set("c", b"3")
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_recipe_detail_cached_until_rated(client, login):
+    author = User(email="author@example.com", name="Author")
+    author.set_password("secret")
+    recipe = Recipe(title="Soup", instructions="Boil", author=author)
+    db.session.add(recipe)
+    db.session.commit()
+    url = f"/api/recipes/{recipe.id}"
+
+    assert client.get(url).headers["X-Cache"] == "MISS"
+    assert client.get(url).headers["X-Cache"] == "HIT"
+
+    login()
+    client.post(f"{url}/rate", json={"rating": 4})
+    rsp = client.get(url)
+    assert rsp.headers["X-Cache"] == "MISS"
+    assert rsp.get_json()["average_rating"] == 4
+
+
+def test_toggle_admin_refreshes_cached_author(client, login):
+    author = User(email="author@example.com", name="Author")
+    author.set_password("secret")
+    recipe = Recipe(title="Soup", instructions="Boil", author=author)
+    db.session.add(recipe)
+    db.session.commit()
+    url = f"/api/recipes/{recipe.id}"
+    client.get(url)
+    client.get("/api/recipes")
+
+    admin = db.session.get(User, login()["id"])
+    admin.is_admin = True
+    db.session.commit()
+    assert client.post(f"/api/admin/users/{author.id}/toggle-admin").status_code == 200
+
+    detail = client.get(url)
+    assert detail.headers["X-Cache"] == "MISS"
+    assert detail.get_json()["author"]["is_admin"] is True
+    assert client.get("/api/recipes").get_json()["items"][0]["author"]["is_admin"] is True
+
+
+
+class BrokenBackend(LRUCache):
+    """Raises on the operations listed in ``failing``, like a locked SQLite file."""
+
+    def __init__(self, *failing):
+        super().__init__(max_entries=10, max_bytes=1 << 20)
+        self.failing = failing
+
+    def get(self, key):
+        if "get" in self.failing:
+            raise sqlite3.OperationalError("database is locked")
+        return super().get(key)
+
+    def set(self, key, value, tags=(), ttl=None):
+        if "set" in self.failing:
+            raise sqlite3.OperationalError("disk I/O error")
+        return super().set(key, value, tags, ttl)
+
+    def invalidate(self, *tags):
+        if "invalidate" in self.failing:
+            raise sqlite3.OperationalError("database is locked")
+        return super().invalidate(*tags)
+
+
+def test_backend_errors_serve_the_view_uncached(app, client):
+    author = User(email="author@example.com", name="Author")
+    author.set_password("secret")
+    recipe = Recipe(title="Soup", instructions="Boil", author=author)
+    db.session.add(recipe)
+    db.session.commit()
+    url = f"/api/recipes/{recipe.id}"
+
+    for failing in ("get", "set"):
+        app.extensions["response_cache"] = BrokenBackend(failing)
+        rsp = client.get(url)
+        assert rsp.status_code == 200
+        assert rsp.get_json()["title"] == "Soup"
+        assert "X-Cache" not in rsp.headers
+
+
+def test_failed_invalidation_keeps_the_committed_write(app, client, login):
+    app.extensions["response_cache"] = BrokenBackend("invalidate")
+    login()
+    created = client.post("/api/recipes", json={
+        "title": "Soup", "category": "Side", "area": "French", "instructions": "Boil",
+        "image_url": "", "ingredients": [],
+    })
+    assert created.status_code == 201, created.get_json()
+    rid = created.get_json()["id"]
+
+    assert client.post(f"/api/recipes/{rid}/rate", json={"rating": 4}).status_code == 200
+    assert db.session.get(Recipe, rid).rating_count == 1
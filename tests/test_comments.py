@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import User, Recipe, Comment
+
+
+def test_comments_cursor_pages_with_ties(client, count_queries):
+    author = User(email="author@example.com", name="Author")
+    author.set_password("secret")
+    recipe = Recipe(title="Soup", instructions="Boil", author=author)
+    stamp = datetime(2026, 1, 1)
+    # Two comments share a timestamp to exercise the id tie-breaker
+    for n, offset in enumerate((0, 1, 1, 2, 3)):
+        db.session.add(Comment(content=f"#{n}", recipe=recipe, user=author,
+                               created_at=stamp + timedelta(minutes=offset)))
+    db.session.commit()
+    recipe_id = recipe.id
+    db.session.expunge_all()
+
+    seen, cursor = [], None
+    with count_queries() as queries:
+        while True:
+            url = f"/api/recipes/{recipe_id}/comments?limit=2"
+            page = client.get(url + (f"&after={cursor}" if cursor else "")).get_json()
+            assert page["total"] == 5
+            seen += [c["content"] for c in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+    assert seen == ["#4", "#3", "#2", "#1", "#0"]
+    assert page["items"][0]["user"]["name"] == "Author"
+    # recipe check + page + total, for each of the three pages
+    assert queries.count == 9
+
+
+def test_comments_reject_malformed_cursor(client):
+    author = User(email="author@example.com", name="Author")
+    author.set_password("secret")
+    recipe = Recipe(title="Soup", instructions="Boil", author=author)
+    db.session.add(recipe)
+    db.session.commit()
+
+    assert client.get(f"/api/recipes/{recipe.id}/comments?after=nope").status_code == 400
+    assert client.get("/api/recipes/999/comments").status_code == 404
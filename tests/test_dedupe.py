@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.models import Comment, Favorite, Ingredient, Rating, Recipe, User
+
+
+@pytest.fixture
+def duplicates(app):
+    """Two external_id groups imported several times, as before the unique index."""
+    db.session.execute(text("DROP INDEX uq_recipe_external_id"))
+    alice = User(email="alice@example.com", name="Alice", pw_hash="x")
+    bob = User(email="bob@example.com", name="Bob", pw_hash="x")
+    db.session.add_all([alice, bob])
+    db.session.flush()
+
+    def external(external_id):
+        recipe = Recipe(title=external_id, instructions="Cook.", user_id=alice.id,
+                        is_external=True, external_id=external_id)
+        recipe.ingredients.append(Ingredient(name="Salt"))
+        return recipe
+
+    keeper, dup1, dup2, other, other_dup = recipes = [
+        external("52772"), external("52772"), external("52772"), external("52773"), external("52773"),
+    ]
+    db.session.add_all(recipes)
+    db.session.flush()
+    db.session.add_all([
+        Rating(recipe_id=keeper.id, user_id=alice.id, value=2),
+        Rating(recipe_id=dup2.id, user_id=alice.id, value=5),   # newer, wins
+        Rating(recipe_id=dup1.id, user_id=bob.id, value=4),
+        Favorite(recipe_id=dup1.id, user_id=alice.id),
+        Favorite(recipe_id=dup2.id, user_id=alice.id),
+        Comment(recipe_id=dup2.id, user_id=bob.id, content="Nice"),
+        Rating(recipe_id=other_dup.id, user_id=bob.id, value=3),
+    ])
+    db.session.commit()
+    return {"keeper": keeper.id, "other": other.id, "alice": alice.id, "bob": bob.id}
+
+
+def dedupe(app, *args):
+    result = app.test_cli_runner().invoke(args=["recipes", "dedupe", *args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def test_dry_run_reports_without_changes(app, duplicates):
+    output = dedupe(app, "--dry-run")
+    assert "2 group(s), 3 duplicate recipe(s) removed" in output
+    assert "ratings 3 moved / 1 dropped" in output
+    assert "favorites 1 moved / 1 dropped" in output
+    assert Recipe.query.count() == 5
+    assert Rating.query.count() == 4
+
+
+def test_merge_keeps_oldest_copy_and_newest_interactions(app, duplicates):
+    output = dedupe(app, "--batch-size", "1")
+    assert "2 group(s), 3 duplicate recipe(s) removed" in output
+
+    db.session.expire_all()
+    assert sorted(r.id for r in Recipe.query) == sorted([duplicates["keeper"], duplicates["other"]])
+    assert Ingredient.query.count() == 2
+
+    keeper = db.session.get(Recipe, duplicates["keeper"])
+    ratings = {r.user_id: r.value for r in Rating.query.filter_by(recipe_id=keeper.id)}
+    assert ratings == {duplicates["alice"]: 5, duplicates["bob"]: 4}
+    assert (keeper.rating_sum, keeper.rating_count) == (9, 2)
+    assert Favorite.query.filter_by(recipe_id=keeper.id).count() == 1
+    assert Comment.query.filter_by(recipe_id=keeper.id).count() == 1
+    assert db.session.get(Recipe, duplicates["other"]).rating_count == 1
+
+    # Nothing left to do on a rerun
+    assert "0 group(s), 0 duplicate recipe(s)" in dedupe(app)
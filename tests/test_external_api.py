@@ -130,7 +130,7 @@ def test_external_api():
             )
             
             if get_comments_response.status_code == 200:
-                comments = get_comments_response.json()
+                comments = get_comments_response.json()["items"]
                 print(f"Found {len(comments)} comments:")
                 for idx, comment in enumerate(comments):
                     print(f"{idx+1}. {comment['content']} by {comment['user']['name']}")
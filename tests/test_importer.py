@@ -0,0 +1,95 @@
+import json
+import os
+
+from app import db, importer
+from app.importer import import_recipes, iter_records
+from app.models import Ingredient, Recipe, User
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "mealdb")
+
+
+def make_owner():
+    user = User(email="admin@example.com", name="Admin", is_admin=True)
+    user.set_password("secret")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def recipe(n, external=True):
+    return {
+        "externalId": str(n) if external else None,
+        "title": f"Recipe {n}",
+        "instructions": "Mix.",
+        "ingredients": [{"name": "Salt", "measure": "1 tsp"}, {"name": "Water"}],
+    }
+
+
+def test_json_array_is_streamed_in_small_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "_READ_CHUNK", 7)
+    path = tmp_path / "dump.json"
+    records = [recipe(n) for n in range(5)]
+    path.write_text(json.dumps(records, indent=2))
+    assert list(iter_records(str(path))) == records
+
+
+def test_ndjson_import_dedupes_and_batches(app, tmp_path, count_queries):
+    owner = make_owner()
+    path = tmp_path / "dump.ndjson"
+    lines = [recipe(1), recipe(2), recipe(1), recipe(3, external=False), {"title": "No steps"}]
+    path.write_text("\n".join(json.dumps(r) for r in lines) + "\n")
+
+    with count_queries() as counter:
+        report = import_recipes(iter_records(str(path)), owner.id, batch_size=100)
+
+    assert (report.read, report.inserted, report.duplicates, report.invalid) == (5, 3, 1, 1)
+    assert report.ingredients == 6
+    # external INSERT ... ON CONFLICT, local INSERT, ingredient executemany
+    assert counter.count <= 4
+
+    seeded = Recipe.query.filter_by(title="Recipe 3").one()
+    assert seeded.is_external is False and seeded.external_id is None
+    assert [(i.name, i.measure) for i in Recipe.query.filter_by(external_id="2").one().ingredients] == [
+        ("Salt", "1 tsp"), ("Water", None),
+    ]
+
+    # Rerunning skips everything that is already there
+    again = import_recipes(iter_records(str(path)), owner.id, batch_size=2)
+    assert again.inserted == 1  # the recipe without an external id is seeded again
+    assert Recipe.query.filter_by(is_external=True).count() == 2
+
+
+def test_external_ids_written_concurrently_are_skipped(app):
+    owner = make_owner()
+    # another import committed "2" after this batch was read
+    db.session.add(Recipe(title="Theirs", instructions="Stir.", user_id=owner.id,
+                          is_external=True, external_id="2"))
+    db.session.commit()
+
+    records = [recipe(n) for n in (1, 2, 3)]
+    records[2]["ingredients"] = [{"name": "Pepper"}]
+    report = import_recipes(records, owner.id)
+
+    assert (report.inserted, report.duplicates, report.ingredients) == (2, 1, 3)
+    assert Recipe.query.filter_by(external_id="2").one().title == "Theirs"
+    assert Recipe.query.filter_by(external_id="2").one().ingredients == []
+    assert [i.name for i in Recipe.query.filter_by(external_id="3").one().ingredients] == ["Pepper"]
+
+
+def test_cli_imports_mealdb_payload(app):
+    make_owner()
+    path = os.path.join(FIXTURES, "search.php_f=b.json")
+    result = app.test_cli_runner().invoke(args=["recipes", "import", path, "--batch-size", "1"])
+    assert result.exit_code == 0, result.output
+    assert "2 inserted, 0 duplicates" in result.output
+
+    pie = Recipe.query.filter_by(external_id="52874").one()
+    assert pie.is_external and pie.title == "Beef and Mustard Pie"
+    assert Ingredient.query.filter_by(recipe_id=pie.id).count() == 2
+
+
+def test_cli_requires_an_owner(app):
+    path = os.path.join(FIXTURES, "search.php_f=a.json")
+    result = app.test_cli_runner().invoke(args=["recipes", "import", path])
+    assert result.exit_code != 0
+    assert "Owner not found" in result.output
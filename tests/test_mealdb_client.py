@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utils.mealdb_client import MealDBClient, MealDBUnavailable
+
+CATEGORIES = {"categories": [{"idCategory": "1", "strCategory": "Beef"}]}
+
+
+class StubMealDB:
+    """Local stand-in for themealdb.com; flip ``status`` or ``delay`` per test."""
+
+    def __init__(self):
+        self.status = 200
+        self.delay = 0
+        self.hits = 0
+        self.payload_for = lambda path: CATEGORIES
+        self.in_flight = self.max_in_flight = 0
+        stub = self
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    stub.hits += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(stub.delay)
+                with lock:
+                    stub.in_flight -= 1
+                body = json.dumps(stub.payload_for(self.path)).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubMealDB()
+    yield server
+    server.close()
+
+
+def make_client(stub, **kwargs):
+    options = dict(retries=0, read_timeout=0.5, failure_threshold=2, reset_after=60)
+    options.update(kwargs)
+    return MealDBClient(base_url=stub.url, **options)
+
+
+def test_fresh_responses_are_cached(stub):
+    client = make_client(stub)
+    assert client.categories() == [{"id": "1", "name": "Beef"}]
+    assert client.categories() == [{"id": "1", "name": "Beef"}]
+    assert stub.hits == 1
+
+
+def test_stale_value_served_while_refreshing(stub):
+    client = make_client(stub, cache_ttl=0, stale_ttl=60)
+    client.categories()
+    assert client.categories() == [{"id": "1", "name": "Beef"}]
+    for _ in range(50):
+        if stub.hits == 2:
+            break
+        time.sleep(0.01)
+    assert stub.hits == 2
+
+
+def test_circuit_serves_last_good_value_when_upstream_down(stub):
+    client = make_client(stub, cache_ttl=0, stale_ttl=0)
+    client.categories()
+
+    stub.status = 503
+    for _ in range(3):
+        assert client.categories() == [{"id": "1", "name": "Beef"}]
+    # two failures opened the circuit; the third call never reached upstream
+    assert stub.hits == 3
+
+
+def test_slow_upstream_is_bounded_by_read_timeout(stub):
+    stub.delay = 1
+    client = make_client(stub, read_timeout=0.2)
+    started = time.monotonic()
+    with pytest.raises(MealDBUnavailable):
+        client.categories()
+    assert time.monotonic() - started < 1
+
+
+def meal_payload(path):
+    meal_id = path.rsplit("=", 1)[-1]
+    if meal_id == "0":
+        return {"meals": None}
+    return {"meals": [{
+        "idMeal": meal_id, "strMeal": f"Meal {meal_id}", "strInstructions": "Cook.",
+        "strIngredient1": "Salt", "strMeasure1": "1 tsp",
+    }]}
+
+
+def test_lookup_cache_is_bounded_and_keeps_catalogs(stub):
+    paths = []
+
+    def payload_for(path):
+        paths.append(path)
+        return CATEGORIES if "categories" in path else meal_payload(path)
+
+    stub.payload_for = payload_for
+    client = make_client(stub, max_entries=3)
+    client.categories()
+    for meal_id in range(1, 6):
+        client.lookup(str(meal_id))
+    assert list(client._cache) == ["categories.php", "lookup.php?i=4", "lookup.php?i=5"]
+
+    # the id is sent as a query parameter, not pasted into the URL
+    client.lookup("1&f=a")
+    assert paths[-1] == "/lookup.php?i=1%26f%3Da"
+
+
+def test_expired_lookups_are_not_kept_as_fallback(stub):
+    stub.payload_for = meal_payload
+    client = make_client(stub, cache_ttl=0, stale_ttl=0)
+    client.lookup("7")
+    stub.status = 503
+    with pytest.raises(MealDBUnavailable):
+        client.lookup("7")
+    assert "lookup.php?i=7" not in client._cache
+
+
+def test_lookup_many_is_concurrent_and_bounded(stub):
+    stub.payload_for = meal_payload
+    stub.delay = 0.2
+    client = make_client(stub)
+    started = time.monotonic()
+    found, failed = client.lookup_many([str(i) for i in range(1, 9)] + ["0"], concurrency=4)
+    assert time.monotonic() - started < 1.2  # 9 requests, 4 at a time, not 1.8s serially
+    assert stub.max_in_flight <= 4
+    assert failed == []
+    assert found["0"] is None and found["3"]["strMeal"] == "Meal 3"
+
+    # answers are cached for the next call
+    client.lookup_many(["3"])
+    assert stub.hits == 9
+
+
+def test_batch_import_endpoint(app, client, login, stub):
+    from app import db
+    from app.models import Recipe
+
+    stub.payload_for = meal_payload
+    app.config["MEALDB_BASE_URL"] = stub.url
+    login()
+    existing = client.post("/api/import-external-recipe", json={
+        "externalId": "1", "title": "Meal 1", "instructions": "Cook.",
+    }).get_json()
+
+    rsp = client.post("/api/import-external-recipes", json={"ids": ["1", "2", 3, "0", "2"]})
+    assert rsp.status_code == 200
+    body = rsp.get_json()
+    assert body["missing"] == ["0"] and body["failed"] == []
+    assert body["recipes"]["1"] == existing["id"]
+    assert set(body["recipes"]) == {"1", "2", "3"}
+    assert stub.hits == 3  # only the ids that were not imported yet
+    assert [i.name for i in db.session.get(Recipe, body["recipes"]["3"]).ingredients] == ["Salt"]
+
+    again = client.post("/api/import-external-recipes", json={"ids": ["2", "3"]}).get_json()
+    assert again["recipes"] == {"2": body["recipes"]["2"], "3": body["recipes"]["3"]}
+    assert stub.hits == 3
@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from app import db
+from app.mealdb_sync import FixtureSource, RecordingSource, sync_mealdb
+from app.models import MealDBMeal, MealDBMealIngredient
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "mealdb")
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    """Writable copy of the recorded MealDB responses."""
+    target = tmp_path / "mealdb"
+    shutil.copytree(FIXTURES, target)
+    return target
+
+
+def sync(app, fixtures, *args):
+    result = app.test_cli_runner().invoke(
+        args=["mealdb", "sync", "--fixtures", str(fixtures), "--letters", "ab", *args]
+    )
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def test_sync_mirrors_catalog(app, fixtures):
+    output = sync(app, fixtures)
+    assert "2 categories, 2 areas, 2 ingredients" in output
+    assert "4 new, 0 updated, 0 unchanged" in output
+
+    tart = db.session.get(MealDBMeal, "52768")
+    assert tart.category == "Dessert"
+    assert [(i.name, i.measure) for i in tart.ingredients] == [
+        ("Digestive Biscuits", "175g/6oz"), ("Butter", "75g/3oz"), ("Apple", "2"),
+    ]
+
+
+def test_resync_skips_unchanged_and_rewrites_changed(app, fixtures):
+    sync(app, fixtures)
+
+    path = fixtures / "search.php_f=b.json"
+    payload = json.loads(path.read_text())
+    payload["meals"][1]["strInstructions"] = "Braise slowly."
+    payload["meals"][1]["strIngredient3"] = ""
+    path.write_text(json.dumps(payload))
+
+    assert "0 new, 1 updated, 3 unchanged" in sync(app, fixtures)
+    meal = db.session.get(MealDBMeal, "52878")
+    assert meal.instructions == "Braise slowly."
+    assert MealDBMealIngredient.query.filter_by(meal_id="52878").count() == 2
+
+
+def test_prune_removes_meals_gone_upstream(app, fixtures):
+    sync(app, fixtures)
+    path = fixtures / "search.php_f=a.json"
+    payload = json.loads(path.read_text())
+    payload["meals"] = payload["meals"][:1]
+    path.write_text(json.dumps(payload))
+
+    assert "1 pruned" in sync(app, fixtures, "--prune")
+    assert db.session.get(MealDBMeal, "52893") is None
+    assert MealDBMealIngredient.query.filter_by(meal_id="52893").count() == 0
+
+
+def test_prune_after_partial_walk_keeps_other_letters(app, fixtures):
+    sync(app, fixtures)
+
+    assert "0 pruned" in sync(app, fixtures, "--letters", "a", "--prune")
+    assert MealDBMeal.query.count() == 4
+    assert db.session.get(MealDBMeal, "52878") is not None
+
+
+def test_recording_round_trips(app, tmp_path):
+    recorded = tmp_path / "recorded"
+    sync_mealdb(RecordingSource(FixtureSource(FIXTURES), str(recorded)), letters="ab")
+    assert sorted(os.listdir(recorded)) == sorted(os.listdir(FIXTURES))
+    for name in os.listdir(FIXTURES):
+        with open(os.path.join(FIXTURES, name)) as a, open(recorded / name) as b:
+            assert json.load(a) == json.load(b)
+
+
+def test_external_endpoints_read_mirror(app, client, fixtures):
+    sync(app, fixtures)
+
+    assert client.get("/api/external/categories").get_json() == [
+        {"id": "1", "name": "Beef"}, {"id": "3", "name": "Dessert"},
+    ]
+    assert client.get("/api/external/areas").get_json() == [
+        {"name": "British"}, {"name": "French"},
+    ]
+
+    page = client.get("/api/external/meals?category=Beef").get_json()
+    assert page["total"] == 2
+    assert [m["title"] for m in page["items"]] == ["Beef Bourguignon", "Beef and Mustard Pie"]
+
+    meal = client.get("/api/external/meals/52874").get_json()
+    assert meal["externalId"] == "52874"
+    assert meal["ingredients"] == [
+        {"name": "Beef", "measure": "1kg"}, {"name": "Mustard", "measure": "2 tbs"},
+    ]
@@ -0,0 +1,36 @@
+import os
+
+from app.utils import openai_client
+from app.utils.ai_recipes import generate_recipe
+from app.utils.openai_client import get_openai_client
+
+
+def test_client_is_shared_and_reuses_connections(openai_stub):
+    client = get_openai_client()
+    assert get_openai_client() is client
+
+    for _ in range(3):
+        assert generate_recipe(["egg"], "english")["title"] == "Stub dish"
+    assert len(openai_stub.requests) == 3
+    assert openai_stub.requests[0]["model"] == "gpt-4o-mini"
+    assert len(openai_stub.client_ports) == 1
+
+
+def test_client_is_rebuilt_after_fork(openai_stub, monkeypatch):
+    parent = get_openai_client()
+    child_pid = os.getpid() + 1
+    monkeypatch.setattr(openai_client.os, "getpid", lambda: child_pid)
+    child = get_openai_client()
+    assert child is not parent
+    assert get_openai_client() is child
+
+
+def test_timeouts_and_retries_come_from_environment(openai_stub, monkeypatch):
+    monkeypatch.setenv("OPENAI_TIMEOUT", "12.5")
+    monkeypatch.setenv("OPENAI_CONNECT_TIMEOUT", "1.5")
+    monkeypatch.setenv("OPENAI_MAX_RETRIES", "4")
+    openai_client.reset_openai_client()
+
+    client = get_openai_client()
+    assert client.max_retries == 4
+    assert client.timeout.read == 12.5 and client.timeout.connect == 1.5
@@ -0,0 +1,56 @@
+"""
+Regression tests for the indexes behind the hot read paths.
+
+Each query below mirrors one issued by app/routes.py. It is run through
+SQLite's EXPLAIN QUERY PLAN against the schema declared in app/models.py;
+a full table scan or a temporary sort means an index went missing.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text, tuple_
+
+from app import db
+from app.models import (
+    Recipe, Comment, Rating, Favorite, ShoppingListItem, SharedShoppingList,
+)
+
+HOT_QUERIES = {
+    "recipe by external_id": lambda: Recipe.query.filter_by(is_external=True, external_id="52772"),
+    "recipes page after cursor": lambda: Recipe.query.filter(Recipe.id < 100)
+        .order_by(Recipe.id.desc()).limit(21),
+    "recipes of user": lambda: Recipe.query.filter_by(user_id=1, is_external=False),
+    "comments of recipe": lambda: Comment.query.filter_by(recipe_id=1)
+        .order_by(Comment.created_at.desc()),
+    "comments page after cursor": lambda: Comment.query.filter_by(recipe_id=1)
+        .filter(tuple_(Comment.created_at, Comment.id) < (datetime(2026, 1, 1), 10))
+        .order_by(Comment.created_at.desc(), Comment.id.desc()).limit(21),
+    "rating of user for recipe": lambda: Rating.query.filter_by(recipe_id=1, user_id=1),
+    "ratings of recipe": lambda: db.session.query(db.func.count(Rating.id))
+        .filter(Rating.recipe_id == 1),
+    "ratings of user": lambda: Rating.query.filter_by(user_id=1)
+        .order_by(Rating.updated_at.desc()),
+    "favorite of user for recipe": lambda: Favorite.query.filter_by(recipe_id=1, user_id=1),
+    "favorites of user": lambda: Favorite.query.filter_by(user_id=1)
+        .order_by(Favorite.created_at.desc()),
+    "shopping list of user": lambda: ShoppingListItem.query.filter_by(user_id=1),
+    "shared list by token": lambda: SharedShoppingList.query.filter_by(token="abc"),
+}
+
+
+def query_plan(query):
+    sql = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(app, name):
+    plan = query_plan(HOT_QUERIES[name]())
+
+    scans = [step for step in plan if step.startswith("SCAN ")]
+    sorts = [step for step in plan if "TEMP B-TREE" in step]
+    assert not scans, f"{name} falls back to a full scan: {plan}"
+    assert not sorts, f"{name} sorts without an index: {plan}"
@@ -0,0 +1,219 @@
+from sqlalchemy import event
+
+from app import db
+from app.models import User, Recipe, Ingredient, Rating
+
+
+def make_recipes(count, author=None):
+    if author is None:
+        author = User(email="author@example.com", name="Author")
+        author.set_password("secret")
+        db.session.add(author)
+    recipes = []
+    for i in range(count):
+        recipe = Recipe(
+            title=f"Recipe {i}",
+            category="Beef",
+            area="British",
+            instructions="Step one\nStep two",
+            image_url=f"https://example.com/{i}.png",
+            author=author,
+        )
+        recipe.ingredients.append(Ingredient(name="Salt", measure="1 tsp"))
+        recipe.ingredients.append(Ingredient(name="Beef", measure="500g"))
+        recipes.append(recipe)
+    db.session.add_all(recipes)
+    db.session.commit()
+    return recipes
+
+
+def test_list_recipes_walks_pages_with_cursor(client):
+    make_recipes(5)
+
+    first = client.get("/api/recipes?limit=2").get_json()
+    assert [r["title"] for r in first["items"]] == ["Recipe 4", "Recipe 3"]
+    assert first["next_cursor"] == first["items"][-1]["id"]
+
+    second = client.get(f"/api/recipes?limit=2&after={first['next_cursor']}").get_json()
+    assert [r["title"] for r in second["items"]] == ["Recipe 2", "Recipe 1"]
+
+    last = client.get(f"/api/recipes?limit=2&after={second['next_cursor']}").get_json()
+    assert [r["title"] for r in last["items"]] == ["Recipe 0"]
+    assert last["next_cursor"] is None
+
+
+def test_external_id_lookup_uses_the_page_shape(client):
+    recipe = make_recipes(1)[0]
+    recipe.is_external, recipe.external_id = True, "52772"
+    db.session.commit()
+
+    found = client.get("/api/recipes?external_id=52772").get_json()
+    assert [r["id"] for r in found["items"]] == [recipe.id]
+    assert found["next_cursor"] is None
+    assert client.get("/api/recipes?external_id=1").get_json() == {"items": [], "next_cursor": None}
+
+
+def test_list_recipes_query_count_does_not_grow_with_page_size(client, count_queries):
+    recipes = make_recipes(30)
+    for n, recipe in enumerate(recipes[:10]):
+        rater = User(email=f"rater{n}@example.com", name=f"Rater {n}")
+        rater.set_password("secret")
+        db.session.add(Rating(recipe=recipe, user=rater, value=4))
+    db.session.commit()
+    db.session.expunge_all()
+
+    with count_queries() as small:
+        assert len(client.get("/api/recipes?limit=2").get_json()["items"]) == 2
+    db.session.expunge_all()
+    with count_queries() as large:
+        page = client.get("/api/recipes?limit=30").get_json()
+    assert len(page["items"]) == 30
+    assert large.count == small.count
+
+
+def test_summary_view_skips_heavy_fields(client):
+    recipe = make_recipes(1)[0]
+    author = recipe.author
+    rater = User(email="rater@example.com", name="Rater")
+    rater.set_password("secret")
+    db.session.add_all([rater,
+                        Rating(recipe=recipe, user=rater, value=3),
+                        Rating(recipe=recipe, user=author, value=5)])
+    db.session.flush()
+    Recipe.refresh_rating_aggregates([recipe.id])
+    db.session.commit()
+
+    item = client.get("/api/recipes?view=summary").get_json()["items"][0]
+    assert item["title"] == "Recipe 0"
+    assert item["image_url"] == "https://example.com/0.png"
+    assert item["average_rating"] == 4
+    assert item["ratings_count"] == 2
+    assert "instructions" not in item
+    assert "ingredients" not in item
+    assert "author" not in item
+
+
+def test_rate_recipe_maintains_aggregates(client, login):
+    recipe_id = make_recipes(1)[0].id
+    login()
+
+    client.post(f"/api/recipes/{recipe_id}/rate", json={"rating": 2})
+    client.post(f"/api/recipes/{recipe_id}/rate", json={"rating": 5})
+
+    recipe = db.session.get(Recipe, recipe_id)
+    db.session.refresh(recipe)
+    assert (recipe.rating_sum, recipe.rating_count) == (5, 1)
+    assert client.get(f"/api/recipes/{recipe_id}/rating").get_json()["average"] == 5
+
+
+def test_rating_totals_match_rating_table_after_re_rates(client, login):
+    recipe_id = make_recipes(1)[0].id
+
+    for n, values in enumerate([(3, 5, 1), (4, 2), (5,)]):
+        client.post("/api/auth/logout")
+        login(f"rater{n}@example.com", f"Rater {n}")
+        for value in values:
+            assert client.post(f"/api/recipes/{recipe_id}/rate", json={"rating": value}).status_code == 200
+
+    recipe = db.session.get(Recipe, recipe_id)
+    db.session.refresh(recipe)
+    actual = db.session.query(db.func.sum(Rating.value), db.func.count(Rating.id)).one()
+    assert (recipe.rating_sum, recipe.rating_count) == tuple(actual) == (1 + 2 + 5, 3)
+
+
+def test_rating_endpoint_reads_only_the_users_own_rating(client, login):
+    recipe = make_recipes(1)[0]
+    for n in range(5):
+        rater = User(email=f"rater{n}@example.com", name=f"Rater {n}")
+        rater.set_password("secret")
+        db.session.add(Rating(recipe=recipe, user=rater, value=2))
+    db.session.flush()
+    Recipe.refresh_rating_aggregates([recipe.id])
+    db.session.commit()
+    login()
+    client.post(f"/api/recipes/{recipe.id}/rate", json={"rating": 5})
+
+    statements = []
+
+    def collect(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", collect)
+    try:
+        body = client.get(f"/api/recipes/{recipe.id}/rating").get_json()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", collect)
+
+    assert body == {"average": 2.5, "count": 6, "user_rating": 5}
+    rating_reads = [s for s in statements if "FROM rating" in s]
+    assert len(rating_reads) == 1 and "rating.user_id" in rating_reads[0]
+
+
+def test_ratings_check_command_repairs_drift(app):
+    recipe = make_recipes(1)[0]
+    db.session.add(Rating(recipe=recipe, user=recipe.author, value=4))
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["ratings", "check"])
+    assert result.exit_code != 0
+    assert "stored 0/0, actual 4/1" in result.output
+
+    assert runner.invoke(args=["ratings", "check", "--fix"]).exit_code == 0
+    assert runner.invoke(args=["ratings", "check"]).exit_code == 0
+
+
+def test_favorite_toggle_keeps_a_single_row(client, login):
+    recipe_id = make_recipes(1)[0].id
+    login()
+
+    assert client.post(f"/api/recipes/{recipe_id}/favorite").get_json()["message"] == "Added to favorites"
+    assert client.get(f"/api/recipes/{recipe_id}/favorite").get_json() == {"is_favorite": True}
+    assert client.post(f"/api/recipes/{recipe_id}/favorite").get_json()["message"] == "Removed from favorites"
+    assert client.get(f"/api/recipes/{recipe_id}/favorite").get_json() == {"is_favorite": False}
+
+
+def test_profile_favorites_and_ratings_newest_first(client, login, count_queries):
+    ids = [recipe.id for recipe in make_recipes(4)]
+    login()
+    for rid in ids:
+        client.post(f"/api/recipes/{rid}/favorite")
+        client.post(f"/api/recipes/{rid}/rate", json={"rating": 3})
+    client.post(f"/api/recipes/{ids[0]}/rate", json={"rating": 5})
+    db.session.expire_all()
+
+    with count_queries() as queries:
+        favorites = client.get("/api/profile/favorites?per_page=3").get_json()
+    assert [r["id"] for r in favorites["items"]] == ids[::-1][:3]
+    assert favorites["total"] == 4
+
+    db.session.expire_all()
+    with count_queries() as rating_queries:
+        ratings = client.get("/api/profile/ratings").get_json()
+    assert ratings["items"][0]["recipe"]["id"] == ids[0]
+    assert ratings["items"][0]["value"] == 5
+    assert queries.count == rating_queries.count <= 5
+
+    summary = client.get("/api/profile/ratings?view=summary&per_page=1").get_json()
+    assert summary["items"][0]["recipe"]["title"] == "Recipe 0"
+
+
+def test_import_external_recipe_returns_existing_copy(client, login):
+    login()
+    payload = {
+        "externalId": "52772", "title": "Teriyaki Chicken", "instructions": "Cook.",
+        "ingredients": [{"name": "Soy sauce", "measure": "3/4 cup"}],
+    }
+    created = client.post("/api/import-external-recipe", json=payload)
+    assert created.status_code == 201
+    assert created.get_json()["ingredients"][0]["name"] == "Soy sauce"
+
+    again = client.post("/api/import-external-recipe", json=payload)
+    assert again.status_code == 200
+    assert again.get_json() == {
+        "id": created.get_json()["id"], "externalId": "52772", "title": "Teriyaki Chicken",
+    }
+    assert Recipe.query.filter_by(external_id="52772").count() == 1
+    assert Ingredient.query.count() == 1
+
+    assert client.post("/api/import-external-recipe", json={"title": "x"}).status_code == 400